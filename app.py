@@ -3,7 +3,7 @@
 필요한 정보만 추출하여 새로 작성
 """
 
-from flask import Flask, jsonify, render_template_string, render_template, request, redirect
+from flask import Flask, jsonify, render_template, request, redirect, Response
 from flask_cors import CORS
 import requests
 import os
@@ -15,7 +15,18 @@ import threading
 import re
 import uuid
 import copy
+import gzip
+import zlib
+import hashlib
+import mmap
+import struct
+import math
+import functools
+import atexit
+import signal
+import contextlib
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
 
 # .env 파일 로드 (DATABASE_URL 등)
 try:
@@ -39,6 +50,18 @@ try:
 except ImportError:
     bet_int = None
 
+# brotli: 선택 의존성. 있으면 /results 정적 자산을 br로도 미리 압축, 없으면 gzip만
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# fcntl: 공유 메모리 캐시(SHARED_CACHE) 쓰기 락. 없으면(Windows) 공유 캐시 끔
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 try:
     from apscheduler.schedulers.background import BackgroundScheduler
     SCHEDULER_AVAILABLE = True
@@ -62,13 +85,28 @@ except ImportError:
     join_room = None
 
 
+# 픽 전달 프로토콜: 계산기별 단조 증가 seq. 내용이 바뀐 픽만 1회 emit, 매크로가 pick_ack(seq)로 응답.
+# ack 보낸 적 있는 매크로 중 PICK_ACK_TIMEOUT_MS 내 ack 없는 sid에만 재전송 (최대 PICK_RESEND_MAX회). 접속 시 최신 픽 resync.
+PICK_ACK_TIMEOUT_MS = int(os.getenv('PICK_ACK_TIMEOUT_MS', '150'))
+PICK_RESEND_MAX = int(os.getenv('PICK_RESEND_MAX', '3'))
+_pick_seq_lock = threading.Lock()
+_pick_seq = {}            # cid -> 마지막 seq
+_pick_last_msg = {}       # cid -> 마지막으로 보낸 pick_update 데이터 (seq·sent_at 포함)
+_pick_room_sids = {1: set(), 2: set(), 3: set()}  # cid -> 접속 sid
+_pick_sid_calc = {}       # sid -> cid
+_pick_ack_sids = set()    # ack 지원 매크로 sid (한 번이라도 ack 보낸 sid)
+_pick_noack_sids = set()  # 재전송 한도까지 ack가 한 번도 없던 sid (ack 미지원 구버전으로 보고 추적 중단)
+_pick_unacked = {}        # (cid, sid) -> {'seq', 'sent_at', 'resends'}
+_pick_delivery_ms = deque(maxlen=1024)  # emit → ack 왕복 지연(ms)
+_pick_delivery_stats = {'emitted': 0, 'skipped_same': 0, 'acked': 0, 'resent': 0, 'gave_up': 0, 'resync': 0, 'stale_ack': 0}
+
+
 def _ws_emit_pick_update(calculator_id, round_num, pick_color, suggested_amount, running, pick_pred=None):
-    """WebSocket으로 픽 갱신 푸시. calc_N room에 emit. 2회 전송으로 매크로 검증용."""
+    """WebSocket으로 픽 갱신 푸시. calc_N room에 emit. 직전과 같은 픽이면 생략, 바뀌면 seq+1 후 1회 전송."""
     if not _HAS_SOCKETIO or not _socketio:
         return
     try:
         cid = int(calculator_id) if calculator_id in (1, 2, 3) else 1
-        room = f'calc_{cid}'
         data = {
             'round': round_num,
             'pick_color': pick_color,
@@ -77,20 +115,104 @@ def _ws_emit_pick_update(calculator_id, round_num, pick_color, suggested_amount,
             'calculator': cid,
             'pick_pred': pick_pred if pick_pred in ('정', '꺽') else None,
         }
-        _socketio.emit('pick_update', data, room=room)
-        # 20ms 후 2회 전송 — 매크로 2회 확인용 (속도 개선)
-        def _emit_second():
-            time.sleep(0.02)
-            try:
-                _socketio.emit('pick_update', data, room=room)
-            except Exception:
-                pass
-        threading.Thread(target=_emit_second, daemon=True).start()
+        with _pick_seq_lock:
+            last = _pick_last_msg.get(cid)
+            if last is not None and all(last.get(k) == v for k, v in data.items()):
+                _pick_delivery_stats['skipped_same'] += 1
+                return
+            seq = _pick_seq.get(cid, 0) + 1
+            _pick_seq[cid] = seq
+            now = time.time()
+            data['seq'] = seq
+            data['sent_at'] = int(now * 1000)
+            _pick_last_msg[cid] = data
+            # 방의 모든 sid 추적 — ack 전 접속(아직 ack 보낸 적 없음) 매크로가 첫 픽을 놓쳐도 재전송
+            for sid in _pick_room_sids.get(cid, ()):
+                if sid not in _pick_noack_sids:
+                    _pick_unacked[(cid, sid)] = {'seq': seq, 'sent_at': now, 'resends': 0}
+            _pick_delivery_stats['emitted'] += 1
+        _socketio.emit('pick_update', data, room=f'calc_{cid}')
+        if data['running'] and round_num is not None:
+            _trace_round(int(round_num) - 1, 'ws_emit')
     except Exception:
         pass
 
 
-_last_emitted_round_actuals = None
+def _ws_handle_pick_ack(sid, data):
+    """매크로 ack: 현재 seq 이상이면 미확인 해제 + 왕복 지연 기록. 예전 seq ack는 무시(이미 새 픽 대기 중)."""
+    try:
+        cid = int(data.get('calculator') or _pick_sid_calc.get(sid) or 1)
+        seq = int(data.get('seq'))
+    except (TypeError, ValueError, AttributeError):
+        return
+    now = time.time()
+    with _pick_seq_lock:
+        _pick_ack_sids.add(sid)
+        _pick_noack_sids.discard(sid)
+        pend = _pick_unacked.get((cid, sid))
+        if pend is not None and seq >= pend['seq']:
+            del _pick_unacked[(cid, sid)]
+            _pick_delivery_ms.append((now - pend['sent_at']) * 1000)
+            _pick_delivery_stats['acked'] += 1
+        elif pend is not None:
+            _pick_delivery_stats['stale_ack'] += 1
+        last = _pick_last_msg.get(cid)
+        ack_round = last.get('round') if last is not None and last.get('seq') == seq else None
+    if ack_round is not None:
+        _trace_round(int(ack_round) - 1, 'macro_ack', now)
+
+
+def _resend_unacked_picks():
+    """ack 타임아웃 지난 sid에만 최신 픽 재전송. 재전송 한도 넘으면 포기(다음 픽 또는 재접속 resync로 복구)."""
+    if not _HAS_SOCKETIO or not _socketio or not _pick_unacked:
+        return
+    now = time.time()
+    due = []
+    with _pick_seq_lock:
+        for (cid, sid), pend in list(_pick_unacked.items()):
+            if (now - pend['sent_at']) * 1000 < PICK_ACK_TIMEOUT_MS * (pend['resends'] + 1):
+                continue
+            msg = _pick_last_msg.get(cid)
+            if msg is None or msg['seq'] != pend['seq'] or pend['resends'] >= PICK_RESEND_MAX:
+                del _pick_unacked[(cid, sid)]
+                _pick_delivery_stats['gave_up'] += 1
+                if sid not in _pick_ack_sids and msg is not None and msg['seq'] == pend['seq']:
+                    _pick_noack_sids.add(sid)
+                continue
+            pend['resends'] += 1
+            _pick_delivery_stats['resent'] += 1
+            due.append((sid, dict(msg, resend=pend['resends'])))
+    for sid, msg in due:
+        try:
+            _socketio.emit('pick_update', msg, to=sid)
+        except Exception:
+            pass
+
+
+def _pick_delivery_snapshot():
+    """픽 전달 지표 (디버그 API용): 계산기별 seq·접속 수·미확인 수, ack 왕복 지연 분포."""
+    with _pick_seq_lock:
+        lat = sorted(_pick_delivery_ms)
+        calcs = {
+            str(cid): {
+                'seq': _pick_seq.get(cid, 0),
+                'clients': len(_pick_room_sids.get(cid, ())),
+                'ack_clients': len([s for s in _pick_room_sids.get(cid, ()) if s in _pick_ack_sids]),
+                'unacked': len([k for k in _pick_unacked if k[0] == cid]),
+            }
+            for cid in (1, 2, 3)
+        }
+        stats = dict(_pick_delivery_stats)
+
+    def pct(q):
+        return round(lat[min(len(lat) - 1, int(q * len(lat)))], 2) if lat else None
+    return {
+        'calculators': calcs,
+        'stats': stats,
+        'ack_timeout_ms': PICK_ACK_TIMEOUT_MS,
+        'resend_max': PICK_RESEND_MAX,
+        'latency_ms': {'count': len(lat), 'p50': pct(0.5), 'p95': pct(0.95), 'p99': pct(0.99), 'max': round(lat[-1], 2) if lat else None},
+    }
 
 
 def _build_cards_for_macro(results):
@@ -107,20 +229,55 @@ def _build_cards_for_macro(results):
     return cards
 
 
-def _ws_emit_round_actuals(round_actuals, cards=None):
-    """실제 결과(round_actuals) WebSocket 푸시. 매크로 폴링 대체. calc_1/2/3 모두 전송."""
-    global _last_emitted_round_actuals
-    if not _HAS_SOCKETIO or not _socketio or not round_actuals:
-        return
-    if round_actuals == _last_emitted_round_actuals:
+# 매크로 피드 스냅샷: 최근 50회 결과가 바뀔 때(새 회차 도착)만 round_actuals·graph_values·cards를 1회 빌드하고
+# JSON 조각을 미리 인코딩. WebSocket round_actuals_update와 /api/macro-data가 같은 스냅샷을 그대로 사용.
+MACRO_FEED_RESULTS = 50
+MACRO_FEED_MAX_AGE_SEC = 2.0  # apply(0.1초)가 멈춰 스냅샷 확인이 이보다 오래되면 HTTP 경로에서 1회 재빌드
+_macro_feed = None  # {'key', 'round_actuals', 'graph_values', 'cards', 'fragment'(bytes), 'ws'(dict), 'checked_at'}
+_macro_feed_bodies = {}  # cid -> (feed key, relay 버전, 인코딩된 macro-data 응답 bytes)
+
+
+def _refresh_macro_feed(results):
+    """results(24h)로 스냅샷 갱신. 최근 50회 입력(gameID·조커·색)이 직전과 같으면 기존 스냅샷 반환.
+    바뀌면 재빌드 후 round_actuals_update 1회 emit(3개 room 동시) + macro-data 롱폴 깨움."""
+    global _macro_feed
+    results = _sort_results_newest_first(results)[:MACRO_FEED_RESULTS] if results else []
+    colors = [get_card_color_from_result(r) for r in results]
+    key = tuple((r.get('gameID'), _is_joker(r.get('joker')), c) for r, c in zip(results, colors))
+    feed = _macro_feed
+    if feed is not None and feed['key'] == key:
+        feed['checked_at'] = time.time()
+        return feed
+    t0 = time.time()
+    ra = _build_round_actuals(results) if results else {}
+    gv = _build_graph_values(results) if results else []
+    cards = _build_cards_for_macro(results)
+    ws = {'round_actuals': ra}
+    if cards:
+        ws['cards'] = cards
+    feed = {
+        'key': key,
+        'round_actuals': ra,
+        'graph_values': gv,
+        'cards': cards,
+        'fragment': app.json.dumps({'round_actuals': ra, 'graph_values': gv, 'cards': cards}, separators=(',', ':')).encode('utf-8'),
+        'ws': ws,
+        'checked_at': time.time(),
+    }
+    _macro_feed = feed
+    _perf_log('build_macro_feed', (time.time() - t0) * 1000)
+    _bump_relay_version((1, 2, 3))  # macro-data 롱폴 대기 해제 (새 회차 결과)
+    if ra:
+        _ws_emit_round_actuals(feed)
+    return feed
+
+
+def _ws_emit_round_actuals(feed):
+    """실제 결과(round_actuals) WebSocket 푸시. 매크로 폴링 대체. 스냅샷의 ws 페이로드를 calc_1/2/3에 한 번에 전송."""
+    if not _HAS_SOCKETIO or not _socketio:
         return
-    _last_emitted_round_actuals = dict(round_actuals)
     try:
-        data = {'round_actuals': round_actuals}
-        if cards:
-            data['cards'] = cards
-        for room in ('calc_1', 'calc_2', 'calc_3'):
-            _socketio.emit('round_actuals_update', data, room=room)
+        _socketio.emit('round_actuals_update', feed['ws'], to=['calc_1', 'calc_2', 'calc_3'])
     except Exception:
         pass
 
@@ -137,13 +294,103 @@ if _HAS_SOCKETIO:
         except (TypeError, ValueError):
             cid = 1
         join_room(f'calc_{cid}')
+        sid = request.sid
+        with _pick_seq_lock:
+            _pick_room_sids.setdefault(cid, set()).add(sid)
+            _pick_sid_calc[sid] = cid
+            last = _pick_last_msg.get(cid)
+            if last is not None:
+                _pick_delivery_stats['resync'] += 1
+                _pick_unacked[(cid, sid)] = {'seq': last['seq'], 'sent_at': time.time(), 'resends': 0}  # resync도 ack 대기
+        # 늦게 접속한 매크로도 최신 픽 즉시 수신 (resync)
+        if last is not None:
+            _socketio.emit('pick_update', dict(last, resync=True), to=sid)
+
+    @_socketio.on('disconnect')
+    def _ws_handle_disconnect(*args):
+        sid = request.sid
+        with _pick_seq_lock:
+            cid = _pick_sid_calc.pop(sid, None)
+            if cid is not None:
+                _pick_room_sids.get(cid, set()).discard(sid)
+                _pick_unacked.pop((cid, sid), None)
+            _pick_ack_sids.discard(sid)
+            _pick_noack_sids.discard(sid)
+
+    @_socketio.on('pick_ack')
+    def _ws_on_pick_ack(data):
+        if isinstance(data, dict):
+            _ws_handle_pick_ack(request.sid, data)
+
+
+# /results 페이지 푸시 네임스페이스: 결과·예측픽·모양픽·계산기 상태 변경 시 서버가 먼저 알림. 연결 끊기면 페이지가 폴링으로 복귀
+RESULTS_WS_NAMESPACE = '/results'
+_results_ws_clients = 0
+
+
+def _ws_results_push(event, data):
+    """/results 네임스페이스 전체에 emit. 접속 탭 없으면 스킵."""
+    if not _HAS_SOCKETIO or not _socketio or _results_ws_clients <= 0:
+        return
+    try:
+        _socketio.emit(event, data, namespace=RESULTS_WS_NAMESPACE)
+    except Exception:
+        pass
+
+
+if _HAS_SOCKETIO:
+
+    @_socketio.on('connect', namespace=RESULTS_WS_NAMESPACE)
+    def _ws_results_connect(auth=None):
+        global _results_ws_clients
+        _results_ws_clients += 1
+        # 접속 직후 현재 상태 1회 전송 — 버전 다르면 페이지가 HTTP로 따라잡음
+        try:
+            enc = _results_encoded
+            if enc is not None:
+                _socketio.emit('results_update', {'version': enc['version'], 'etag': enc['etag']}, namespace=RESULTS_WS_NAMESPACE, to=request.sid)
+            if prediction_cache:
+                _socketio.emit('prediction_update', {'server_prediction': prediction_cache}, namespace=RESULTS_WS_NAMESPACE, to=request.sid)
+            sp_entry = _sf_cache.get('shape_pick')
+            if sp_entry and sp_entry[0] is not None:
+                _socketio.emit('shape_pick_update', sp_entry[0], namespace=RESULTS_WS_NAMESPACE, to=request.sid)
+        except Exception:
+            pass
+
+    @_socketio.on('disconnect', namespace=RESULTS_WS_NAMESPACE)
+    def _ws_results_disconnect(*args):
+        global _results_ws_clients
+        _results_ws_clients = max(0, _results_ws_clients - 1)
+
+
+@app.before_request
+def _perf_request_start():
+    request.environ['perf.t0'] = time.time()
+    if request.endpoint:
+        _sql_scope_begin(f'http_{request.endpoint}')
+
+
+@app.teardown_request
+def _sql_request_end(exc=None):
+    _sql_scope_end()
+
+
+@app.after_request
+def _perf_request_end(response):
+    """엔드포인트별 응답 시간 히스토그램 (http_<endpoint>)."""
+    t0 = request.environ.get('perf.t0')
+    if t0 is not None and request.endpoint:
+        _perf_log(f'http_{request.endpoint}', (time.time() - t0) * 1000)
+    return response
 
 
 @app.after_request
 def add_csp_allow_eval(response):
     """CSP: 'eval' 차단으로 스크립트 오동작 시 script-src에 unsafe-eval 허용."""
     if response.content_type and 'text/html' in response.content_type:
-        response.headers['Content-Security-Policy'] = "script-src 'self' 'unsafe-inline' 'unsafe-eval'; object-src 'self'; base-uri 'self'"
+        # cdn.socket.io는 Socket.IO 클라이언트 고정 사본이 없을 때만 (그때도 SRI integrity로 내용 고정)
+        cdn = ' https://cdn.socket.io' if _socketio_client_external else ''
+        response.headers['Content-Security-Policy'] = f"script-src 'self' 'unsafe-inline' 'unsafe-eval'{cdn}; object-src 'self'; base-uri 'self'"
     return response
 
 # 환경 변수
@@ -162,32 +409,424 @@ _log_throttle_last = {}
 # 값이 바뀔 때만 로그 (키 -> 마지막 값)
 _log_when_changed_last = {}
 
-# 병목 분석: PERF_PROFILE=1 환경변수 시 주요 구간 타이밍 로그 (5초마다 요약)
+# 성능 계측: 라벨별 고정 크기 로그 버킷 히스토그램(HDR 방식, 버킷 폭 8% — 기하 중점 보고로 상대 오차 ±~4%) + 최근 60초 초당 건수 링.
+# 메모리는 라벨 수에만 비례 — 운영에서도 켜 둠(PERF_HIST=0이면 끔). PERF_PROFILE=1이면 5초마다 p50/p95 요약 로그.
 _PERF_PROFILE = os.getenv('PERF_PROFILE', '').strip() in ('1', 'true', 'yes')
-_PERF_TIMES = {}  # label -> [ms, ms, ...]
+PERF_HIST_ENABLED = os.getenv('PERF_HIST', '1').strip() not in ('0', 'false', 'no')
+_PERF_BUCKET_MIN_MS = 0.01
+_PERF_BUCKET_GROWTH = 1.08
+_PERF_BUCKET_LOG = math.log(_PERF_BUCKET_GROWTH)
+_PERF_BUCKETS = 200  # 0.01ms ~ 약 44초, 그 이상은 마지막 버킷
+_PERF_RATE_SLOTS = 60
+_perf_lock = threading.Lock()
+_PERF_HIST = {}  # label -> {'buckets', 'count', 'sum', 'max', 'min', 'last', 'rate', 'rate_at', 'since'}
 _PERF_LAST_SUMMARY = 0
+_perf_local = threading.local()
+
+
+def _perf_bucket(ms):
+    if ms <= _PERF_BUCKET_MIN_MS:
+        return 0
+    return min(_PERF_BUCKETS - 1, int(math.log(ms / _PERF_BUCKET_MIN_MS) / _PERF_BUCKET_LOG) + 1)
+
+
+def _perf_percentile(h, q):
+    """버킷 누적으로 q분위 근사값. 버킷 i는 (MIN*g^(i-1), MIN*g^i] 구간이므로 기하 중점 MIN*g^(i-0.5)를
+    돌려줌(상한을 쓰면 최대 8% 과대) — 관측 최소/최대값으로 클램프."""
+    if not h['count']:
+        return None
+    target = q * h['count']
+    acc = 0
+    for i, n in enumerate(h['buckets']):
+        acc += n
+        if n and acc >= target:
+            mid = _PERF_BUCKET_MIN_MS * (_PERF_BUCKET_GROWTH ** (i - 0.5)) if i else _PERF_BUCKET_MIN_MS
+            return max(h['min'], min(h['max'], mid))
+    return h['max']
+
 
 def _perf_start(label):
-    if not _PERF_PROFILE:
+    if not PERF_HIST_ENABLED:
         return
-    _PERF_TIMES.setdefault(label, []).append(-time.time())
+    if not hasattr(_perf_local, 'starts'):
+        _perf_local.starts = {}
+    _perf_local.starts[label] = time.time()
 
 def _perf_end(label):
-    if not _PERF_PROFILE:
-        return
-    if label in _PERF_TIMES and _PERF_TIMES[label] and _PERF_TIMES[label][-1] < 0:
-        _PERF_TIMES[label][-1] = (time.time() + _PERF_TIMES[label][-1]) * 1000
+    starts = getattr(_perf_local, 'starts', None)
+    t0 = starts.pop(label, None) if starts else None
+    if t0 is not None:
+        _perf_log(label, (time.time() - t0) * 1000)
 
 def _perf_log(label, ms):
-    if not _PERF_PROFILE:
+    if not PERF_HIST_ENABLED:
         return
-    _PERF_TIMES.setdefault(label, []).append(ms)
     global _PERF_LAST_SUMMARY
     now = time.time()
-    if now - _PERF_LAST_SUMMARY >= 5:
+    sec = int(now)
+    slot = sec % _PERF_RATE_SLOTS
+    with _perf_lock:
+        h = _PERF_HIST.get(label)
+        if h is None:
+            h = _PERF_HIST[label] = {
+                'buckets': [0] * _PERF_BUCKETS, 'count': 0, 'sum': 0.0, 'max': 0.0, 'min': None, 'last': 0.0,
+                'rate': [0] * _PERF_RATE_SLOTS, 'rate_at': [0] * _PERF_RATE_SLOTS, 'since': now,
+            }
+        h['buckets'][_perf_bucket(ms)] += 1
+        h['count'] += 1
+        h['sum'] += ms
+        h['last'] = ms
+        if ms > h['max']:
+            h['max'] = ms
+        if h['min'] is None or ms < h['min']:
+            h['min'] = ms
+        if h['rate_at'][slot] != sec:
+            h['rate_at'][slot] = sec
+            h['rate'][slot] = 0
+        h['rate'][slot] += 1
+    if _PERF_PROFILE and now - _PERF_LAST_SUMMARY >= 5:
         _PERF_LAST_SUMMARY = now
-        top = sorted([(k, sum(v)/max(1,len(v))) for k, v in _PERF_TIMES.items() if v], key=lambda x: -x[1])[:10]
-        print("[⏱ 병목] " + ", ".join(f"{k}:{v:.0f}ms" for k, v in top))
+        snap = _perf_snapshot()
+        top = sorted(snap.items(), key=lambda kv: -(kv[1]['p95'] or 0))[:10]
+        print("[⏱ 병목] " + ", ".join(f"{k}:p50 {v['p50']:.0f}/p95 {v['p95']:.0f}ms" for k, v in top))
+
+
+@contextlib.contextmanager
+def _perf_span(label):
+    """with _perf_span('라벨'): 구간 소요(ms)를 히스토그램에 기록."""
+    t0 = time.time()
+    try:
+        yield
+    finally:
+        _perf_log(label, (time.time() - t0) * 1000)
+
+
+def _perf_timed(label=None):
+    """핫 함수 계측 데코레이터. label 생략 시 함수 이름."""
+    def deco(fn):
+        name = label or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PERF_HIST_ENABLED:
+                return fn(*args, **kwargs)
+            t0 = time.time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _perf_log(name, (time.time() - t0) * 1000)
+        return wrapper
+    return deco
+
+
+def _perf_snapshot(prefix=None):
+    """라벨별 count·mean·p50/p95/p99·min/max·최근 1/10/60초 초당 건수 (디버그 API·요약 로그용)."""
+    now_sec = int(time.time())
+    out = {}
+    with _perf_lock:
+        items = [(k, v) for k, v in _PERF_HIST.items() if not prefix or k.startswith(prefix)]
+        for label, h in items:
+            def recent(window):
+                n = sum(c for c, at in zip(h['rate'], h['rate_at']) if now_sec - window < at <= now_sec)
+                return round(n / float(window), 2)
+            out[label] = {
+                'count': h['count'],
+                'mean': round(h['sum'] / h['count'], 3) if h['count'] else None,
+                'p50': _perf_percentile(h, 0.50),
+                'p95': _perf_percentile(h, 0.95),
+                'p99': _perf_percentile(h, 0.99),
+                'min': h['min'],
+                'max': h['max'],
+                'last': h['last'],
+                'rate_1s': recent(1),
+                'rate_10s': recent(10),
+                'rate_60s': recent(60),
+                'since': h['since'],
+            }
+    for v in out.values():
+        for k in ('p50', 'p95', 'p99', 'min', 'max', 'last'):
+            if v[k] is not None:
+                v[k] = round(v[k], 3)
+    return out
+
+
+def _perf_reset():
+    with _perf_lock:
+        _PERF_HIST.clear()
+
+# SQL 프로파일러: psycopg2 connection_factory로 모든 execute를 문장 템플릿(리터럴→?)별로 집계(횟수·지연 히스토그램·행 수).
+# 스케줄러 틱·HTTP 요청 단위 범위(scope)에 쿼리 수·연결 수를 귀속하고, 범위별 예산(SQL_QUERY_BUDGETS) 초과를 기록. SQL_PROFILE=0이면 끔.
+SQL_PROFILE_ENABLED = DB_AVAILABLE and os.getenv('SQL_PROFILE', '1').strip() not in ('0', 'false', 'no')
+SQL_QUERY_BUDGETS = {
+    'scheduler_apply': 60,
+    'refresh_results_background': 80,
+    'http_get_results': 10,
+    'http_api_macro_data': 3,
+    'http_api_current_pick_relay': 3,
+}
+for _item in os.getenv('SQL_QUERY_BUDGETS', '').split(','):
+    if '=' in _item:
+        _k, _v = _item.split('=', 1)
+        try:
+            SQL_QUERY_BUDGETS[_k.strip()] = int(_v)
+        except ValueError:
+            pass
+_sql_lock = threading.Lock()
+_SQL_TEMPLATES = {}  # 템플릿 -> {'count', 'sum', 'max', 'buckets', 'rows', 'scopes': {scope: count}}
+_SQL_SCOPES = {}     # scope -> {'runs', 'queries_sum', 'queries_max', 'connects_sum', 'ms_sum', 'violations', 'last', 'last_violation'}
+_sql_template_cache = {}
+_SQL_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def _sql_template(query):
+    """SQL 문자열 → 템플릿 (공백 정리, 문자열·숫자 리터럴 → ?). 같은 문자열은 캐시."""
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    query = str(query)
+    t = _sql_template_cache.get(query)
+    if t is None:
+        t = _SQL_LITERAL_RE.sub('?', ' '.join(query.split()))[:240]
+        if len(_sql_template_cache) < 2048:
+            _sql_template_cache[query] = t
+    return t
+
+
+def _sql_record(query, ms, rows):
+    tmpl = _sql_template(query)
+    scope = getattr(_perf_local, 'sql_scope', None)
+    scope_name = scope['name'] if scope is not None else '-'
+    if scope is not None:
+        scope['queries'] += 1
+        scope['ms'] += ms
+        scope['templates'][tmpl] = scope['templates'].get(tmpl, 0) + 1
+    with _sql_lock:
+        st = _SQL_TEMPLATES.get(tmpl)
+        if st is None:
+            st = _SQL_TEMPLATES[tmpl] = {'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * _PERF_BUCKETS, 'rows': 0, 'scopes': {}}
+        st['count'] += 1
+        st['sum'] += ms
+        if ms > st['max']:
+            st['max'] = ms
+        st['buckets'][_perf_bucket(ms)] += 1
+        if rows is not None and rows > 0:
+            st['rows'] += rows
+        st['scopes'][scope_name] = st['scopes'].get(scope_name, 0) + 1
+
+
+if SQL_PROFILE_ENABLED:
+    import psycopg2.extensions
+
+    class _ProfiledCursorMixin(object):
+        def execute(self, query, vars=None):
+            t0 = time.perf_counter()
+            try:
+                return super(_ProfiledCursorMixin, self).execute(query, vars)
+            finally:
+                _sql_record(query, (time.perf_counter() - t0) * 1000, self.rowcount)
+
+        def executemany(self, query, vars_list):
+            t0 = time.perf_counter()
+            try:
+                return super(_ProfiledCursorMixin, self).executemany(query, vars_list)
+            finally:
+                _sql_record(query, (time.perf_counter() - t0) * 1000, self.rowcount)
+
+    _profiled_cursor_classes = {}
+
+    def _profiled_cursor_class(base):
+        cls = _profiled_cursor_classes.get(base)
+        if cls is None:
+            cls = _profiled_cursor_classes[base] = type('Profiled' + base.__name__, (_ProfiledCursorMixin, base), {})
+        return cls
+
+    class _ProfiledConnection(psycopg2.extensions.connection):
+        """cursor(cursor_factory=RealDictCursor 등)도 계측 믹스인을 씌워 반환. 연결 생성 수는 현재 범위에 귀속."""
+
+        def __init__(self, *args, **kwargs):
+            super(_ProfiledConnection, self).__init__(*args, **kwargs)
+            scope = getattr(_perf_local, 'sql_scope', None)
+            if scope is not None:
+                scope['connects'] += 1
+
+        def cursor(self, *args, **kwargs):
+            base = kwargs.get('cursor_factory') or self.cursor_factory or psycopg2.extensions.cursor
+            kwargs['cursor_factory'] = _profiled_cursor_class(base)
+            return super(_ProfiledConnection, self).cursor(*args, **kwargs)
+
+    _SQL_CONNECT_KW = {'connection_factory': _ProfiledConnection}
+else:
+    _SQL_CONNECT_KW = {}
+
+
+def _sql_scope_begin(name):
+    """현재 스레드에 쿼리 귀속 범위 시작. 이미 범위 안이면(중첩) 바깥 범위 유지하고 False."""
+    if not SQL_PROFILE_ENABLED or getattr(_perf_local, 'sql_scope', None) is not None:
+        return False
+    _perf_local.sql_scope = {'name': name, 'queries': 0, 'connects': 0, 'ms': 0.0, 'templates': {}, 't0': time.time()}
+    return True
+
+
+def _sql_scope_end():
+    """범위 종료: 범위별 쿼리·연결 수 누적, 예산 초과 시 위반 기록(상위 템플릿 포함)."""
+    scope = getattr(_perf_local, 'sql_scope', None)
+    _perf_local.sql_scope = None
+    if scope is None:
+        return
+    name, q = scope['name'], scope['queries']
+    budget = SQL_QUERY_BUDGETS.get(name)
+    with _sql_lock:
+        st = _SQL_SCOPES.get(name)
+        if st is None:
+            st = _SQL_SCOPES[name] = {'runs': 0, 'queries_sum': 0, 'queries_max': 0, 'connects_sum': 0, 'connects_max': 0,
+                                      'ms_sum': 0.0, 'violations': 0, 'last': None, 'last_violation': None}
+        st['runs'] += 1
+        st['queries_sum'] += q
+        st['queries_max'] = max(st['queries_max'], q)
+        st['connects_sum'] += scope['connects']
+        st['connects_max'] = max(st['connects_max'], scope['connects'])
+        st['ms_sum'] += scope['ms']
+        st['last'] = {'queries': q, 'connects': scope['connects'], 'sql_ms': round(scope['ms'], 2)}
+        over = budget is not None and q > budget
+        if over:
+            st['violations'] += 1
+            top = sorted(scope['templates'].items(), key=lambda kv: -kv[1])[:10]
+            st['last_violation'] = {'at': scope['t0'], 'queries': q, 'budget': budget, 'top_templates': [{'sql': t, 'count': n} for t, n in top]}
+    if over:
+        _log_throttle(('sql_budget', name), 60, f"[SQL 예산 초과] {name}: {q}건 > {budget}건")
+
+
+@contextlib.contextmanager
+def _sql_scope(name):
+    """with _sql_scope('이름'): 블록 안 쿼리를 이 범위에 귀속."""
+    started = _sql_scope_begin(name)
+    try:
+        yield
+    finally:
+        if started:
+            _sql_scope_end()
+
+
+def _sql_scoped(name):
+    """함수 전체를 SQL 범위로 감싸는 데코레이터 (스케줄러 틱 등)."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _sql_scope(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def _sql_snapshot(top=50):
+    """템플릿별(총 지연 순 상위 top) 횟수·지연 분포·행 수 + 범위별 쿼리 수·예산 위반."""
+    with _sql_lock:
+        tmpls = sorted(_SQL_TEMPLATES.items(), key=lambda kv: -kv[1]['sum'])[:top]
+        templates = [{
+            'sql': t,
+            'count': st['count'],
+            'total_ms': round(st['sum'], 2),
+            'mean_ms': round(st['sum'] / st['count'], 3) if st['count'] else None,
+            'p50_ms': round(_perf_percentile(st, 0.50), 3),
+            'p95_ms': round(_perf_percentile(st, 0.95), 3),
+            'p99_ms': round(_perf_percentile(st, 0.99), 3),
+            'max_ms': round(st['max'], 3),
+            'rows_total': st['rows'],
+            'rows_mean': round(st['rows'] / st['count'], 2) if st['count'] else None,
+            'scopes': dict(st['scopes']),
+        } for t, st in tmpls]
+        scopes = {}
+        for name, st in _SQL_SCOPES.items():
+            runs = st['runs'] or 1
+            scopes[name] = {
+                'runs': st['runs'],
+                'queries_mean': round(st['queries_sum'] / runs, 2),
+                'queries_max': st['queries_max'],
+                'connects_mean': round(st['connects_sum'] / runs, 2),
+                'connects_max': st['connects_max'],
+                'sql_ms_mean': round(st['ms_sum'] / runs, 2),
+                'budget': SQL_QUERY_BUDGETS.get(name),
+                'violations': st['violations'],
+                'last': st['last'],
+                'last_violation': st['last_violation'],
+            }
+        return {'enabled': SQL_PROFILE_ENABLED, 'templates_total': len(_SQL_TEMPLATES), 'templates': templates, 'scopes': scopes}
+
+
+def _sql_reset():
+    with _sql_lock:
+        _SQL_TEMPLATES.clear()
+        _SQL_SCOPES.clear()
+
+
+# 회차 지연 추적: 결과 회차 R 기준 단계별 최초 시각(epoch 초). feed_seen(result.json 첫 수신) → db_ingest → apply_done
+# → relay_update(R+1 픽 relay 반영) → ws_emit → macro_ack(웹소켓 ack) → macro_recv/macro_tap(매크로 보고). 최근 ROUND_TRACE_KEEP 회차만.
+ROUND_TRACE_KEEP = int(os.getenv('ROUND_TRACE_KEEP', '300'))
+ROUND_TRACE_STAGES = ('feed_seen', 'db_ingest', 'apply_done', 'relay_update', 'ws_emit', 'macro_ack', 'macro_recv', 'macro_tap')
+_ROUND_TRACE_OPENERS = ('feed_seen', 'db_ingest', 'apply_done')  # 이 단계만 새 회차 항목 생성 (뒤 단계는 있는 항목에만 기록)
+_round_trace_lock = threading.Lock()
+_round_traces = {}  # 결과 회차(int) -> {stage: 시각}
+
+
+def _trace_round(round_id, stage, ts=None):
+    """회차 단계 최초 시각 기록. 이미 기록된 단계는 유지(첫 도달 시각)."""
+    try:
+        rid = int(round_id)
+    except (TypeError, ValueError):
+        return
+    now = ts if ts is not None else time.time()
+    with _round_trace_lock:
+        t = _round_traces.get(rid)
+        if t is None:
+            if stage not in _ROUND_TRACE_OPENERS:
+                return
+            t = _round_traces[rid] = {}
+            while len(_round_traces) > ROUND_TRACE_KEEP:
+                del _round_traces[next(iter(_round_traces))]
+        if stage not in t:
+            t[stage] = now
+
+
+def _latest_round_of(results):
+    """결과 목록 앞부분에서 가장 큰 회차 번호 (정렬 여부 무관)."""
+    best = None
+    for r in (results or [])[:20]:
+        m = re.search(r'\d+', str(r.get('gameID') or ''))
+        if m:
+            n = int(m.group())
+            if best is None or n > best:
+                best = n
+    return best
+
+
+def _round_latency_snapshot(n=100):
+    """최근 n회차의 feed_seen 기준 단계별 지연(ms) 분포 + 최근 회차별 원자료."""
+    with _round_trace_lock:
+        rows = [(rid, dict(t)) for rid, t in sorted(_round_traces.items())[-n:]]
+    per_stage = {st: [] for st in ROUND_TRACE_STAGES if st != 'feed_seen'}
+    recent = []
+    for rid, t in rows:
+        base = t.get('feed_seen')
+        row = {'round': rid}
+        for st in ROUND_TRACE_STAGES:
+            if st == 'feed_seen' or st not in t or base is None:
+                continue
+            ms = round((t[st] - base) * 1000, 1)
+            per_stage[st].append(ms)
+            row[st] = ms
+        recent.append(row)
+
+    def dist(vals):
+        if not vals:
+            return {'count': 0}
+        v = sorted(vals)
+        pick = lambda q: v[min(len(v) - 1, int(q * len(v)))]
+        return {'count': len(v), 'p50': pick(0.5), 'p95': pick(0.95), 'p99': pick(0.99), 'max': v[-1]}
+    return {
+        'rounds': len(rows),
+        'from_feed_seen_ms': {st: dist(vals) for st, vals in per_stage.items()},
+        'recent': recent[-20:],
+    }
+
 
 def _log_throttle(key, interval_sec, message):
     """같은 key로 interval_sec 초에 한 번만 출력."""
@@ -203,6 +842,162 @@ def _log_when_changed(key, value, message_fn):
         _log_when_changed_last[key] = value
         print(message_fn(value))
 
+
+# 백그라운드 작업 실행기: 핫패스(0.1초 스케줄러·/api/results·relay POST)마다 Thread를 새로 만들지 않고
+# 고정 워커 N개가 처리. 같은 key 작업은 대기 중 1건만 유지(latest wins), 실행 중이면 끝난 뒤 1회만 재실행.
+BG_TASK_WORKERS = int(os.getenv('BG_TASK_WORKERS', '4'))
+BG_TASK_QUEUE_MAX = int(os.getenv('BG_TASK_QUEUE_MAX', '64'))  # 대기 key 상한 — 초과 시 submit 거절(backpressure)
+_bg_task_cond = threading.Condition()
+_bg_task_order = deque()   # 실행 대기 key 순서
+_bg_task_pending = {}      # key -> (kind, fn, args, kwargs, enqueued_at)
+_bg_task_running = set()   # 실행 중 key — 같은 key 동시 실행 금지
+_bg_task_stats = {}        # kind -> 카운터·지연(ms)
+_bg_task_workers = []
+
+
+def _bg_task_stat(kind):
+    st = _bg_task_stats.get(kind)
+    if st is None:
+        st = {'submitted': 0, 'coalesced': 0, 'rejected': 0, 'done': 0, 'failed': 0,
+              'wait_ms_sum': 0.0, 'wait_ms_max': 0.0, 'run_ms_sum': 0.0, 'run_ms_max': 0.0, 'last_run_at': None}
+        _bg_task_stats[kind] = st
+    return st
+
+
+def _bg_submit(kind, fn, *args, key=None, **kwargs):
+    """백그라운드 작업 등록. kind=작업 종류(지표 단위), key=병합 단위(기본 kind).
+    같은 key가 이미 대기 중이면 인자만 최신으로 교체. 대기열이 꽉 차면 False 반환(호출자는 다음 주기에 재시도)."""
+    key = key or kind
+    with _bg_task_cond:
+        if len(_bg_task_workers) < BG_TASK_WORKERS:
+            for i in range(len(_bg_task_workers), BG_TASK_WORKERS):
+                t = threading.Thread(target=_bg_task_worker_loop, name=f'bg-task-{i}', daemon=True)
+                _bg_task_workers.append(t)
+                t.start()
+        st = _bg_task_stat(kind)
+        st['submitted'] += 1
+        prev = _bg_task_pending.get(key)
+        if prev is not None:
+            _bg_task_pending[key] = (kind, fn, args, kwargs, prev[4])  # 대기 시간은 최초 등록 기준
+            st['coalesced'] += 1
+            return True
+        if len(_bg_task_pending) >= BG_TASK_QUEUE_MAX:
+            st['rejected'] += 1
+            _log_throttle('bg_task_rejected', 10, f"[경고] 백그라운드 대기열 포화({BG_TASK_QUEUE_MAX}) — {kind} 거절")
+            return False
+        _bg_task_pending[key] = (kind, fn, args, kwargs, time.time())
+        if key not in _bg_task_running:
+            _bg_task_order.append(key)
+            _bg_task_cond.notify()
+        return True
+
+
+def _bg_task_worker_loop():
+    while True:
+        with _bg_task_cond:
+            while not _bg_task_order:
+                _bg_task_cond.wait()
+            key = _bg_task_order.popleft()
+            item = _bg_task_pending.pop(key, None)
+            if item is None:
+                continue
+            _bg_task_running.add(key)
+        kind, fn, args, kwargs, enqueued_at = item
+        t0 = time.time()
+        failed = False
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            failed = True
+            print(f"[경고] 백그라운드 작업 {kind} 오류: {str(e)[:100]}")
+        t1 = time.time()
+        wait_ms = (t0 - enqueued_at) * 1000
+        run_ms = (t1 - t0) * 1000
+        with _bg_task_cond:
+            _bg_task_running.discard(key)
+            st = _bg_task_stat(kind)
+            st['failed' if failed else 'done'] += 1
+            st['wait_ms_sum'] += wait_ms
+            st['wait_ms_max'] = max(st['wait_ms_max'], wait_ms)
+            st['run_ms_sum'] += run_ms
+            st['run_ms_max'] = max(st['run_ms_max'], run_ms)
+            st['last_run_at'] = t1
+            # 실행 중 들어온 같은 key 작업은 지금 대기열에 올림 (1건만)
+            if key in _bg_task_pending:
+                _bg_task_order.append(key)
+                _bg_task_cond.notify()
+        _perf_log(f'bg_{kind}', run_ms)
+
+
+def _bg_task_snapshot():
+    """실행기 상태·작업 종류별 지표 (디버그 API용)."""
+    with _bg_task_cond:
+        kinds = {}
+        for kind, st in _bg_task_stats.items():
+            n = st['done'] + st['failed']
+            kinds[kind] = {
+                'submitted': st['submitted'], 'coalesced': st['coalesced'], 'rejected': st['rejected'],
+                'done': st['done'], 'failed': st['failed'],
+                'wait_ms_avg': round(st['wait_ms_sum'] / n, 2) if n else None,
+                'wait_ms_max': round(st['wait_ms_max'], 2),
+                'run_ms_avg': round(st['run_ms_sum'] / n, 2) if n else None,
+                'run_ms_max': round(st['run_ms_max'], 2),
+                'last_run_at': st['last_run_at'],
+            }
+        return {
+            'workers': len(_bg_task_workers),
+            'queue_max': BG_TASK_QUEUE_MAX,
+            'queue_depth': len(_bg_task_pending),
+            'running': sorted(str(k) for k in _bg_task_running),
+            'kinds': kinds,
+        }
+
+
+# 단일 비행(single-flight): 같은 key 빌드가 이미 진행 중이면 새로 빌드하지 않고 그 결과를 기다려 공유 (캐시 만료 순간 동시 요청 폭주 방지)
+_sf_lock = threading.Lock()
+_sf_inflight = {}  # key -> {'event': Event, 'result': 값}
+_sf_cache = {}     # key -> (값, 빌드 시각) — _cached_single_flight 전용
+
+
+def _single_flight(key, build_fn):
+    """key별 진행 중 빌드 1건만 실행. 뒤따른 호출은 완료까지(최대 SINGLE_FLIGHT_WAIT_SEC) 기다려 같은 결과 반환. 빌드 실패 시 None."""
+    with _sf_lock:
+        call = _sf_inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _sf_inflight[key] = {'event': threading.Event(), 'result': None}
+    if not leader:
+        call['event'].wait(SINGLE_FLIGHT_WAIT_SEC)
+        return call['result']
+    try:
+        call['result'] = build_fn()
+    finally:
+        with _sf_lock:
+            _sf_inflight.pop(key, None)
+        call['event'].set()
+    return call['result']
+
+
+def _sf_refresh(key, build_fn):
+    val = _single_flight(key, build_fn)
+    if val is not None:
+        _sf_cache[key] = (val, time.time())
+    return val
+
+
+def _cached_single_flight(key, build_fn, fresh_sec, stale_sec=0.0):
+    """fresh_sec 이내 값은 즉시 반환. 그 뒤 stale_sec 동안은 직전 값을 즉시 반환하고 재빌드는 백그라운드 1건(stale-while-revalidate).
+    그보다 오래됐거나 값이 없으면 single-flight 빌드를 기다림."""
+    ent = _sf_cache.get(key)
+    if ent is not None:
+        age = time.time() - ent[1]
+        if age < fresh_sec:
+            return ent[0]
+        if age < fresh_sec + stale_sec:
+            _bg_submit('swr_rebuild', _sf_refresh, key, build_fn, key=f'swr:{key}')
+            return ent[0]
+    return _sf_refresh(key, build_fn)
+
 # 데이터베이스 연결 및 초기화
 def init_database():
     """데이터베이스 테이블 생성 및 초기화"""
@@ -211,9 +1006,13 @@ def init_database():
         return False
     
     try:
-        conn = psycopg2.connect(DATABASE_URL, connect_timeout=5)
+        conn = psycopg2.connect(DATABASE_URL, connect_timeout=5, **_SQL_CONNECT_KW)
         cur = conn.cursor()
         
+        if GAME_RESULTS_PARTITIONED:
+            # 파티션 모드: 아래 CREATE TABLE IF NOT EXISTS는 건너뛰어지고 인덱스만 부모(파티션 테이블)에 생성됨
+            _init_partitioned_results(cur)
+        
         # game_results 테이블 생성
         cur.execute('''
             CREATE TABLE IF NOT EXISTS game_results (
@@ -327,7 +1126,9 @@ def init_database():
             if cur.fetchone() is None:
                 cur.execute('ALTER TABLE current_pick ADD COLUMN running BOOLEAN DEFAULT true')
                 cur.execute('UPDATE current_pick SET running = true WHERE running IS NULL')
+            current_pick_ok = True
         except Exception as ex:
+            current_pick_ok = False
             print(f"[경고] current_pick 테이블 생성/초기화 건너뜀 (서버는 계속 기동): {str(ex)[:100]}")
         
         # macro_pick_transmit: 매크로 전송 전용 — 1행 계산 후 여기만 씀. relay는 여기서만 읽음 (이중/삼중 출처 제거)
@@ -398,10 +1199,45 @@ def init_database():
                 except Exception as alter_err:
                     if 'already exists' not in str(alter_err).lower():
                         print(f"[경고] shape_win_stats 컬럼 추가: {str(alter_err)[:100]}")
+        # win_rate_bucket_stats: /api/win-rate-buckets 집계(합산승률 5% 구간 × 승/패). save_prediction_record가 증감으로 유지
+        # scope: all(전체, period 0) / block(round_num // WIN_RATE_BUCKET_BLOCK) / hour(created_at epoch 시) — 최근 N회차·K시간 창 합산용
+        cur.execute('''
+            CREATE TABLE IF NOT EXISTS win_rate_bucket_stats (
+                scope VARCHAR(8) NOT NULL,
+                period BIGINT NOT NULL,
+                bucket SMALLINT NOT NULL,
+                wins INTEGER NOT NULL DEFAULT 0,
+                losses INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (scope, period, bucket)
+            )
+        ''')
+        cur.execute('SELECT EXISTS (SELECT 1 FROM win_rate_bucket_stats)')
+        if not cur.fetchone()[0]:
+            try:
+                cur.execute('SAVEPOINT win_rate_bucket_rebuild')
+                _rebuild_win_rate_bucket_stats(cur)  # 처음 만들었으면 기존 이력으로 1회 채움
+                cur.execute('RELEASE SAVEPOINT win_rate_bucket_rebuild')
+            except Exception as rb_err:
+                cur.execute('ROLLBACK TO SAVEPOINT win_rate_bucket_rebuild')
+                print(f"[경고] win_rate_bucket_stats 초기 집계 실패: {str(rb_err)[:100]}")
+        # app_state_snapshot: 다중 워커 공유 상태(리더의 결과·예측픽 캐시, 워커별 relay 변경). version은 전역 시퀀스 값
+        cur.execute('CREATE SEQUENCE IF NOT EXISTS app_state_version_seq')
+        cur.execute('''
+            CREATE TABLE IF NOT EXISTS app_state_snapshot (
+                key VARCHAR(32) PRIMARY KEY,
+                version BIGINT NOT NULL,
+                origin VARCHAR(80),
+                payload TEXT NOT NULL,
+                updated_at TIMESTAMPTZ DEFAULT NOW()
+            )
+        ''')
         
         conn.commit()
         cur.close()
         conn.close()
+        if current_pick_ok:
+            global _pick_tables_ready
+            _pick_tables_ready = True  # 이후 픽 쓰기에서 current_pick·macro_pick_transmit DDL 생략
         print("[✅] 데이터베이스 테이블 초기화 완료")
         return True
     except Exception as e:
@@ -467,7 +1303,7 @@ def get_db_connection(statement_timeout_sec=None):
     if not DB_AVAILABLE or not DATABASE_URL:
         return None
     try:
-        conn = psycopg2.connect(DATABASE_URL, connect_timeout=5)
+        conn = psycopg2.connect(DATABASE_URL, connect_timeout=5, **_SQL_CONNECT_KW)
         if statement_timeout_sec is not None and statement_timeout_sec > 0:
             try:
                 cur = conn.cursor()
@@ -493,6 +1329,7 @@ def save_game_result(game_data):
         cur = conn.cursor()
         
         # 중복 체크 후 저장
+        _note_game_round(game_data.get('gameID'))
         cur.execute('''
             INSERT INTO game_results 
             (game_id, result, hi, lo, red, black, jqka, joker, hash_value, salt_value)
@@ -575,6 +1412,12 @@ def save_prediction_record(round_num, predicted, actual, probability=None, pick_
                 pass
         
         cur = conn.cursor()
+        # 덮어쓰기(ON CONFLICT UPDATE)면 기존 행의 구간 집계 기여분을 빼야 하므로 먼저 읽어 둠
+        cur.execute('''
+            SELECT predicted, actual, blended_win_rate, FLOOR(EXTRACT(EPOCH FROM created_at) / 3600)::bigint
+            FROM prediction_history WHERE round_num = %s FOR UPDATE
+        ''', (int(round_num),))
+        old_row = cur.fetchone()
         if prediction_details or shape_pred or shape_pick_val or pong_pick_val:
             cur.execute('''
                 INSERT INTO prediction_history (round_num, predicted, actual, probability, pick_color, blended_win_rate, rate_15, rate_30, rate_100, prediction_details, shape_predicted, shape_pick, pong_pick)
@@ -587,6 +1430,7 @@ def save_prediction_record(round_num, predicted, actual, probability=None, pick_
                     shape_pick = COALESCE(EXCLUDED.shape_pick, prediction_history.shape_pick),
                     pong_pick = COALESCE(EXCLUDED.pong_pick, prediction_history.pong_pick),
                     created_at = DEFAULT
+                RETURNING FLOOR(EXTRACT(EPOCH FROM created_at) / 3600)::bigint
             ''', (int(round_num), str(predicted), str(actual), float(probability) if probability is not None else None, str(pick_color) if pick_color else None,
                  round(blended_val, 1) if blended_val is not None else None, round(r15_val, 1) if r15_val is not None else None, round(r30_val, 1) if r30_val is not None else None, round(r100_val, 1) if r100_val is not None else None,
                  prediction_details, str(shape_pred) if shape_pred in ('정', '꺽') else None, str(shape_pick_val) if shape_pick_val in ('정', '꺽') else None, str(pong_pick_val) if pong_pick_val in ('정', '꺽') else None))
@@ -597,11 +1441,19 @@ def save_prediction_record(round_num, predicted, actual, probability=None, pick_
                 ON CONFLICT (round_num) DO UPDATE SET predicted = EXCLUDED.predicted, actual = EXCLUDED.actual,
                     probability = EXCLUDED.probability, pick_color = EXCLUDED.pick_color,
                     blended_win_rate = EXCLUDED.blended_win_rate, rate_15 = EXCLUDED.rate_15, rate_30 = EXCLUDED.rate_30, rate_100 = EXCLUDED.rate_100, created_at = DEFAULT
+                RETURNING FLOOR(EXTRACT(EPOCH FROM created_at) / 3600)::bigint
             ''', (int(round_num), str(predicted), str(actual), float(probability) if probability is not None else None, str(pick_color) if pick_color else None,
                  round(blended_val, 1) if blended_val is not None else None, round(r15_val, 1) if r15_val is not None else None, round(r30_val, 1) if r30_val is not None else None, round(r100_val, 1) if r100_val is not None else None))
+        new_hour = cur.fetchone()[0]
+        delta = []
+        if old_row:
+            delta += _win_rate_bucket_rows(old_row[0], old_row[1], old_row[2], round_num, old_row[3], -1)
+        delta += _win_rate_bucket_rows(str(predicted), str(actual), round(blended_val, 1) if blended_val is not None else None, round_num, new_hour, 1)
+        _apply_win_rate_bucket_delta(cur, delta, prune=int(round_num) % WIN_RATE_BUCKET_BLOCK == 0)
         conn.commit()
         cur.close()
         conn.close()
+        _loss_analytics_on_saved(round_num, predicted, actual, probability)
         return True
     except Exception as e:
         print(f"[❌ 오류] 예측 기록 저장 실패: {str(e)[:200]}")
@@ -1150,6 +2002,8 @@ def _trim_shape_tables(conn):
 _calc_state_memory = {}
 # GET /api/calc-state 응답 속도: save 직후 150ms 이내 요청 시 DB 생략
 _calc_state_get_cache = {}  # session_id -> (state_dict, timestamp)
+_calc_state_push_sig = {}  # session_id -> 마지막으로 알린 상태 해시 (/results 푸시 중복 방지)
+_calc_state_push_version = 0
 
 
 def _fast_copy_calc_state(state):
@@ -1173,6 +2027,7 @@ def get_calc_state(session_id):
     if not session_id:
         return None
     sk = str(session_id)[:64]
+    _shared_pull(f'calc:{sk}')  # 다른 워커가 방금 저장한 상태 (같은 호스트)
     now = time.time()
     if sk in _calc_state_get_cache:
         cached, ts = _calc_state_get_cache[sk]
@@ -1202,6 +2057,7 @@ CALC_HISTORY_MAX = 1000  # 시간 경과 시 점점 느려지는 현상 방지.
 
 def save_calc_state(session_id, state_dict):
     """계산기 세션 상태 저장. statement_timeout으로 먹통 방지."""
+    global _calc_state_push_version
     if not session_id:
         return False
     sk = str(session_id)[:64]
@@ -1218,6 +2074,14 @@ def save_calc_state(session_id, state_dict):
                 to_save[cid] = c if not isinstance(c, dict) else dict(c)
     _calc_state_memory[sk] = to_save
     _calc_state_get_cache[sk] = (to_save, time.time())
+    state_json = json.dumps(to_save)
+    _state_publish(f'calc:{sk}', state_json)
+    # 내용이 바뀐 경우에만 /results 탭에 버전 알림 → 탭이 calc-state GET (150ms 폴링 대체)
+    sig = hash(state_json)
+    if _calc_state_push_sig.get(sk) != sig:
+        _calc_state_push_sig[sk] = sig
+        _calc_state_push_version += 1
+        _ws_results_push('calc_state_update', {'session_id': sk, 'version': _calc_state_push_version})
     if DB_AVAILABLE and DATABASE_URL:
         conn = get_db_connection(statement_timeout_sec=5)
         if conn:
@@ -1227,7 +2091,7 @@ def save_calc_state(session_id, state_dict):
                     INSERT INTO calc_sessions (session_id, state_json, updated_at)
                     VALUES (%s, %s, CURRENT_TIMESTAMP)
                     ON CONFLICT (session_id) DO UPDATE SET state_json = EXCLUDED.state_json, updated_at = CURRENT_TIMESTAMP
-                ''', (sk, json.dumps(to_save)))
+                ''', (sk, state_json))
                 conn.commit()
                 cur.close()
                 conn.close()
@@ -1311,6 +2175,7 @@ def _get_all_calc_session_ids():
 def _get_all_calc_states():
     """모든 계산기 세션 상태를 한 번에 조회 (N+1 제거). 반환: {session_id: state_dict}. 메모리(POST 최신) 우선."""
     out = {}
+    _shared_sync_tick('calc:')  # 메모리 우선이므로 다른 워커가 저장한 세션 상태부터 반영
     if not DB_AVAILABLE or not DATABASE_URL:
         return dict(_calc_state_memory)
     conn = get_db_connection(statement_timeout_sec=5)
@@ -1329,9 +2194,10 @@ def _get_all_calc_states():
                     out[str(sid)[:64]] = json.loads(sj)
                 except (TypeError, ValueError):
                     pass
-        # _calc_state_memory 우선 (클라이언트 POST가 DB 커밋 직후 스케줄러와 레이스 시 최신 반영)
+        # _calc_state_memory 우선 (클라이언트 POST가 DB 커밋 직후 스케줄러와 레이스 시 최신 반영).
+        # 다중 워커면 DB 우선 — 다른 워커(다른 호스트)에서 저장한 정지·리셋·시작은 이 워커 메모리에 없어 오래된 사본이 덮어씀
         for k, v in _calc_state_memory.items():
-            if v and isinstance(v, dict):
+            if v and isinstance(v, dict) and (not _leader_election_enabled or k not in out):
                 out[k] = v
         return out
     except Exception:
@@ -2456,8 +3322,9 @@ def _apply_results_to_calcs(results):
                         c['pending_color'] = '빨강' if eff_pick == 'RED' else ('검정' if eff_pick == 'BLACK' else c.get('pending_color'))
                     updated = True
             if updated:
-                # 정지 calc: _calc_state_memory 우선 (클라이언트 POST가 DB 커밋 전에 스케줄러가 덮어쓰는 레이스 방지)
-                if skipped_cids:
+                # 정지 calc: _calc_state_memory 우선 (클라이언트 POST가 DB 커밋 전에 스케줄러가 덮어쓰는 레이스 방지).
+                # 다중 워커면 메모리가 다른 워커 저장보다 오래됐을 수 있어 DB 값(state) 그대로
+                if skipped_cids and not _leader_election_enabled:
                     mem = _calc_state_memory.get(str(session_id)[:64])
                     if mem and isinstance(mem, dict):
                         for cid in skipped_cids:
@@ -2862,7 +3729,7 @@ def _get_calc_row1_bundle(c, results=None, ph=None):
 
 
 def _push_current_pick_from_calc(calculator_id, c, results=None, ph=None):
-    """서버에서 계산기 1행(회차·픽·금액·정꺽)을 current_pick DB·relay 캐시에 반영. 1행 번들만 사용.
+    """서버에서 계산기 1행(회차·픽·금액·정꺽)을 relay 캐시에 반영하고 current_pick·macro_pick_transmit 쓰기는 write-behind 큐에 병합. 1행 번들만 사용.
     results, ph 전달 시 _server_calc_effective_pick_and_amount에서 DB 조회 생략."""
     if not bet_int or not DB_AVAILABLE or not DATABASE_URL:
         return
@@ -2870,14 +3737,8 @@ def _push_current_pick_from_calc(calculator_id, c, results=None, ph=None):
     if pick_color is None or pr is None:
         return
     calc_id = int(calculator_id) if calculator_id in (1, 2, 3) else 1
-    conn = get_db_connection(statement_timeout_sec=3)
-    if not conn:
-        return
     try:
-        ok = bet_int.set_current_pick(conn, pick_color=pick_color, round_num=pr,
-                                       suggested_amount=suggested_amount, calculator_id=calc_id)
-        if ok:
-            conn.commit()
+        _queue_pick_write(calc_id, current_pick={'pick_color': pick_color, 'round_num': pr, 'probability': None, 'suggested_amount': suggested_amount})
         # 1행 → macro_pick_transmit → relay. 단, 최근 0.2초 내 POST 있으면 스킵 (클라이언트 값 유지)
         if time.time() - _last_post_time_per_calc.get(calc_id, 0) < 0.2:
             return
@@ -2885,48 +3746,184 @@ def _push_current_pick_from_calc(calculator_id, c, results=None, ph=None):
         _update_current_pick_relay_cache(calc_id, pr, pick_color, int(suggested_amount or 0), c.get('running', True), None, pick_pred)
     except Exception:
         pass
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 
-# Relay 캐시: macro_pick_transmit에서만 갱신.
+# Relay 캐시: 매크로 픽의 기준(authoritative). DB(macro_pick_transmit)는 write-behind로 뒤따라 저장, 콜드스타트 복구용.
 _current_pick_relay_cache = {1: None, 2: None, 3: None}
 _last_post_time_per_calc = {1: 0, 2: 0, 3: 0}  # POST 시각 — 스케줄러가 클라이언트 값 덮어쓰지 않도록
 
+# 매크로 롱폴(?wait=&since_version=): 계산기별 relay 버전. 픽 변경·새 회차 결과 시 +1 → 대기 중인 요청 즉시 깨움.
+# 시작값을 시각(ms)으로 — 서버 재시작 후 예전 since_version과 겹치지 않게
+MACRO_LONG_POLL_MAX_SEC = float(os.getenv('MACRO_LONG_POLL_MAX_SEC', '25'))
+_relay_version_cond = threading.Condition()
+_relay_version = {cid: int(time.time() * 1000) for cid in (1, 2, 3)}
 
-def _write_macro_pick_transmit(calculator_id, round_num, pick_color, suggested_amount, running=True, pick_pred=None):
-    """매크로 전송 전용 DB에 1행 계산값 저장. relay는 여기서만 읽음. pick_pred=정/꺽 — 매크로 표시용."""
-    if not DB_AVAILABLE or not DATABASE_URL:
-        return False
+
+def _bump_relay_version(calculator_ids):
+    with _relay_version_cond:
+        for cid in calculator_ids:
+            _relay_version[cid] += 1
+        _relay_version_cond.notify_all()
+
+
+def _long_poll_params():
+    """?wait=초&since_version=N 파싱. 반환 (wait_sec, since_version) — wait 없거나 0이면 (0, None)."""
+    try:
+        wait_sec = min(max(float(request.args.get('wait') or 0), 0.0), MACRO_LONG_POLL_MAX_SEC)
+    except (TypeError, ValueError):
+        wait_sec = 0.0
+    try:
+        since = int(request.args.get('since_version')) if request.args.get('since_version') else None
+    except (TypeError, ValueError):
+        since = None
+    return (wait_sec, since) if wait_sec > 0 and since is not None else (0.0, None)
+
+
+def _wait_relay_version(calculator_id, since_version, wait_sec):
+    """relay 버전이 since_version과 달라질 때까지 최대 wait_sec 대기(eventlet 워커에선 협조적 양보). 반환: 현재 버전."""
+    deadline = time.time() + wait_sec
+    with _relay_version_cond:
+        while since_version is not None and _relay_version[calculator_id] == since_version:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            _relay_version_cond.wait(remaining)
+        return _relay_version[calculator_id]
+
+# 픽 쓰기 write-behind: relay POST·스케줄러 1행 반영은 메모리만 즉시 갱신하고, DB 쓰기는 계산기별 최신 값 1건으로 병합해
+# PICK_WRITE_FLUSH_SEC마다 한 트랜잭션으로 반영. 테이블 DDL은 init_database에서 1회만 (_pick_tables_ready).
+PICK_WRITE_FLUSH_SEC = float(os.getenv('PICK_WRITE_FLUSH_SEC', '0.25'))
+_pick_write_lock = threading.Lock()
+_pick_flush_lock = threading.Lock()  # 정기 flush와 종료 시 flush가 같은 배치를 동시에 잡지 않게
+_pick_write_pending = {}   # calculator_id -> {'current_pick': {...}, 'running': bool, 'transmit': {...}} (있는 키만 씀)
+_pick_write_flushed = {}   # calculator_id -> 마지막으로 DB에 반영한 값 (같은 값 재기록 생략)
+_pick_tables_ready = False
+
+
+def _queue_pick_write(calculator_id, current_pick=None, running=None, transmit=None, force=False):
+    """계산기별 DB 쓰기 예약. 같은 계산기의 대기 값은 최신으로 덮어씀. 이미 DB에 있는 값과 같으면 무시.
+    force=True거나 다중 워커(다른 워커가 같은 행을 쓸 수 있어 _pick_write_flushed를 믿을 수 없음)면 같은 값도 다시 씀."""
+    cid = int(calculator_id) if calculator_id in (1, 2, 3) else 1
+    force = force or _leader_election_enabled
+    updates = {}
+    if current_pick is not None:
+        updates['current_pick'] = current_pick
+    if running is not None:
+        updates['running'] = bool(running)
+    if transmit is not None:
+        updates['transmit'] = transmit
+    with _pick_write_lock:
+        flushed = _pick_write_flushed.get(cid) or {}
+        pending = _pick_write_pending.get(cid)
+        for k, v in updates.items():
+            if pending is None and not force and flushed.get(k) == v:
+                continue
+            if pending is None:
+                pending = _pick_write_pending[cid] = {}
+            pending[k] = v
+
+
+def _flush_pick_writes(force=False):
+    """대기 중인 픽 쓰기를 한 연결·한 트랜잭션으로 반영. 실패 시 그 사이 들어온 값보다 오래된 것만 되돌려 재시도.
+    force=True(종료 시): 진행 중인 정기 flush를 기다린 뒤 남은 값을 반영하고, 실패하면 1회 더 시도 (다음 틱이 없으므로)."""
+    if not bet_int or not DB_AVAILABLE or not DATABASE_URL:
+        return
+    if not (_pick_flush_lock.acquire(timeout=5) if force else _pick_flush_lock.acquire(blocking=False)):
+        return
+    try:
+        for _ in range(2 if force else 1):
+            if _flush_pick_writes_once() or not force:
+                break
+    finally:
+        _pick_flush_lock.release()
+    if force and _pick_write_pending:
+        print(f"[경고] 종료 시 픽 write-behind 저장 실패 — 계산기 {sorted(_pick_write_pending)} 값 유실")
+
+
+def _flush_pick_writes_once():
+    """_flush_pick_writes 1회분. 반환: 성공(또는 대기 없음) 여부."""
+    global _pick_tables_ready
+    with _pick_write_lock:
+        if not _pick_write_pending:
+            return True
+        batch = dict(_pick_write_pending)
+        _pick_write_pending.clear()
+    t0 = time.time()
+    conn = None
     try:
         conn = get_db_connection(statement_timeout_sec=3)
         if not conn:
-            return False
-        ensure_macro_pick_transmit_table(conn)
+            raise RuntimeError('DB 연결 실패')
+        if not _pick_tables_ready:
+            ensure_current_pick_table(conn)
+            ensure_macro_pick_transmit_table(conn)
         cur = conn.cursor()
-        amt = int(suggested_amount or 0) if suggested_amount is not None else 0
-        pp = pick_pred if pick_pred in ('정', '꺽') else None
-        cur.execute('''
-            INSERT INTO macro_pick_transmit (calculator_id, round_num, pick_color, suggested_amount, running, pick_pred, updated_at)
-            VALUES (%s, %s, %s, %s, %s, %s, NOW())
-            ON CONFLICT (calculator_id) DO UPDATE SET
-                round_num = EXCLUDED.round_num,
-                pick_color = EXCLUDED.pick_color,
-                suggested_amount = EXCLUDED.suggested_amount,
-                running = EXCLUDED.running,
-                pick_pred = EXCLUDED.pick_pred,
-                updated_at = NOW()
-        ''', (int(calculator_id), round_num, pick_color, amt, bool(running), pp))
+        for cid, w in batch.items():
+            cp = w.get('current_pick')
+            if cp is not None:
+                # set_current_pick은 예외를 삼키고 False — 트랜잭션이 깨진 채 commit(=롤백)되고 flushed에 기록되는 것 방지
+                if not bet_int.set_current_pick(conn, pick_color=cp.get('pick_color'), round_num=cp.get('round_num'),
+                                                probability=cp.get('probability'), suggested_amount=cp.get('suggested_amount'),
+                                                calculator_id=cid):
+                    raise RuntimeError(f'current_pick {cid} 저장 실패')
+            if w.get('running') is not None:
+                cur.execute('UPDATE current_pick SET running = %s WHERE id = %s', (w['running'], cid))
+            tr = w.get('transmit')
+            if tr is not None:
+                cur.execute('''
+                    INSERT INTO macro_pick_transmit (calculator_id, round_num, pick_color, suggested_amount, running, pick_pred, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, NOW())
+                    ON CONFLICT (calculator_id) DO UPDATE SET
+                        round_num = EXCLUDED.round_num,
+                        pick_color = EXCLUDED.pick_color,
+                        suggested_amount = EXCLUDED.suggested_amount,
+                        running = EXCLUDED.running,
+                        pick_pred = EXCLUDED.pick_pred,
+                        updated_at = NOW()
+                ''', (cid, tr.get('round_num'), tr.get('pick_color'), tr.get('suggested_amount'), tr.get('running'), tr.get('pick_pred')))
         conn.commit()
         cur.close()
-        conn.close()
+        _pick_tables_ready = True
+        with _pick_write_lock:
+            for cid, w in batch.items():
+                _pick_write_flushed.setdefault(cid, {}).update(w)
         return True
     except Exception as e:
-        print(f"[경고] macro_pick_transmit 저장 실패: {str(e)[:80]}")
+        try:
+            if conn:
+                conn.rollback()
+        except Exception:
+            pass
+        with _pick_write_lock:
+            for cid, w in batch.items():
+                merged = dict(w)
+                merged.update(_pick_write_pending.get(cid) or {})
+                _pick_write_pending[cid] = merged
+        _log_throttle('pick_write_flush_fail', 10, f"[경고] 픽 write-behind 저장 실패: {str(e)[:80]}")
+        return False
+    finally:
+        if conn:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _perf_log('flush_pick_writes', (time.time() - t0) * 1000)
+
+
+# 종료(재시작·배포) 시 PICK_WRITE_FLUSH_SEC 안에 쌓인 current_pick·running 쓰기 유실 방지.
+# gunicorn 워커는 정상 종료 시 sys.exit → atexit 실행. 단독 실행(python app.py)은 SIGTERM 핸들러를 __main__에서 등록
+atexit.register(_flush_pick_writes, force=True)
+
+
+def _write_macro_pick_transmit(calculator_id, round_num, pick_color, suggested_amount, running=True, pick_pred=None):
+    """매크로 전송 전용 DB에 1행 계산값 저장 예약(write-behind). pick_pred=정/꺽 — 매크로 표시용."""
+    if not DB_AVAILABLE or not DATABASE_URL:
         return False
+    amt = int(suggested_amount or 0) if suggested_amount is not None else 0
+    pp = pick_pred if pick_pred in ('정', '꺽') else None
+    _queue_pick_write(calculator_id, transmit={'round_num': round_num, 'pick_color': pick_color, 'suggested_amount': amt,
+                                               'running': bool(running), 'pick_pred': pp})
+    return True
 
 
 def _read_macro_pick_transmit(calculator_id):
@@ -2953,11 +3950,12 @@ def _read_macro_pick_transmit(calculator_id):
         return None
 
 
-def _update_current_pick_relay_cache(calculator_id, round_num, pick_color, suggested_amount, running=True, probability=None, pick_pred=None):
-    """macro_pick_transmit → relay 캐시 반영. WebSocket 푸시. pick_pred=정/꺽 — 매크로 표시·결과 매칭용."""
+def _update_current_pick_relay_cache(calculator_id, round_num, pick_color, suggested_amount, running=True, probability=None, pick_pred=None, publish=True):
+    """macro_pick_transmit → relay 캐시 반영. WebSocket 푸시. pick_pred=정/꺽 — 매크로 표시·결과 매칭용.
+    publish=False는 다른 워커가 올린 값을 반영할 때 (다중 워커 공유 상태로 되돌려 쓰지 않음)."""
     try:
         cid = int(calculator_id) if calculator_id in (1, 2, 3) else 1
-        _current_pick_relay_cache[cid] = {
+        entry = {
             'round': round_num,
             'pick_color': pick_color,
             'suggested_amount': suggested_amount,
@@ -2965,6 +3963,14 @@ def _update_current_pick_relay_cache(calculator_id, round_num, pick_color, sugge
             'probability': probability,
             'pick_pred': pick_pred if pick_pred in ('정', '꺽') else None,
         }
+        changed = _current_pick_relay_cache.get(cid) != entry
+        _current_pick_relay_cache[cid] = entry
+        if changed:
+            if publish:
+                _state_publish(f'relay:{cid}', entry)
+            _bump_relay_version((cid,))
+            if running is not False and round_num is not None:
+                _trace_round(int(round_num) - 1, 'relay_update')
         _ws_emit_pick_update(cid, round_num, pick_color, suggested_amount, running, pick_pred)
     except (TypeError, ValueError):
         pass
@@ -3053,6 +4059,7 @@ def _merge_round_predictions_into_history(round_actuals, results=None):
         pass
 
 
+@_perf_timed('backfill_latest_round')
 def _backfill_latest_round_to_prediction_history(results):
     """최신 회차가 prediction_history에 없으면 서버가 예측/실제를 계산해 저장. 화면 미반영으로 누락된 회차 보정."""
     if not results or len(results) < 17:
@@ -3232,6 +4239,7 @@ def _backfill_shape_predicted_in_ph(ph, results, max_backfill=0, persist_to_db=F
     return ph
 
 
+@_perf_timed('get_prediction_history')
 def get_prediction_history(limit=30):
     """시스템 예측 기록 조회 (최신 N건, round 오름차순 = 과거→현재). statement_timeout으로 먹통 방지."""
     if not DB_AVAILABLE or not DATABASE_URL:
@@ -5102,14 +6110,17 @@ def get_recent_results(hours=24):
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
         # 최근 N시간 데이터 조회, LIMIT 2000. created_at DESC로 인덱스 활용 → Python _sort_results_newest_first에서 game_id 기준 재정렬
+        # 파티션 모드: game_id 하한을 붙여 구간에 걸친 최신 파티션만 스캔 (파티션 프루닝)
+        floor = _game_results_floor(hours)
         cur.execute('''
             SELECT game_id as "gameID", result, hi, lo, red, black, jqka, joker,
                    hash_value as hash, salt_value as salt
             FROM game_results
             WHERE created_at >= NOW() - (INTERVAL '1 hour' * %s)
+        ''' + (' AND game_id >= %s' if floor else '') + '''
             ORDER BY created_at DESC
             LIMIT 2000
-        ''', (int(hours),))
+        ''', (int(hours), floor) if floor else (int(hours),))
         
         results = []
         for row in cur.fetchall():
@@ -5185,9 +6196,12 @@ def get_recent_results(hours=24):
         return []
 
 def cleanup_old_results(hours=5):
-    """5시간이 지난 데이터 삭제"""
+    """5시간이 지난 데이터 삭제. 파티션 모드에서는 DELETE 대신 오래된 파티션 분리·삭제(죽은 튜플 없음)."""
     if not DB_AVAILABLE or not DATABASE_URL:
         return
+    if GAME_RESULTS_PARTITIONED:
+        _maintain_game_partitions(retention_hours=hours)
+        return
     
     conn = get_db_connection()
     if not conn:
@@ -5216,55 +6230,269 @@ def cleanup_old_results(hours=5):
         except:
             pass
 
-# 캐시
-game_data_cache = None
-streaks_cache = None
-results_cache = None
-prediction_cache = None  # 예측픽만. DB 전용. 외부 fetch 대기 없이 빠르게 표시
-_shape_pick_cache = None
-_shape_pick_cache_at = 0
-SHAPE_PICK_CACHE_TTL_SEC = 0.35  # 350ms — 폴링 400ms와 맞춰 DB 부하 완화
-_shape_pick_cache = {}  # { round: {shape_pick, shape_color, shape_15_rate} } — 회차별 고정, 나중에 바뀌는 것 방지
-last_update_time = 0
-CACHE_TTL = 1000  # 결과 캐시 유효 시간 (ms). 1초 동안 동일 캐시 반환, 스케줄러가 1초마다 선제 갱신
-RESULTS_RESPONSE_CACHE_TTL_MS = 400  # /api/results 응답 캐시. apply 지연(200~500ms) 시에도 캐시 미스 감소
-REFRESH_TRIGGER_THROTTLE_SEC = 0.5  # /api/results에서 _refresh_results_background 트리거 스로틀. 0.5초 — fetch·apply 경합 완화 (2단계 최적화)
+# game_results·color_matches 파티셔닝 (GAME_RESULTS_PARTITIONED=1, 기본 끔)
+# 파티션 키는 game_id 범위 — ON CONFLICT (game_id)·(game_id, compare_game_id) 유일 제약이 파티션 키를 포함해야 하므로 시간 대신 회차.
+# game_id는 자릿수가 같은 숫자 문자열이라 문자열 범위 = 회차 범위. 자릿수가 다른 id·숫자 아닌 id는 DEFAULT 파티션으로.
+# 보존: 마지막 행이 GAME_RESULTS_RETENTION_HOURS보다 오래된 파티션을 DETACH → DROP (DELETE·VACUUM 없음).
+# 다음 GAME_RESULTS_PARTITIONS_AHEAD개 파티션은 미리 생성, 최신 회차가 마지막 파티션에 가까워지면 백그라운드로 추가 생성.
+GAME_RESULTS_PARTITIONED = os.getenv('GAME_RESULTS_PARTITIONED', '0') == '1'
+GAME_RESULTS_PARTITION_ROUNDS = max(100, int(os.getenv('GAME_RESULTS_PARTITION_ROUNDS', '10000')))  # 10초 게임 기준 약 28시간
+GAME_RESULTS_PARTITIONS_AHEAD = max(1, int(os.getenv('GAME_RESULTS_PARTITIONS_AHEAD', '2')))
+GAME_RESULTS_RETENTION_HOURS = float(os.getenv('GAME_RESULTS_RETENTION_HOURS', '72'))  # get_recent_results 최대 구간(72h) 이상
+GAME_RESULTS_PARTITION_CHECK_SEC = 300
+_PARTITIONED_TABLES = (
+    ('game_results', '''
+        id BIGSERIAL,
+        game_id VARCHAR(50) NOT NULL,
+        result VARCHAR(10),
+        hi BOOLEAN DEFAULT FALSE,
+        lo BOOLEAN DEFAULT FALSE,
+        red BOOLEAN DEFAULT FALSE,
+        black BOOLEAN DEFAULT FALSE,
+        jqka BOOLEAN DEFAULT FALSE,
+        joker BOOLEAN DEFAULT FALSE,
+        hash_value VARCHAR(100),
+        salt_value VARCHAR(100),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (game_id)''', 'game_id, result, hi, lo, red, black, jqka, joker, hash_value, salt_value, created_at',
+     ('idx_game_id', 'idx_created_at')),
+    ('color_matches', '''
+        id BIGSERIAL,
+        game_id VARCHAR(50) NOT NULL,
+        compare_game_id VARCHAR(50) NOT NULL,
+        match_result BOOLEAN NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (game_id, compare_game_id)''', 'game_id, compare_game_id, match_result, created_at',
+     ('idx_color_matches_game_id', 'idx_color_matches_compare_game_id')),
+)
+# 파티션 현황 (유지보수 job이 갱신): los=파티션 하한 회차 정렬 목록, max_created=파티션별 마지막 행 시각(epoch),
+# hi=생성된 마지막 파티션 상한, default_rows=DEFAULT 파티션 행 수 (있으면 game_id 하한 프루닝 안 함)
+_game_partition_state = {'los': [], 'max_created': {}, 'hi': None, 'default_rows': 0, 'checked_at': None,
+                         'created': 0, 'dropped': 0, 'last_error': None}
+
+
+def _partition_bounds(lo):
+    """하한 회차 → (하한 문자열, 상한 문자열). 자릿수가 바뀌는 구간은 문자열 범위가 회차 범위와 달라서 None (DEFAULT가 받음)."""
+    hi = lo + GAME_RESULTS_PARTITION_ROUNDS
+    if len(str(lo)) != len(str(hi)):
+        return None
+    return str(lo), str(hi)
 
-# 게임 상태 (Socket.IO 제거 후 기본값만 사용)
-current_status_data = {
-    'round': 0,
-    'elapsed': 0,
-    'currentBets': {
-        'red': [],
-        'black': []
-    },
-    'timestamp': datetime.now().isoformat()
-}
 
-def fetch_with_retry(url, max_retries=MAX_RETRIES, silent=False, timeout_sec=None):
-    """재시도 로직 포함 fetch. timeout_sec 지정 시 해당 초 단위 타임아웃 사용 (먹통 방지)."""
-    timeout = timeout_sec if timeout_sec is not None else TIMEOUT
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(
-                url,
-                timeout=timeout,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Cache-Control': 'no-cache',
-                    'Pragma': 'no-cache',
-                    'Accept': 'application/json, text/plain, */*',
-                    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
-                    'Referer': f'{BASE_URL}/',
-                    'Origin': BASE_URL,
-                    'Connection': 'keep-alive',
-                    'Sec-Fetch-Dest': 'empty',
-                    'Sec-Fetch-Mode': 'cors',
-                    'Sec-Fetch-Site': 'same-origin'
-                },
-                allow_redirects=True  # 리다이렉트 허용
-            )
-            response.raise_for_status()
+def _create_result_partition(cur, table, lo):
+    """table_p<lo> 파티션이 없으면 생성. DEFAULT에 이미 들어간 같은 범위 행은 옮긴 뒤 생성 (그대로면 생성 실패)."""
+    bounds = _partition_bounds(lo)
+    if bounds is None:
+        return False
+    name = f'{table}_p{lo}'
+    cur.execute('SELECT to_regclass(%s)', (name,))
+    if cur.fetchone()[0] is not None:
+        return False
+    cur.execute(f'SELECT count(*) FROM {table}_pdefault WHERE game_id >= %s AND game_id < %s', bounds)
+    moved = cur.fetchone()[0]
+    if moved:
+        cur.execute(f'CREATE TEMP TABLE _partition_move ON COMMIT DROP AS SELECT * FROM {table}_pdefault WHERE game_id >= %s AND game_id < %s', bounds)
+        cur.execute(f'DELETE FROM {table}_pdefault WHERE game_id >= %s AND game_id < %s', bounds)
+    cur.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{bounds[0]}') TO ('{bounds[1]}')")
+    if moved:
+        cur.execute(f'INSERT INTO {table} SELECT * FROM _partition_move')
+        cur.execute('DROP TABLE _partition_move')
+    return True
+
+
+def _init_partitioned_results(cur):
+    """game_results·color_matches를 game_id 범위 파티션 테이블로 생성. 기존 일반 테이블이면 *_legacy로 이름을 바꾸고
+    보존 기간 안의 행만 옮김 (legacy 테이블은 확인 후 수동 DROP)."""
+    cutoff_sql = "NOW() - (INTERVAL '1 hour' * %s)"
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext('game_results_partitioning'))")  # 워커 여러 개가 동시에 전환하지 않게 (커밋까지 유지)
+    for table, cols, copy_cols, index_names in _PARTITIONED_TABLES:
+        cur.execute('SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)', (table,))
+        row = cur.fetchone()
+        if row and row[0] == 'p':
+            continue
+        legacy = None
+        if row:
+            legacy = f'{table}_legacy'
+            cur.execute(f'LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE')
+            cur.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+            for idx in index_names:
+                # 같은 이름이 남아 있으면 init_database의 CREATE INDEX IF NOT EXISTS가 새 테이블 인덱스를 건너뜀
+                cur.execute(f'ALTER INDEX IF EXISTS {idx} RENAME TO {idx}_legacy')
+        cur.execute(f'CREATE TABLE {table} ({cols}) PARTITION BY RANGE (game_id)')
+        cur.execute(f'CREATE TABLE {table}_pdefault PARTITION OF {table} DEFAULT')
+        buckets = set()
+        if legacy:
+            cur.execute(f"SELECT DISTINCT game_id::bigint / %s FROM {legacy} WHERE game_id ~ '^[0-9]{{1,18}}$' AND created_at >= {cutoff_sql}",
+                        (GAME_RESULTS_PARTITION_ROUNDS, GAME_RESULTS_RETENTION_HOURS))
+            buckets = {int(r[0]) for r in cur.fetchall()}
+        if buckets:
+            for b in range(min(buckets), max(buckets) + GAME_RESULTS_PARTITIONS_AHEAD + 1):
+                _create_result_partition(cur, table, b * GAME_RESULTS_PARTITION_ROUNDS)
+        if legacy:
+            cur.execute(f'INSERT INTO {table} ({copy_cols}) SELECT {copy_cols} FROM {legacy} WHERE created_at >= {cutoff_sql} ON CONFLICT DO NOTHING',
+                        (GAME_RESULTS_RETENTION_HOURS,))
+            print(f"[✅] {table} → 파티션 테이블 전환 ({cur.rowcount}행 이전, 기존 테이블은 {legacy})")
+        else:
+            print(f"[✅] {table} 파티션 테이블 생성 (game_id 범위 {GAME_RESULTS_PARTITION_ROUNDS}회차 단위)")
+
+
+def _note_game_round(game_id):
+    """저장하려는 회차가 마지막 파티션 상한에 가까우면 파티션 추가 생성을 백그라운드로 (유지보수 주기를 기다리지 않음)."""
+    if not GAME_RESULTS_PARTITIONED:
+        return
+    st = _game_partition_state
+    try:
+        rnd = int(str(game_id))
+    except (TypeError, ValueError):
+        return
+    # 현황 없음(빈 DB 첫 저장 등) 또는 마지막 파티션 상한 근접. 자릿수가 바뀌는 구간처럼 만들 수 없을 때 반복하지 않게 10초에 1번
+    if st['hi'] is not None and rnd < st['hi'] - GAME_RESULTS_PARTITION_ROUNDS * (GAME_RESULTS_PARTITIONS_AHEAD - 1):
+        return
+    if st['checked_at'] is not None and time.time() - st['checked_at'] < 10:
+        return
+    st['checked_at'] = time.time()
+    _bg_submit('game_partitions', _maintain_game_partitions, key='game_partitions')
+
+
+def _game_results_floor(hours):
+    """get_recent_results 구간의 game_id 하한 (파티션 프루닝용). 마지막 행이 구간 안인 가장 오래된 파티션의 하한.
+    파티션 현황을 모르거나 DEFAULT에 행이 있으면(자릿수 변경 등) None — 하한 없이 전체 조회."""
+    st = _game_partition_state
+    if not GAME_RESULTS_PARTITIONED or not st['los'] or st['default_rows']:
+        return None
+    cutoff = time.time() - hours * 3600 - GAME_RESULTS_PARTITION_CHECK_SEC  # 현황 갱신 주기만큼 여유
+    live = [lo for lo in st['los'] if (st['max_created'].get(lo) or 0) >= cutoff]
+    if not live:
+        return None
+    return str(min(live))
+
+
+def _maintain_game_partitions(retention_hours=None):
+    """파티션 유지보수: 최신 회차 기준 앞쪽 파티션 생성 → 보존 기간 지난 파티션 DETACH·DROP → 현황 갱신."""
+    if not GAME_RESULTS_PARTITIONED or not DB_AVAILABLE or not DATABASE_URL:
+        return
+    retention_hours = GAME_RESULTS_RETENTION_HOURS if retention_hours is None else retention_hours
+    st = _game_partition_state
+    conn = get_db_connection(statement_timeout_sec=30)
+    if not conn:
+        return
+    try:
+        cur = conn.cursor()
+        cur.execute("SET lock_timeout = '3s'")  # DETACH·CREATE PARTITION이 저장을 오래 막지 않게
+        cur.execute("SELECT game_id FROM game_results WHERE game_id ~ '^[0-9]{1,18}$' ORDER BY created_at DESC LIMIT 1")
+        row = cur.fetchone()
+        latest = int(row[0]) if row else None
+        if latest is not None:
+            base = latest // GAME_RESULTS_PARTITION_ROUNDS
+            for table, _, _, _ in _PARTITIONED_TABLES:
+                for b in range(base, base + GAME_RESULTS_PARTITIONS_AHEAD + 1):
+                    if _create_result_partition(cur, table, b * GAME_RESULTS_PARTITION_ROUNDS):
+                        st['created'] += 1
+                conn.commit()
+        cur.execute('''
+            SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'game_results'::regclass
+        ''')
+        los = sorted(int(r[0][len('game_results_p'):]) for r in cur.fetchall() if r[0][len('game_results_p'):].isdigit())
+        max_created = {}
+        for lo in los:
+            cur.execute(f'SELECT EXTRACT(EPOCH FROM max(created_at)) FROM game_results_p{lo}')  # created_at 인덱스 1건
+            v = cur.fetchone()[0]
+            max_created[lo] = float(v) if v is not None else None
+        cur.execute("SELECT EXTRACT(EPOCH FROM NOW())")
+        now_db = float(cur.fetchone()[0])
+        cutoff = now_db - retention_hours * 3600
+        newest = (latest // GAME_RESULTS_PARTITION_ROUNDS) * GAME_RESULTS_PARTITION_ROUNDS if latest is not None else None
+        for lo in list(los):
+            mc = max_created.get(lo)
+            if mc is None or mc >= cutoff or (newest is not None and lo >= newest):
+                continue  # 비었거나(앞쪽 파티션) 구간 안이거나 최신 파티션
+            for table, _, _, _ in _PARTITIONED_TABLES:
+                name = f'{table}_p{lo}'
+                cur.execute('SELECT to_regclass(%s)', (name,))
+                if cur.fetchone()[0] is None:
+                    continue
+                cur.execute(f'ALTER TABLE {table} DETACH PARTITION {name}')
+                cur.execute(f'DROP TABLE {name}')
+            conn.commit()
+            los.remove(lo)
+            max_created.pop(lo, None)
+            st['dropped'] += 1
+            print(f"[🗑️] game_results·color_matches 파티션 {lo} 삭제 (마지막 행 {retention_hours:.0f}시간 경과)")
+        default_rows = 0
+        for table, _, _, _ in _PARTITIONED_TABLES:
+            # DEFAULT 파티션(자릿수가 다른 id 등)은 작으므로 DELETE로 보존 기간 정리
+            cur.execute(f"DELETE FROM {table}_pdefault WHERE created_at < NOW() - (INTERVAL '1 hour' * %s)", (retention_hours,))
+            cur.execute(f'SELECT count(*) FROM {table}_pdefault')
+            default_rows += cur.fetchone()[0] if table == 'game_results' else 0
+        conn.commit()
+        cur.close()
+        st.update(los=los, max_created=max_created, default_rows=default_rows, checked_at=time.time(), last_error=None,
+                  hi=(max(los) + GAME_RESULTS_PARTITION_ROUNDS) if los else None)
+    except Exception as e:
+        st['last_error'] = str(e)[:120]
+        _log_throttle('game_partitions', 60, f"[경고] game_results 파티션 유지보수 실패: {str(e)[:100]}")
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+# 캐시
+game_data_cache = None
+streaks_cache = None
+results_cache = None
+prediction_cache = None  # 예측픽만. DB 전용. 외부 fetch 대기 없이 빠르게 표시
+SHAPE_PICK_CACHE_TTL_SEC = 0.35  # 350ms — 폴링 400ms와 맞춰 DB 부하 완화
+SHAPE_PICK_STALE_SEC = float(os.getenv('SHAPE_PICK_STALE_SEC', '2'))  # TTL 경과 후 이 시간까지는 직전 값 즉시 반환 + 백그라운드 재빌드
+_shape_pick_cache = {}  # { round: {shape_pick, shape_color, shape_15_rate} } — 회차별 고정, 나중에 바뀌는 것 방지
+last_update_time = 0
+CACHE_TTL = 1000  # 결과 캐시 유효 시간 (ms). 1초 동안 동일 캐시 반환, 스케줄러가 1초마다 선제 갱신
+RESULTS_RESPONSE_CACHE_TTL_MS = 400  # /api/results 응답 캐시. apply 지연(200~500ms) 시에도 캐시 미스 감소
+RESULTS_STALE_WHILE_REVALIDATE_MS = int(os.getenv('RESULTS_STALE_WHILE_REVALIDATE_MS', '3000'))  # TTL 만료 후 이 구간은 직전 응답 즉시 반환, 재빌드는 백그라운드 1건
+SINGLE_FLIGHT_WAIT_SEC = 5.0  # 진행 중 빌드 대기 상한 (statement_timeout 5초와 동일)
+REFRESH_TRIGGER_THROTTLE_SEC = 0.5  # /api/results에서 _refresh_results_background 트리거 스로틀. 0.5초 — fetch·apply 경합 완화 (2단계 최적화)
+
+# 게임 상태 (Socket.IO 제거 후 기본값만 사용)
+current_status_data = {
+    'round': 0,
+    'elapsed': 0,
+    'currentBets': {
+        'red': [],
+        'black': []
+    },
+    'timestamp': datetime.now().isoformat()
+}
+
+def fetch_with_retry(url, max_retries=MAX_RETRIES, silent=False, timeout_sec=None):
+    """재시도 로직 포함 fetch. timeout_sec 지정 시 해당 초 단위 타임아웃 사용 (먹통 방지)."""
+    timeout = timeout_sec if timeout_sec is not None else TIMEOUT
+    for attempt in range(max_retries):
+        try:
+            response = requests.get(
+                url,
+                timeout=timeout,
+                headers={
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                    'Cache-Control': 'no-cache',
+                    'Pragma': 'no-cache',
+                    'Accept': 'application/json, text/plain, */*',
+                    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+                    'Referer': f'{BASE_URL}/',
+                    'Origin': BASE_URL,
+                    'Connection': 'keep-alive',
+                    'Sec-Fetch-Dest': 'empty',
+                    'Sec-Fetch-Mode': 'cors',
+                    'Sec-Fetch-Site': 'same-origin'
+                },
+                allow_redirects=True  # 리다이렉트 허용
+            )
+            response.raise_for_status()
             
             # 응답 내용 확인 (디버깅)
             if not silent:
@@ -5327,21 +6555,17 @@ def ensure_database_initialized():
         print(f"[❌ 오류] 트레이스백:\n{traceback.format_exc()}")
         return False
 
-# 모듈 로드 시 DB 초기화는 백그라운드 스레드에서 (앱 시작 블로킹 방지). 헬스체크 통과 후 실행
+# DB 초기화는 모듈 끝의 기동 워밍업 스레드(_startup_warmup)가 맨 먼저 실행 (앱 시작 블로킹 없음, 고정 대기 없음)
 def _run_db_init():
     try:
-        time.sleep(5)
-        ensure_database_initialized()
+        return ensure_database_initialized()
     except Exception as e:
         print(f"[❌ 오류] DB 초기화 실패: {str(e)}")
+        return False
 
-print("[🔄] 모듈 로드 시 데이터베이스 초기화는 백그라운드에서 실행됩니다.")
-if DB_AVAILABLE and DATABASE_URL:
-    _db_init_thread = threading.Thread(target=_run_db_init, daemon=True)
-    _db_init_thread.start()
-elif not DATABASE_URL:
+if not DATABASE_URL:
     print("[❌ 경고] DATABASE_URL이 None입니다. 환경 변수를 확인하세요.")
-else:
+elif not DB_AVAILABLE:
     print("[❌ 경고] DB_AVAILABLE이 False입니다. psycopg2를 설치하세요.")
 
 def load_game_data():
@@ -5404,6 +6628,7 @@ def _fetch_one_result_path(url_path, timeout_sec):
     )
 
 
+@_perf_timed('load_results_data')
 def load_results_data(base_url=None):
     """경기 결과 데이터 로드 (result.json). 여러 경로 병렬 요청해 먼저 성공한 결과 사용 → 회차 갱신."""
     base = (base_url or '').rstrip('/') or BASE_URL
@@ -5433,6 +6658,8 @@ def load_results_data(base_url=None):
                     continue
                 results = _parse_results_json(data)
                 if results:
+                    latest_round = _latest_round_of(results)
+                    _trace_round(latest_round, 'feed_seen')
                     _log_when_changed(('result_success', url_path), (url_path, len(results)), lambda v: f"[✅ 결과 데이터 성공] {v[0]} ({v[1]}개)")
                     executor.shutdown(wait=False)
                     if DB_AVAILABLE and DATABASE_URL and base == BASE_URL:
@@ -5442,6 +6669,7 @@ def load_results_data(base_url=None):
                                 saved_count += 1
                         if saved_count > 0:
                             _log_when_changed('db_save', saved_count, lambda v: f"[💾] 데이터베이스에 {v}개 결과 저장 완료")
+                        _trace_round(latest_round, 'db_ingest')
                         if len(results) >= 16:
                             calculate_and_save_color_matches(results)
                     return results
@@ -5507,37 +6735,37 @@ def _run_prediction_update_light():
             pass
 
 
-def _scheduler_apply_results():
-    """DB 결과로 계산기 회차 반영 + relay + prediction_cache + results_cache. 0.1초마다 실행. fetch 완료 시 fetch 스레드에서도 즉시 호출."""
-    global _last_prediction_light_at, results_cache, last_update_time
+@_sql_scoped('scheduler_apply')
+def _scheduler_apply_results(results=None):
+    """DB 결과로 계산기 회차 반영 + relay + prediction_cache + results_cache. 0.1초마다 실행. fetch 완료 시 fetch 스레드에서도 즉시 호출.
+    results 전달 시(기동 워밍업) 조회를 생략. 반환: 실행했으면 True, 락 경합으로 건너뛰면 False."""
+    global _last_prediction_light_at
     t0 = time.time()
     if not DB_AVAILABLE or not DATABASE_URL:
-        return
+        return False
     if not _apply_lock.acquire(blocking=False):
         # apply 스킵 시 예측픽만 경량 갱신 (0.1초 스로틀 — 지연 완화)
         now_pl = time.time()
         if (now_pl - _last_prediction_light_at) >= 0.1:
             _last_prediction_light_at = now_pl
-            threading.Thread(target=_run_prediction_update_light, daemon=True).start()
-        return
+            _bg_submit('prediction_light', _run_prediction_update_light)
+        return False
     try:
-        results = get_recent_results(hours=24)
+        if results is None:
+            results = get_recent_results(hours=24)
         if results and len(results) >= 16:
             # 예측픽 캐시 먼저 갱신 — 화면에 빠르게 표시 (경량 경로)
             _update_prediction_cache_from_db(results=results)
             ensure_stored_prediction_for_current_round(results)
             ph_apply = _apply_results_to_calcs(results)
+            _trace_round(_latest_round_of(results), 'apply_done')
             _backfill_latest_round_to_prediction_history(results)
-            ra = _build_round_actuals(results)
-            if ra:
-                cards = _build_cards_for_macro(results)
-                _ws_emit_round_actuals(ra, cards)
+            _refresh_macro_feed(results)
             # apply에서 results_cache 갱신 — /api/results 캐시 히트율 상승, _build_results_payload_db_only 호출 감소
             try:
                 payload = _build_results_payload_db_only(hours=24, backfill=False, results=results, ph=ph_apply)
                 if payload and payload.get('results'):
-                    results_cache = payload
-                    last_update_time = time.time() * 1000
+                    _set_results_cache(payload)
             except Exception as ec:
                 print(f"[스케줄러] results_cache 갱신 오류: {str(ec)[:80]}")
         else:
@@ -5552,11 +6780,12 @@ def _scheduler_apply_results():
         except Exception:
             pass
         _perf_log('scheduler_apply', (time.time() - t0) * 1000)
+    return True
 
 
 def _scheduler_fetch_results():
-    """fetch만 스레드로 실행(스케줄러 블로킹 없음). apply는 별도 job(0.1초)에서 DB 갱신 시 즉시 반영."""
-    threading.Thread(target=_refresh_results_background, daemon=True).start()
+    """fetch만 백그라운드 실행기로 위임(스케줄러 블로킹 없음). 진행 중이면 1건으로 병합. apply는 별도 job(0.1초)에서 DB 갱신 시 즉시 반영."""
+    _bg_submit('refresh_results', _refresh_results_background)
 
 
 def _scheduler_trim_shape_tables():
@@ -5574,17 +6803,447 @@ def _scheduler_trim_shape_tables():
                 pass
 
 
+# 같은 호스트의 여러 프로세스(gunicorn 워커·읽기 전용 API 프로세스)가 공유하는 캐시: 키 1개 = /dev/shm 파일 1개 mmap.
+# 헤더 [seq u64][pid u32][len u32][written_ms u64] + 본문(JSON). 쓰기는 flock으로 쓰기끼리만 직렬화하고 seq를 홀수→짝수로
+# 올리는 seqlock, 읽기는 락 없이 seq 전후 비교. 변경 없으면 헤더 8바이트만 읽어서 요청 핸들러에서 써도 마이크로초 단위.
+# 키·반영 규칙은 DB 스냅샷 동기화와 같음(_apply_state_row) — DB는 호스트 간, 공유 메모리는 같은 호스트 안의 빠른 경로.
+SHARED_CACHE = os.getenv('SHARED_CACHE', 'auto').strip().lower()  # auto: 워커 2개 이상일 때만 / 1: 강제 / reader: 읽기 전용 API 프로세스 / 0: 끔
+SHARED_CACHE_DIR = os.getenv('SHARED_CACHE_DIR') or os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else __import__('tempfile').gettempdir(), f"tgame-cache-{os.getenv('PORT', '5000')}")
+SHARED_CACHE_INITIAL_BYTES = 64 * 1024
+SHARED_CACHE_MAX_BYTES = int(os.getenv('SHARED_CACHE_MAX_MB', '16')) * 1024 * 1024
+SHARED_CACHE_SYNC_SEC = float(os.getenv('SHARED_CACHE_SYNC_SEC', '0.05'))
+SHARED_CACHE_MAX_AGE_SEC = float(os.getenv('SHARED_CACHE_MAX_AGE_SEC', '300'))  # 이보다 오래된 results·prediction은 이전 기동이 남긴 값으로 보고 무시
+SHARED_CACHE_READER = SHARED_CACHE == 'reader'
+
+
+class _SharedSlot:
+    """공유 캐시 키 1개 (파일 1개 mmap). 파일은 커지기만 하고, 다른 프로세스가 키우면 읽을 때 다시 매핑."""
+    HDR = struct.Struct('<QIIQ')
+    SEQ = struct.Struct('<Q')
+
+    def __init__(self, path):
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self.lock = threading.Lock()  # flock은 같은 프로세스 스레드끼리는 막지 않음
+        if os.fstat(self.fd).st_size < SHARED_CACHE_INITIAL_BYTES:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self.fd).st_size < SHARED_CACHE_INITIAL_BYTES:
+                    os.ftruncate(self.fd, SHARED_CACHE_INITIAL_BYTES)
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.mm = mmap.mmap(self.fd, 0)
+
+    def _remap(self):
+        # 이전 매핑은 닫지 않음 — 읽던 스레드가 있으면 끝난 뒤 GC가 정리
+        if os.fstat(self.fd).st_size != len(self.mm):
+            self.mm = mmap.mmap(self.fd, 0)
+
+    def seq(self):
+        return self.SEQ.unpack_from(self.mm, 0)[0]
+
+    def read(self, retries=64):
+        """(seq, pid, written_ms, bytes). 비었거나 쓰기와 계속 겹치면 None."""
+        for _ in range(retries):
+            mm = self.mm
+            seq, pid, n, written_ms = self.HDR.unpack_from(mm, 0)
+            if seq == 0:
+                return None
+            if seq & 1:
+                time.sleep(0)
+                continue
+            if self.HDR.size + n > len(mm):
+                self._remap()
+                continue
+            data = mm[self.HDR.size:self.HDR.size + n]
+            if self.SEQ.unpack_from(mm, 0)[0] == seq:
+                return seq, pid, written_ms, data
+        return None
+
+    def write(self, data):
+        need = self.HDR.size + len(data)
+        if need > SHARED_CACHE_MAX_BYTES:
+            raise ValueError(f'{len(data)}B > SHARED_CACHE_MAX_MB')
+        with self.lock:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                self._remap()
+                if need > len(self.mm):
+                    os.ftruncate(self.fd, min(SHARED_CACHE_MAX_BYTES, max(need, len(self.mm) * 2)))
+                    self._remap()
+                mm = self.mm
+                seq = self.SEQ.unpack_from(mm, 0)[0]
+                seq += seq & 1  # 쓰다 죽은 프로세스가 남긴 홀수 seq 복구
+                self.SEQ.pack_into(mm, 0, seq + 1)
+                mm[self.HDR.size:need] = data
+                self.HDR.pack_into(mm, 0, seq + 1, os.getpid(), len(data), int(time.time() * 1000))
+                self.SEQ.pack_into(mm, 0, seq + 2)
+                return seq + 2
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+class _SharedCache:
+    """키 → _SharedSlot. 파일 이름은 키 UTF-8 hex (calc:<session_id> 등 임의 문자 허용, 목록에서 키 복원)."""
+
+    def __init__(self, directory):
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self.dir = directory
+        self.slots = {}
+        self.lock = threading.Lock()
+
+    def slot(self, key, create=True):
+        sl = self.slots.get(key)
+        if sl is not None:
+            return sl
+        path = os.path.join(self.dir, key.encode('utf-8').hex())
+        if not create and not os.path.exists(path):
+            return None
+        with self.lock:
+            sl = self.slots.get(key)
+            if sl is None:
+                sl = self.slots[key] = _SharedSlot(path)
+        return sl
+
+    def keys(self):
+        out = []
+        for name in os.listdir(self.dir):
+            try:
+                out.append(bytes.fromhex(name).decode('utf-8'))
+            except ValueError:
+                continue
+        return out
+
+
+_shared_cache = None
+if fcntl is not None and (SHARED_CACHE in ('1', 'true', 'on', 'reader')
+                          or (SHARED_CACHE == 'auto' and max(1, int(os.getenv('WEB_CONCURRENCY', '1') or 1)) > 1)):
+    try:
+        _shared_cache = _SharedCache(SHARED_CACHE_DIR)
+        print(f"[✅] 공유 메모리 캐시: {SHARED_CACHE_DIR}{' (읽기 전용 API 프로세스)' if SHARED_CACHE_READER else ''}")
+    except OSError as e:
+        print(f"[경고] 공유 메모리 캐시 사용 불가: {str(e)[:100]}")
+_shared_seen = {}  # key -> 마지막으로 보거나 쓴 seq
+_shared_stats = {'puts': 0, 'pulls': 0, 'applied': 0, 'errors': 0}
+
+
+def _state_encode(key, value):
+    """공유 상태 값 → 바이트. results는 인코딩 엔트리 본문 그대로, 문자열은 이미 직렬화된 JSON."""
+    if key == 'results':
+        return value['body']
+    if isinstance(value, str):
+        return value.encode('utf-8')
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def _shared_put(key, value):
+    sl = None
+    try:
+        sl = _shared_cache.slot(key)
+        _shared_seen[key] = sl.write(_state_encode(key, value))
+        _shared_stats['puts'] += 1
+    except Exception as e:
+        _shared_stats['errors'] += 1
+        _log_throttle(('shared_put', key), 30, f"[경고] 공유 캐시 쓰기 실패 {key}: {str(e)[:80]}")
+
+
+def _shared_pull(key):
+    """공유 캐시 key가 마지막으로 본 seq와 다르면 읽어서 이 프로세스 캐시에 반영. 반환: 반영 여부."""
+    sc = _shared_cache
+    if sc is None or (key in _SHARED_LEADER_KEYS and not _shared_leader_keys_enabled):
+        return False
+    try:
+        sl = sc.slot(key, create=False)
+        if sl is None or sl.seq() == _shared_seen.get(key):
+            return False
+        got = sl.read()
+        if got is None:
+            return False
+        seq, pid, written_ms, data = got
+        first = key not in _shared_seen
+        _shared_seen[key] = seq
+        _shared_stats['pulls'] += 1
+        if pid == os.getpid():
+            return False
+        if first and key in ('results', 'prediction') and time.time() * 1000 - written_ms > SHARED_CACHE_MAX_AGE_SEC * 1000:
+            return False
+        _apply_state_row(key, data.decode('utf-8'))
+        _shared_stats['applied'] += 1
+        return True
+    except Exception as e:
+        _shared_stats['errors'] += 1
+        _log_throttle(('shared_pull', key), 30, f"[경고] 공유 캐시 반영 실패 {key}: {str(e)[:80]}")
+        return False
+
+
+def _shared_sync_tick(prefix=None):
+    """공유 캐시 전체(계산기 세션 포함)를 훑어 바뀐 키만 반영. 롱폴·WebSocket이 다른 워커의 변경에도 깨도록."""
+    if _shared_cache is None:
+        return
+    try:
+        keys = _shared_cache.keys()
+    except OSError:
+        return
+    for key in keys:
+        if prefix is None or key.startswith(prefix):
+            _shared_pull(key)
+
+
+def _shared_sync_loop():
+    while True:
+        time.sleep(SHARED_CACHE_SYNC_SEC)
+        _shared_sync_tick()
+
+
+# 다중 워커(gunicorn --workers N): Postgres advisory lock을 잡은 워커 1개(리더)만 수집·apply·정리 job을 실행.
+# 공유 상태는 app_state_snapshot 테이블로 동기화 — 리더는 results·prediction 캐시를, 모든 워커는 자기가 바꾼 relay를
+# write-behind로 올리고(전역 시퀀스 버전), 각 워커는 STATE_SYNC_SEC마다 키별 버전이 달라진 행만 읽어 캐시·WebSocket·롱폴에 반영.
+# 락은 세션 단위라 리더 프로세스·연결이 죽으면 풀리고, 다른 워커가 LEADER_CHECK_SEC 안에 이어받음.
+WEB_CONCURRENCY = max(1, int(os.getenv('WEB_CONCURRENCY', '1') or 1))
+LEADER_ELECTION = os.getenv('LEADER_ELECTION', 'auto').strip().lower()  # auto: 워커 2개 이상 + DB일 때만 / 1: 강제 / 0: 끔
+LEADER_LOCK_KEY = int(os.getenv('LEADER_LOCK_KEY', '72436501'))
+LEADER_CHECK_SEC = float(os.getenv('LEADER_CHECK_SEC', '2'))
+STATE_SYNC_SEC = float(os.getenv('STATE_SYNC_SEC', '0.2'))
+LEADER_JOB_IDS = ('fetch_results', 'apply_results', 'trim_shape', 'game_partitions')
+_leader_election_enabled = bool(DB_AVAILABLE and DATABASE_URL) and (
+    LEADER_ELECTION in ('1', 'true', 'on') or (LEADER_ELECTION == 'auto' and WEB_CONCURRENCY > 1))
+# 선출 꺼져 있으면(단일 워커) 항상 리더 — 기존 동작 그대로. 읽기 전용 API 프로세스(SHARED_CACHE=reader)는 항상 팔로워
+_leader_election_enabled = _leader_election_enabled and not SHARED_CACHE_READER
+_leader_state = {'leader': not _leader_election_enabled and not SHARED_CACHE_READER, 'conn': None,
+                 'since': time.time() if not (_leader_election_enabled or SHARED_CACHE_READER) else None,
+                 'elections': 0, 'losses': 0, 'last_error': None}
+# 리더 전용 키(results 버전 등)는 생산자가 정확히 하나일 때만 공유 메모리로 주고받음 — 선출 없이 워커가 여럿이면
+# 워커마다 리더로서 제각각 버전을 매겨 올리므로, 다른 워커 값을 받으면 같은 버전·다른 본문(거짓 304)이 생김
+_SHARED_LEADER_KEYS = ('results', 'prediction', 'shape_pick')
+_shared_leader_keys_enabled = SHARED_CACHE_READER or _leader_election_enabled or WEB_CONCURRENCY == 1
+if _shared_cache is not None and not _shared_leader_keys_enabled:
+    print(f"[경고] 공유 메모리 캐시: 리더 선출 없이 워커 {WEB_CONCURRENCY}개 — results·prediction은 공유하지 않음"
+          " (DATABASE_URL·LEADER_ELECTION 확인). relay·계산기 세션만 공유")
+_state_publish_lock = threading.Lock()
+_state_publish_pending = {}   # key -> 값 (같은 key는 최신만)
+_state_published = {}        # key -> 마지막으로 올린 직렬화 문자열 (같은 값 재기록 생략)
+_state_known_versions = {}   # key -> 마지막으로 본 버전 (자기가 올린 것 포함)
+_state_sync_conn = None
+_state_sync_stats = {'ticks': 0, 'published': 0, 'applied': 0, 'errors': 0, 'last_ms': None, 'last_error': None}
+
+
+def _process_token():
+    return f'{os.getenv("HOSTNAME", "")[:40]}:{os.getpid()}'
+
+
+def _state_publish(key, value):
+    """공유 상태 기록: 같은 호스트 공유 메모리는 즉시, DB 스냅샷은 예약(다중 워커일 때만). results는 인코딩 엔트리(body 바이트)를 그대로.
+    calc:<session>은 DB에 자체 테이블(calc_sessions)이 있으므로 공유 메모리로만 — 다중 워커에서는 calc_sessions가 메모리보다 우선."""
+    if key in _SHARED_LEADER_KEYS and not _leader_state['leader']:
+        return
+    if _shared_cache is not None and (_shared_leader_keys_enabled or key not in _SHARED_LEADER_KEYS):
+        _shared_put(key, value)
+    if not _leader_election_enabled or key.startswith('calc:'):
+        return
+    with _state_publish_lock:
+        _state_publish_pending[key] = value
+
+
+def _state_sync_connection():
+    global _state_sync_conn
+    conn = _state_sync_conn
+    if conn is not None and not conn.closed:
+        return conn
+    conn = psycopg2.connect(DATABASE_URL, connect_timeout=5, **_SQL_CONNECT_KW)
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute("SET statement_timeout = '3000'")
+    cur.close()
+    _state_sync_conn = conn
+    return conn
+
+
+def _apply_state_row(key, payload):
+    """다른 워커가 올린 공유 상태 1건을 이 프로세스 캐시에 반영 (DB 스냅샷·공유 메모리 공용)."""
+    global prediction_cache
+    if key == 'results':
+        data = json.loads(payload)
+        enc = _set_results_cache(data, version=data.get('version'))
+        if enc is not None:
+            _refresh_macro_feed(enc['payload'].get('results') or [])  # 매크로 round_actuals·롱폴도 이 워커에서 깨움
+    elif key == 'prediction':
+        sp = json.loads(payload)
+        if sp != prediction_cache:
+            _ws_results_push('prediction_update', {'server_prediction': sp})
+        prediction_cache = sp
+    elif key.startswith('relay:'):
+        cid = int(key.split(':', 1)[1])
+        e = json.loads(payload)
+        _update_current_pick_relay_cache(cid, e.get('round'), e.get('pick_color'), e.get('suggested_amount'), e.get('running', True),
+                                         e.get('probability'), e.get('pick_pred'), publish=False)
+    elif key == 'shape_pick':
+        # 회차별 고정값 — 이미 있는 회차는 덮어쓰지 않음 (먼저 계산한 워커 값 유지)
+        for rnd, v in json.loads(payload).items():
+            _shape_pick_cache.setdefault(int(rnd), v)
+        for k in sorted(_shape_pick_cache)[:-6]:
+            del _shape_pick_cache[k]
+    elif key.startswith('calc:'):
+        sk = key.split(':', 1)[1]
+        st = json.loads(payload)
+        _calc_state_memory[sk] = st
+        _calc_state_get_cache[sk] = (st, time.time())
+
+
+@_sql_scoped('state_sync')
+def _state_sync_tick():
+    """대기 중인 공유 상태를 올리고(키별 최신 1건), 키별 버전이 달라진 다른 워커의 행만 읽어 반영. 한 연결·두 쿼리."""
+    global _state_sync_conn
+    if not _leader_election_enabled:
+        return
+    t0 = time.time()
+    with _state_publish_lock:
+        batch = dict(_state_publish_pending)
+        _state_publish_pending.clear()
+    try:
+        conn = _state_sync_connection()
+        cur = conn.cursor()
+        me = _process_token()
+        for key, value in batch.items():
+            text = _state_encode(key, value).decode('utf-8')
+            if _state_published.get(key) == text:
+                continue
+            cur.execute('''
+                INSERT INTO app_state_snapshot (key, version, origin, payload, updated_at)
+                VALUES (%s, nextval('app_state_version_seq'), %s, %s, NOW())
+                ON CONFLICT (key) DO UPDATE SET version = EXCLUDED.version, origin = EXCLUDED.origin,
+                    payload = EXCLUDED.payload, updated_at = NOW()
+                RETURNING version
+            ''', (key, me, text))
+            _state_known_versions[key] = cur.fetchone()[0]
+            _state_published[key] = text
+            _state_sync_stats['published'] += 1
+        known = list(_state_known_versions.items())
+        cur.execute('''
+            SELECT s.key, s.version, s.origin, s.payload FROM app_state_snapshot s
+            LEFT JOIN (SELECT unnest(%s::text[]) AS key, unnest(%s::bigint[]) AS version) k ON k.key = s.key
+            WHERE k.version IS NULL OR s.version <> k.version
+            ORDER BY s.version
+        ''', ([k for k, _ in known], [v for _, v in known]))
+        rows = cur.fetchall()
+        cur.close()
+        for key, version, origin, payload in rows:
+            _state_known_versions[key] = version
+            if origin == me:
+                continue
+            try:
+                _apply_state_row(key, payload)
+                _state_sync_stats['applied'] += 1
+            except Exception as e:
+                _log_throttle(('state_apply', key), 30, f"[경고] 공유 상태 반영 실패 {key}: {str(e)[:80]}")
+        _state_sync_stats['ticks'] += 1
+    except Exception as e:
+        with _state_publish_lock:
+            for k, v in batch.items():
+                _state_publish_pending.setdefault(k, v)  # 그 사이 들어온 더 새 값 우선
+        _state_sync_stats['errors'] += 1
+        _state_sync_stats['last_error'] = str(e)[:120]
+        try:
+            if _state_sync_conn is not None:
+                _state_sync_conn.close()
+        except Exception:
+            pass
+        _state_sync_conn = None
+        _log_throttle('state_sync_fail', 10, f"[경고] 공유 상태 동기화 실패: {str(e)[:80]}")
+    finally:
+        _state_sync_stats['last_ms'] = round((time.time() - t0) * 1000, 2)
+        _perf_log('state_sync', (time.time() - t0) * 1000)
+
+
+def _set_leader_jobs(leader):
+    if not SCHEDULER_AVAILABLE or not _scheduler.running:
+        return
+    for job_id in LEADER_JOB_IDS:
+        if _scheduler.get_job(job_id) is None:
+            continue
+        try:
+            if leader:
+                _scheduler.resume_job(job_id)
+            else:
+                _scheduler.pause_job(job_id)
+        except Exception as e:
+            print(f"[경고] 리더 job {job_id} 전환 실패: {str(e)[:80]}")
+
+
+def _leader_check():
+    """리더면 락 연결 생존 확인, 아니면 advisory lock 시도. 상태가 바뀌면 리더 전용 job 재개/정지. 반환: 리더 여부."""
+    if not _leader_election_enabled:
+        return True
+    st = _leader_state
+    was = st['leader']
+    conn = st['conn']
+    try:
+        if conn is None or conn.closed:
+            conn = psycopg2.connect(DATABASE_URL, connect_timeout=5, **_SQL_CONNECT_KW)
+            conn.autocommit = True
+            st['conn'] = conn
+        cur = conn.cursor()
+        if was:
+            cur.execute('SELECT 1')  # 세션이 살아 있으면 락도 유지
+            cur.fetchone()
+            now_leader = True
+        else:
+            cur.execute('SELECT pg_try_advisory_lock(%s)', (LEADER_LOCK_KEY,))
+            now_leader = bool(cur.fetchone()[0])
+        cur.close()
+    except Exception as e:
+        st['last_error'] = str(e)[:120]
+        now_leader = False
+        try:
+            if conn is not None:
+                conn.close()
+        except Exception:
+            pass
+        st['conn'] = None
+    if now_leader != was:
+        st['leader'] = now_leader
+        if now_leader:
+            st['since'] = time.time()
+            st['elections'] += 1
+            print(f"[✅] 스케줄러 리더 획득 (pid {os.getpid()}) — 수집·apply 실행")
+        else:
+            st['since'] = None
+            st['losses'] += 1
+            print(f"[⚠] 스케줄러 리더 상실 (pid {os.getpid()}) — 팔로워로 전환")
+        _set_leader_jobs(now_leader)
+    return now_leader
+
+
+def _leader_snapshot():
+    st = _leader_state
+    return {
+        'enabled': _leader_election_enabled,
+        'workers': WEB_CONCURRENCY,
+        'pid': os.getpid(),
+        'leader': st['leader'],
+        'leader_since': datetime.fromtimestamp(st['since']).isoformat() if st['since'] else None,
+        'elections': st['elections'],
+        'losses': st['losses'],
+        'last_error': st['last_error'],
+        'state_sync': dict(_state_sync_stats, known_versions=dict(_state_known_versions)),
+        'shared_cache': None if _shared_cache is None else dict(_shared_stats, dir=SHARED_CACHE_DIR, reader=SHARED_CACHE_READER, keys=len(_shared_seen)),
+    }
+
+
 if SCHEDULER_AVAILABLE:
     _scheduler = BackgroundScheduler()
-    _scheduler.add_job(_scheduler_fetch_results, 'interval', seconds=0.1, id='fetch_results', max_instances=1)   # 0.1초마다 — 부하 완화, 10초 게임 8초 내 배팅 유지
-    _scheduler.add_job(_scheduler_apply_results, 'interval', seconds=0.1, id='apply_results', max_instances=1)   # 0.1초마다 apply
-    _scheduler.add_job(_scheduler_trim_shape_tables, 'interval', seconds=300, id='trim_shape', max_instances=1)
-    def _start_scheduler_delayed():
-        time.sleep(5)
-        _scheduler.start()
-        print("[✅] 결과 수집 스케줄러 시작 (fetch 0.1초, apply 0.1초 — 10초 게임 8초 내 배팅)")
-    threading.Thread(target=_start_scheduler_delayed, daemon=True).start()
-    print("[⏳] 스케줄러는 5초 후 시작")
+    # 리더 전용 job: 선출 사용 시 정지 상태로 등록하고 리더가 되면 재개 (_set_leader_jobs)
+    _leader_job_kw = {'next_run_time': None} if (_leader_election_enabled or SHARED_CACHE_READER) else {}
+    _scheduler.add_job(_scheduler_fetch_results, 'interval', seconds=0.1, id='fetch_results', max_instances=1, **_leader_job_kw)   # 0.1초마다 — 부하 완화, 10초 게임 8초 내 배팅 유지
+    _scheduler.add_job(_scheduler_apply_results, 'interval', seconds=0.1, id='apply_results', max_instances=1, **_leader_job_kw)   # 0.1초마다 apply
+    _scheduler.add_job(_scheduler_trim_shape_tables, 'interval', seconds=300, id='trim_shape', max_instances=1, **_leader_job_kw)
+    if GAME_RESULTS_PARTITIONED:
+        _scheduler.add_job(_maintain_game_partitions, 'interval', seconds=GAME_RESULTS_PARTITION_CHECK_SEC, id='game_partitions', max_instances=1, **_leader_job_kw)
+    _scheduler.add_job(_resend_unacked_picks, 'interval', seconds=max(0.05, PICK_ACK_TIMEOUT_MS / 2000.0), id='pick_resend', max_instances=1)  # ack 없는 매크로에만 픽 재전송
+    _scheduler.add_job(_flush_pick_writes, 'interval', seconds=PICK_WRITE_FLUSH_SEC, id='flush_pick_writes', max_instances=1)  # 픽 write-behind 일괄 저장
+    if _leader_election_enabled:
+        _scheduler.add_job(_leader_check, 'interval', seconds=LEADER_CHECK_SEC, id='leader_check', max_instances=1)
+        _scheduler.add_job(_state_sync_tick, 'interval', seconds=STATE_SYNC_SEC, id='state_sync', max_instances=1)
+    # 시작은 기동 워밍업(_startup_warmup)이 캐시를 채운 직후 — 워밍업과 첫 틱이 같은 일을 중복하지 않게
 else:
     print("[⚠] APScheduler 미설치 - 결과 수집은 브라우저 요청 시에만 동작합니다. pip install APScheduler")
 
@@ -6507,6 +8166,8 @@ RESULTS_HTML = '''
             margin-left: 10px;
         }
     </style>
+    <!-- 서버 푸시(/results 네임스페이스). 로드 실패·차단 시 기존 폴링만으로 동작 -->
+    <script src="https://cdn.socket.io/4.7.5/socket.io.min.js" integrity="sha384-2huaZvOR9iDzHqslqwpR87isEmrfxqyWOF7hr7BY6KG0+hVKLoEXMPUJw3ynWuhO" crossorigin="anonymous" async onload="if (window.initResultsSocket) window.initResultsSocket();"></script>
 </head>
 <body>
     <div class="container">
@@ -6995,6 +8656,11 @@ RESULTS_HTML = '''
         // 최근 150개 결과 저장 (카드 15개, 그래프는 전부 쭉 표시)
         let allResults = [];
         let isLoadingResults = false;  // 중복 요청 방지
+        let lastResultsEtag = null;  // /api/results ETag — 변경 없으면 서버가 304 (본문·파싱·렌더 생략)
+        let lastResultsFull = null;  // 마지막으로 받은(델타 적용 후) 전체 페이로드 — ?since= 델타의 기준
+        let resultsPushPending = null;  // 로딩 중 도착한 푸시 (끝난 뒤 처리). false = 델타 없이 HTTP 재요청
+        let resultsSocket = null;  // /results 네임스페이스 소켓. 연결 중이면 폴링은 느린 보조 주기로
+        let resultsSocketConnected = false;
         let resultsRequestId = 0;       // 응답 순서: 늦게 도착한 응답은 적용 안 함 (깜빡임 방지)
         // 예측 기록 (최근 30회): { round, predicted, actual } — 새로고침 후에도 유지되도록 localStorage 저장
         const PREDICTION_HISTORY_KEY = 'tokenHiloPredictionHistory';
@@ -7656,60 +9322,446 @@ RESULTS_HTML = '''
                 }
             } catch (e) { console.warn('계산기 상태 저장 실패:', e); }
         }
-        async function loadResults() {
-            // 한 번에 하나만 요청: 동시 요청이 쌓여 서버 먹통·pending 폭증 방지
-            if (isLoadingResults) return;
-            const statusEl = document.getElementById('status');
-            if (statusEl) statusEl.textContent = '데이터 요청 중...';
-            const thisRequestId = ++resultsRequestId;
-            
+        // /api/results?since= 델타를 직전 전체 페이로드에 적용해 전체 페이로드 복원. 기준 버전 불일치 시 null (전체 재요청)
+        // 구간반영: 예측 이력(정/꺽 결과) 최근 15/30/100회 전이 확률 중 큰 쪽, 가중 0.5/0.3/0.2 → 예측 확률에 30% 반영
+        function computeBlendData(ph) {
+            var blendData = { p15: null, p30: null, p100: null, newProb: null };
+            var validHistBlend = Array.isArray(ph) ? ph.filter(function(h) { return h && typeof h === 'object'; }) : [];
+            var outcomesNewestFirst = validHistBlend.filter(function(h) { return h.actual !== 'joker'; }).map(function(h) { return h.actual === '정'; }).reverse();
+            if (outcomesNewestFirst.length < 2) return blendData;
+            function transCounts(arr) {
+                var jj = 0, jk = 0, kj = 0, kk = 0;
+                for (var i = 0; i < arr.length - 1; i++) {
+                    var a = arr[i], b = arr[i + 1];
+                    if (a === true && b === true) jj++; else if (a === true && b === false) jk++; else if (a === false && b === true) kj++; else if (a === false && b === false) kk++;
+                }
+                return { jj: jj, jk: jk, kj: kj, kk: kk, jungDenom: jj + jk, kkukDenom: kk + kj };
+            }
+            function probFromTrans(t, lastBool) {
+                if (lastBool === true && t.jungDenom > 0) return { sameP: t.jj / t.jungDenom, changeP: t.jk / t.jungDenom };
+                if (lastBool === false && t.kkukDenom > 0) return { sameP: t.kk / t.kkukDenom, changeP: t.kj / t.kkukDenom };
+                return { sameP: 0.5, changeP: 0.5 };
+            }
+            var lastBool = outcomesNewestFirst[0];
+            var s15 = outcomesNewestFirst.slice(0, Math.min(15, outcomesNewestFirst.length));
+            var s30 = outcomesNewestFirst.slice(0, Math.min(30, outcomesNewestFirst.length));
+            var s100 = outcomesNewestFirst.slice(0, Math.min(100, outcomesNewestFirst.length));
+            var r15 = probFromTrans(transCounts(s15), lastBool), r30 = probFromTrans(transCounts(s30), lastBool), r100 = probFromTrans(transCounts(s100), lastBool);
+            blendData.p15 = s15.length >= 2 ? (r15.sameP >= r15.changeP ? r15.sameP : r15.changeP) * 100 : null;
+            blendData.p30 = s30.length >= 2 ? (r30.sameP >= r30.changeP ? r30.sameP : r30.changeP) * 100 : null;
+            blendData.p100 = s100.length >= 2 ? (r100.sameP >= r100.changeP ? r100.sameP : r100.changeP) * 100 : null;
+            var w15 = s15.length >= 2 ? 0.5 : 0, w30 = s30.length >= 2 ? 0.3 : 0, w100 = s100.length >= 2 ? 0.2 : 0;
+            var denom = w15 + w30 + w100;
+            if (denom > 0) blendData.newProb = (w15 * (blendData.p15 || 50) + w30 * (blendData.p30 || 50) + w100 * (blendData.p100 || 50)) / denom;
+            return blendData;
+        }
+        // 프레임 예산 렌더러: 키별로 최신 작업만 남기고(coalesce) rAF마다 FRAME_BUDGET_MS 안에서 처리, 남으면 다음 프레임으로
+        var FRAME_BUDGET_MS = 8;
+        var renderQueue = new Map();
+        var renderScheduled = false;
+        function scheduleRender(key, fn) {
+            renderQueue.delete(key);
+            renderQueue.set(key, fn);
+            if (!renderScheduled) { renderScheduled = true; requestAnimationFrame(runRenderQueue); }
+        }
+        function runRenderQueue() {
+            renderScheduled = false;
+            var start = performance.now();
+            for (var entry of renderQueue) {
+                renderQueue.delete(entry[0]);
+                try { entry[1](); } catch (e) { console.warn('렌더 오류:', entry[0], e); }
+                if (performance.now() - start >= FRAME_BUDGET_MS) break;
+            }
+            if (renderQueue.size > 0 && !renderScheduled) { renderScheduled = true; requestAnimationFrame(runRenderQueue); }
+        }
+        // 분석 워커: 그래프 값은 직전 전송분 대비 앞쪽 추가분만(증분) 보내고, 워커는 바뀐 뷰모델만 회신. Worker 불가 시 같은 코드(ResultsAnalytics)를 메인에서 실행
+        var analyticsWorker = null;
+        var analyticsSeq = 0;
+        var analyticsSentGv = null;
+        var analyticsSentBlend = null;
+        var analyticsLocalState = null;
+        function initAnalyticsWorker() {
+            var tag = document.querySelector('script[data-results-analytics]');
+            if (!tag || typeof Worker === 'undefined') return;
             try {
-                isLoadingResults = true;
-                const controller = new AbortController();
-                const timeoutId = setTimeout(() => controller.abort(), 3000);
-                
-                const response = await fetch('/api/results?t=' + Date.now(), {
-                    signal: controller.signal,
-                    cache: 'no-cache'
-                });
-                
-                clearTimeout(timeoutId);
-                if (thisRequestId !== resultsRequestId) return;
-                if (statusEl) statusEl.textContent = '결과 표시 중...';
-                
-                if (!response.ok) {
-                    console.warn('결과 로드 실패:', response.status, response.statusText);
-                    if (statusEl) statusEl.textContent = '결과 로드 실패 (' + response.status + ')';
-                    return;
+                analyticsWorker = new Worker(tag.src);
+                analyticsWorker.onmessage = function(e) {
+                    var msg = e.data || {};
+                    if (msg.type === 'resync') { analyticsSentGv = null; analyticsSentBlend = null; return; }
+                    if (msg.type === 'vm' && msg.changed) applyAnalyticsViewModels(msg.changed);
+                };
+                analyticsWorker.onerror = function(e) {
+                    console.warn('분석 워커 오류 — 메인 스레드 계산으로 전환:', e && e.message);
+                    try { analyticsWorker.terminate(); } catch (err) {}
+                    analyticsWorker = null;
+                    analyticsSentGv = null;
+                    analyticsSentBlend = null;
+                };
+            } catch (e) { analyticsWorker = null; }
+        }
+        // next가 prev 앞에 k개를 붙이고 뒤를 자른 형태면 k, 아니면 -1 (새 회차는 보통 k=0~1)
+        function gvPrependCount(prev, next) {
+            for (var k = 0; k <= 5 && k <= next.length; k++) {
+                var n = next.length - k;
+                if (n > prev.length) continue;
+                var same = true;
+                for (var i = 0; i < n; i++) { if (next[k + i] !== prev[i]) { same = false; break; } }
+                if (same) return k;
+            }
+            return -1;
+        }
+        function postAnalyticsUpdate(gv, blend) {
+            gv = Array.isArray(gv) ? gv : [];
+            var blendKey = JSON.stringify([blend && blend.p15, blend && blend.p30, blend && blend.p100]);
+            var k = analyticsSentGv ? gvPrependCount(analyticsSentGv, gv) : -1;
+            if (k === 0 && gv.length === analyticsSentGv.length && blendKey === analyticsSentBlend) return;  // 변화 없음 — 전송·렌더 생략
+            var msg = { type: 'update', seq: ++analyticsSeq, length: gv.length };
+            if (k < 0) { msg.reset = true; msg.gv = gv.slice(); } else { msg.prepend = gv.slice(0, k); }
+            if (blendKey !== analyticsSentBlend) { msg.blend = blend ? { p15: blend.p15, p30: blend.p30, p100: blend.p100 } : null; analyticsSentBlend = blendKey; }
+            analyticsSentGv = gv.slice();
+            if (analyticsWorker) { analyticsWorker.postMessage(msg); return; }
+            if (!window.ResultsAnalytics) return;
+            if (!analyticsLocalState || msg.reset) analyticsLocalState = ResultsAnalytics.createState();
+            ResultsAnalytics.applyUpdate(analyticsLocalState, msg);
+            var changed = ResultsAnalytics.diffViewModels(analyticsLocalState);
+            if (changed) applyAnalyticsViewModels(changed);
+        }
+        // 키 기반 증분 DOM 패치: 같은 키(회차 등) 노드는 재사용하고 sig가 바뀐 노드만 update, 자리가 어긋난 노드만 이동.
+        // 밀려난 노드는 parent.__pool에 두었다가 새 키에 재활용 → DOM 쓰기는 바뀐 항목 수만큼 (표 크기 무관)
+        var DOM_POOL_MAX = 40;
+        function patchKeyedChildren(parent, items, create, update) {
+            var byKey = new Map();
+            var child = parent.firstElementChild;
+            while (child) {
+                var nextChild = child.nextElementSibling;
+                if (child.__key != null && !byKey.has(child.__key)) byKey.set(child.__key, child);
+                else parent.removeChild(child);  // 다른 코드가 innerHTML로 넣은 노드·중복 키
+                child = nextChild;
+            }
+            var wanted = new Set();
+            items.forEach(function(it) { wanted.add(it.key); });
+            var pool = parent.__pool || (parent.__pool = []);
+            var ref = parent.firstElementChild;
+            for (var i = 0; i < items.length; i++) {
+                var it = items[i];
+                while (ref && !wanted.has(ref.__key)) ref = ref.nextElementSibling;
+                var node = byKey.get(it.key);
+                if (node) byKey.delete(it.key);
+                else {
+                    node = pool.pop() || create(it);
+                    node.__key = it.key;
                 }
-                
-                const data = await response.json();
-                if (thisRequestId !== resultsRequestId) return;
-                var hasResults = Array.isArray(data.results) && data.results.length > 0;
-                if (data.error && !hasResults) {
-                    if (statusEl) statusEl.textContent = '오류: ' + data.error;
-                    return;
+                if (node.__sig !== it.sig) { update(node, it); node.__sig = it.sig; }
+                if (node === ref) ref = ref.nextElementSibling;
+                else parent.insertBefore(node, ref);
+            }
+            byKey.forEach(function(node) {
+                parent.removeChild(node);
+                if (pool.length < DOM_POOL_MAX) pool.push(node);
+            });
+        }
+        function setPartHtml(el, html) {
+            if (el && el.__html !== html) { el.innerHTML = html; el.__html = html; }
+        }
+        // 상단 15장 카드: gameID 키, 카드·카테고리·정꺽이 같으면 노드 그대로
+        function patchResultCards(cardsDiv, displayResults, cardMatchValues) {
+            var seen = {};
+            var items = displayResults.map(function(r, i) {
+                var key = (r.gameID != null && r.gameID !== '') ? String(r.gameID) : '#' + i;
+                if (seen[key]) key += '#' + i;
+                seen[key] = true;
+                var m = cardMatchValues[i];
+                return { key: key, result: r, index: i, match: m,
+                    sig: [r.result, r.joker, r.hi, r.lo, r.red, r.black, typeof m === 'boolean' ? m : ''].join('|') };
+            });
+            patchKeyedChildren(cardsDiv, items, function() { return document.createElement('div'); }, function(node, it) {
+                var fresh;
+                try { fresh = createCard(it.result, it.index, it.match); } catch (error) {
+                    console.error('카드 생성 오류:', error, it.result);
+                    fresh = document.createElement('div');
+                    fresh.className = 'card-wrapper';
                 }
-                // 서버에 저장된 시스템 예측 기록 복원 (어디서 접속해도 동일). 무효 항목 제거해 ReferenceError 방지
-                if (Object.prototype.hasOwnProperty.call(data, 'prediction_history') && Array.isArray(data.prediction_history)) {
-                    predictionHistory = data.prediction_history.slice(-300).filter(function(h) { return h && typeof h === 'object'; });
-                    roundActualsFromServer = (data.round_actuals && typeof data.round_actuals === 'object') ? data.round_actuals : {};
-                    savePredictionHistory();
-                    if (typeof renderWinRateDirectionPanel === 'function') renderWinRateDirectionPanel();
-                    // 서버 prediction_history로 계산기 히스토리 '대기' 보정 — actual(결과)만 서버 값으로 채움. 픽(predicted/pickColor)은 배팅중 픽 유지(덮어쓰지 않음)
-                    (function syncCalcHistoryFromServerPrediction() {
-                        if (!Array.isArray(predictionHistory) || predictionHistory.length === 0) return;
-                        var byRound = {};
-                        predictionHistory.forEach(function(p) {
-                            if (p && typeof p === 'object' && p.round != null && p.actual != null && p.actual !== '') {
-                                byRound[Number(p.round)] = { actual: p.actual };
-                            }
-                        });
-                        var changed = false;
-                        CALC_IDS.forEach(function(id) {
-                            var hist = calcState[id].history || [];
-                            hist.forEach(function(h) {
-                                if (!h || h.actual !== 'pending') return;
+                node.className = fresh.className;
+                node.textContent = '';
+                while (fresh.firstChild) node.appendChild(fresh.firstChild);
+            });
+        }
+        // 계산기 미니 카드 15칸 (빈 칸은 위치 키)
+        function patchCalcMiniCards(el, displayResults) {
+            var n = displayResults.length < 15 ? displayResults.length : 15;
+            var items = [];
+            for (var i = 0; i < 15; i++) {
+                var r = i < n ? displayResults[i] : null;
+                var cls = 'calc-mini-card', html;
+                if (r && r.joker) {
+                    cls += ' joker';
+                    html = '<span class="calc-mini-suit">J</span><span class="calc-mini-value">K</span>';
+                } else if (r && r.result) {
+                    var info = parseCardValue(r.result || '');
+                    cls += info.isRed ? ' red' : ' black';
+                    html = '<span class="calc-mini-suit">' + (info.suit || '') + '</span><span class="calc-mini-value">' + (info.number || '') + '</span>';
+                } else {
+                    cls += ' empty';
+                    html = '<span class="calc-mini-value">—</span>';
+                }
+                var key = (r && r.gameID != null && r.gameID !== '') ? String(r.gameID) : '#' + i;
+                items.push({ key: key, cls: cls, html: html, sig: cls + html });
+            }
+            patchKeyedChildren(el, items, function() { return document.createElement('div'); }, function(node, it) {
+                node.className = it.cls;
+                node.innerHTML = it.html;
+            });
+        }
+        // 정/꺽 열: 새 회차는 머리 열 길이만 바뀌거나(시프트 0) 새 열이 앞에 붙음(시프트 1~2).
+        // 가운데 열이 맞는 시프트만큼 앞에 열을 끼우고, 이후 열별 sig가 다른 열(머리·꼬리)만 블록 단위로 고침
+        function graphColumnSig(seg, thresh) {
+            return (seg.type === true ? 'j' : 'k') + seg.count + (thresh != null ? '/' + thresh : '');
+        }
+        function fillGraphColumn(col, seg, colClass, blockClass, numClass, thresh) {
+            col.className = colClass;
+            var num = col.lastElementChild;
+            if (!num || num.className !== numClass) {
+                col.textContent = '';
+                num = document.createElement('span');
+                num.className = numClass;
+                col.appendChild(num);
+            }
+            var cls = blockClass + ' ' + (seg.type === true ? 'jung' : 'kkuk');
+            var txt = seg.type === true ? '정' : '꺽';
+            var blocks = col.children.length - 1;
+            while (blocks > seg.count) { col.removeChild(col.firstElementChild); blocks--; }
+            for (var b = col.firstElementChild; b && b !== num; b = b.nextElementSibling) {
+                if (b.className !== cls) { b.className = cls; b.textContent = txt; }
+            }
+            while (blocks < seg.count) {
+                var block = document.createElement('div');
+                block.className = cls;
+                block.textContent = txt;
+                col.insertBefore(block, num);
+                blocks++;
+            }
+            num.textContent = seg.count;
+            if (thresh != null) num.title = seg.count >= thresh ? '장줄' : (seg.count == 1 ? '퐁당' : '짧은줄');
+            else num.removeAttribute('title');
+        }
+        function renderGraphColumns(el, segments, colClass, blockClass, numClass, thresh) {
+            var cols = el.children;
+            var prev = el.__segSigs || [];
+            var sigs = segments.map(function(s) { return graphColumnSig(s, thresh); });
+            if (cols.length !== prev.length) { el.textContent = ''; prev = []; }  // 다른 경로가 내용을 바꿈 → 처음부터
+            var shift = 0;
+            if (prev.length > 2) {
+                for (var s = 0; s <= 2; s++) {
+                    if (sigs[1 + s] === prev[1] && sigs[2 + s] === prev[2]) { shift = s; break; }
+                }
+            }
+            var pool = el.__pool || (el.__pool = []);
+            for (var p = 0; p < shift; p++) el.insertBefore(pool.pop() || document.createElement('div'), el.firstChild);
+            for (var i = 0; i < segments.length; i++) {
+                var col = cols[i];
+                if (!col) { col = pool.pop() || document.createElement('div'); el.appendChild(col); }
+                if (col.__sig !== sigs[i]) {
+                    fillGraphColumn(col, segments[i], colClass, blockClass, numClass, thresh);
+                    col.__sig = sigs[i];
+                }
+            }
+            while (cols.length > segments.length) {
+                var last = el.lastElementChild;
+                el.removeChild(last);
+                if (pool.length < DOM_POOL_MAX) pool.push(last);
+            }
+            el.__segSigs = sigs;
+        }
+        // 예측기표(회차=열): 회차 키로 열 단위 패치 — 새 회차 열 추가, 값이 바뀐 칸(결과 도착한 회차)만 교체, 밀려난 회차 열 제거
+        function parseTableCell(html) {
+            var tmp = document.createElement('tr');
+            tmp.innerHTML = html;
+            var cell = tmp.firstElementChild;
+            cell.__html = html;
+            return cell;
+        }
+        function patchStreakColumns(container, t) {
+            var table = container.__table;
+            if (!table || !container.contains(table) || table.__rowCount !== t.rows.length) {
+                container.innerHTML = '<div class="main-streak-table-wrap" data-section="예측기표"><table class="main-streak-table" aria-label="예측기표">' +
+                    '<thead><tr><th>구분</th></tr></thead><tbody>' +
+                    t.rows.map(function(r) { return '<tr><td>' + r[0] + '</td></tr>'; }).join('') +
+                    '</tbody></table></div>';
+                container.__html = null;
+                table = container.__table = container.querySelector('table');
+                table.__rowCount = t.rows.length;
+                table.__keys = [];
+            }
+            var trs = [table.tHead.rows[0]].concat(Array.prototype.slice.call(table.tBodies[0].rows));
+            var cols = [t.head].concat(t.rows.map(function(r) { return r[1]; }));
+            var keys = table.__keys;
+            var wanted = new Set(t.keys);
+            for (var k = keys.length - 1; k >= 0; k--) {
+                if (wanted.has(keys[k])) continue;
+                trs.forEach(function(tr) { var c = tr.cells[k + 1]; if (c) tr.removeChild(c); });
+                keys.splice(k, 1);
+            }
+            t.keys.forEach(function(key, i) {
+                if (keys[i] === key) return;
+                var j = keys.indexOf(key);
+                trs.forEach(function(tr, r) {
+                    var before = tr.cells[i + 1] || null;
+                    tr.insertBefore(j >= 0 ? tr.cells[j + 1] : parseTableCell(cols[r][i]), before);
+                });
+                if (j >= 0) keys.splice(j, 1);
+                keys.splice(i, 0, key);
+            });
+            trs.forEach(function(tr, r) {
+                for (var i = 0; i < t.keys.length; i++) {
+                    var cell = tr.cells[i + 1];
+                    if (cell.__html !== cols[r][i]) tr.replaceChild(parseTableCell(cols[r][i]), cell);
+                }
+            });
+        }
+        // 예측기표 박스: 안내·통계·표·연승줄·흐름 구역을 나눠 바뀐 구역만 교체 (display:contents라 레이아웃 영향 없음)
+        var PREDICTION_BOX_PARTS = ['notice', 'stats', 'table', 'streak', 'extra'];
+        function ensurePredictionParts(box) {
+            var parts = box.__parts;
+            if (!parts || parts.notice.parentNode !== box) {
+                box.innerHTML = PREDICTION_BOX_PARTS.map(function(name) { return '<div data-part="' + name + '" style="display:contents"></div>'; }).join('');
+                parts = box.__parts = {};
+                PREDICTION_BOX_PARTS.forEach(function(name, i) { parts[name] = box.children[i]; });
+            }
+            return parts;
+        }
+        function applyAnalyticsViewModels(changed) {
+            if (changed.graph) {
+                var g = changed.graph;
+                scheduleRender('graph', function() {
+                    var graphDiv = document.getElementById('jung-kkuk-graph');
+                    if (graphDiv) renderGraphColumns(graphDiv, g.segments, 'graph-column', 'graph-block', 'graph-column-num', g.thresh);
+                });
+            }
+            if (changed.mini) {
+                var m = changed.mini;
+                scheduleRender('mini', function() {
+                    [1, 2, 3].forEach(function(id) {
+                        var miniEl = document.getElementById('calc-' + id + '-mini-graph');
+                        if (miniEl) renderGraphColumns(miniEl, m.segments, 'calc-mini-col', 'calc-mini-block', 'calc-mini-col-num', null);
+                    });
+                });
+            }
+            if (changed.stats && changed.stats.html != null) {
+                var html = changed.stats.html;
+                scheduleRender('stats', function() {
+                    var statsDiv = document.getElementById('graph-stats');
+                    if (statsDiv) statsDiv.innerHTML = html;
+                });
+            }
+        }
+        function applyResultsDelta(base, delta) {
+            if (!base || base.version !== delta.since) return null;
+            var out = Object.assign({}, base, delta.fields || {});
+            (delta.fields_removed || []).forEach(function(k) { delete out[k]; });
+            var removedIds = {};
+            (delta.results_removed || []).forEach(function(id) { removedIds[String(id)] = true; });
+            var byId = {};
+            (base.results || []).forEach(function(r) { var id = String(r.gameID); if (!removedIds[id]) byId[id] = r; });
+            (delta.results_upsert || []).forEach(function(r) { byId[String(r.gameID)] = r; });
+            out.results = Object.keys(byId).map(function(id) { return byId[id]; }).sort(function(a, b) {
+                var na = parseInt(String(a.gameID || ''), 10), nb = parseInt(String(b.gameID || ''), 10);
+                if (!isNaN(na) && !isNaN(nb)) return nb - na;
+                return String(b.gameID || '').localeCompare(String(a.gameID || ''));
+            });
+            if (Array.isArray(delta.prediction_history)) {
+                out.prediction_history = delta.prediction_history;
+            } else {
+                var removedRounds = {};
+                (delta.ph_removed || []).forEach(function(rnd) { removedRounds[String(rnd)] = true; });
+                var byRound = {};
+                (base.prediction_history || []).forEach(function(h) { if (h && !removedRounds[String(h.round)]) byRound[String(h.round)] = h; });
+                (delta.ph_upsert || []).forEach(function(h) { byRound[String(h.round)] = h; });
+                out.prediction_history = Object.keys(byRound).map(function(k) { return byRound[k]; }).sort(function(a, b) { return Number(a.round) - Number(b.round); });
+            }
+            out.version = delta.version;
+            return out;
+        }
+        // pushed: 서버 푸시로 받은 델타 { data, etag } — 있으면 HTTP 요청 없이 적용. 로딩 중 도착한 푸시는 끝난 뒤 1회 처리
+        async function loadResults(pushed) {
+            // 한 번에 하나만 요청: 동시 요청이 쌓여 서버 먹통·pending 폭증 방지
+            if (isLoadingResults) { if (pushed !== undefined) resultsPushPending = pushed; return; }
+            const statusEl = document.getElementById('status');
+            const prevStatusText = statusEl ? statusEl.textContent : '';
+            if (statusEl && !pushed) statusEl.textContent = '데이터 요청 중...';
+            const thisRequestId = ++resultsRequestId;
+            
+            try {
+                isLoadingResults = true;
+                let data, respEtag;
+                if (pushed && pushed.data) {
+                    data = pushed.data;
+                    respEtag = pushed.etag || null;
+                } else {
+                    const controller = new AbortController();
+                    const timeoutId = setTimeout(() => controller.abort(), 3000);
+                    const reqHeaders = {};
+                    if (lastResultsEtag && allResults.length > 0) reqHeaders['If-None-Match'] = lastResultsEtag;
+                
+                    // 직전 버전 이후 바뀐 것만 받음 (서버 이력 밖이면 서버가 전체 스냅샷으로 응답)
+                    const resultsUrl = (lastResultsFull && lastResultsFull.version != null) ? ('/api/results?since=' + lastResultsFull.version) : '/api/results';
+                    const response = await fetch(resultsUrl, {
+                        signal: controller.signal,
+                        cache: 'no-store',
+                        headers: reqHeaders
+                    });
+                
+                    clearTimeout(timeoutId);
+                    if (thisRequestId !== resultsRequestId) return;
+                    // 304: 서버 버전 동일 — 화면 그대로 유지
+                    if (response.status === 304) {
+                        if (statusEl) statusEl.textContent = prevStatusText;
+                        lastResultsUpdate = Date.now();
+                        return;
+                    }
+                    if (statusEl) statusEl.textContent = '결과 표시 중...';
+                
+                    if (!response.ok) {
+                        console.warn('결과 로드 실패:', response.status, response.statusText);
+                        if (statusEl) statusEl.textContent = '결과 로드 실패 (' + response.status + ')';
+                        return;
+                    }
+                
+                    data = await response.json();
+                    respEtag = response.headers.get('ETag');
+                }
+                if (thisRequestId !== resultsRequestId) return;
+                if (data && data.delta) {
+                    data = applyResultsDelta(lastResultsFull, data);
+                    if (!data) { lastResultsFull = null; lastResultsEtag = null; lastResultsUpdate = 0; return; }
+                }
+                lastResultsFull = (data && data.version != null) ? data : null;
+                lastResultsEtag = respEtag;
+                if (pushed) lastResultsUpdate = Date.now();
+                var hasResults = Array.isArray(data.results) && data.results.length > 0;
+                if (data.error && !hasResults) {
+                    if (statusEl) statusEl.textContent = '오류: ' + data.error;
+                    return;
+                }
+                // 서버에 저장된 시스템 예측 기록 복원 (어디서 접속해도 동일). 무효 항목 제거해 ReferenceError 방지
+                if (Object.prototype.hasOwnProperty.call(data, 'prediction_history') && Array.isArray(data.prediction_history)) {
+                    predictionHistory = data.prediction_history.slice(-300).filter(function(h) { return h && typeof h === 'object'; });
+                    roundActualsFromServer = (data.round_actuals && typeof data.round_actuals === 'object') ? data.round_actuals : {};
+                    savePredictionHistory();
+                    if (typeof renderWinRateDirectionPanel === 'function') renderWinRateDirectionPanel();
+                    // 서버 prediction_history로 계산기 히스토리 '대기' 보정 — actual(결과)만 서버 값으로 채움. 픽(predicted/pickColor)은 배팅중 픽 유지(덮어쓰지 않음)
+                    (function syncCalcHistoryFromServerPrediction() {
+                        if (!Array.isArray(predictionHistory) || predictionHistory.length === 0) return;
+                        var byRound = {};
+                        predictionHistory.forEach(function(p) {
+                            if (p && typeof p === 'object' && p.round != null && p.actual != null && p.actual !== '') {
+                                byRound[Number(p.round)] = { actual: p.actual };
+                            }
+                        });
+                        var changed = false;
+                        CALC_IDS.forEach(function(id) {
+                            var hist = calcState[id].history || [];
+                            hist.forEach(function(h) {
+                                if (!h || h.actual !== 'pending') return;
                                 var r = Number(h.round);
                                 if (isNaN(r)) return;
                                 var fromServer = byRound[r];
@@ -7893,31 +9945,7 @@ RESULTS_HTML = '''
                 // 계산기 15개 결과 카드 (상단 카드와 동일·작게, 그래프 위, 좌=최신)
                 [1, 2, 3].forEach(function(cid) {
                     var el = document.getElementById('calc-' + cid + '-result-cards');
-                    if (!el) return;
-                    el.innerHTML = '';
-                    for (var i = 0; i < (displayResults.length < 15 ? displayResults.length : 15); i++) {
-                        var r = displayResults[i];
-                        var mini = document.createElement('div');
-                        mini.className = 'calc-mini-card';
-                        if (r && r.joker) {
-                            mini.classList.add('joker');
-                            mini.innerHTML = '<span class="calc-mini-suit">J</span><span class="calc-mini-value">K</span>';
-                        } else if (r && r.result) {
-                            var info = parseCardValue(r.result || '');
-                            mini.classList.add(info.isRed ? 'red' : 'black');
-                            mini.innerHTML = '<span class="calc-mini-suit">' + (info.suit || '') + '</span><span class="calc-mini-value">' + (info.number || '') + '</span>';
-                        } else {
-                            mini.classList.add('empty');
-                            mini.innerHTML = '<span class="calc-mini-value">—</span>';
-                        }
-                        el.appendChild(mini);
-                    }
-                    for (var j = (displayResults.length < 15 ? displayResults.length : 15); j < 15; j++) {
-                        var empty = document.createElement('div');
-                        empty.className = 'calc-mini-card empty';
-                        empty.innerHTML = '<span class="calc-mini-value">—</span>';
-                        el.appendChild(empty);
-                    }
+                    if (el) patchCalcMiniCards(el, displayResults);
                 });
                 
                 // 헤더에 기준 색상 표시 (15번째 카드, 조커면 표시)
@@ -7940,9 +9968,8 @@ RESULTS_HTML = '''
                     }
                 }
                 
-                cardsDiv.innerHTML = '';
-                
                 if (displayResults.length === 0) {
+                    cardsDiv.innerHTML = '';
                     statusElement.textContent = '경기 결과가 없습니다';
                     return;
                 }
@@ -7961,97 +9988,15 @@ RESULTS_HTML = '''
                 const graphValues = (results.length >= 16) ? graphColorMatchResults : [];
                 try { window.__lastGraphValues = graphValues; } catch (e) {}
                 
-                displayResults.forEach((result, index) => {
-                    try {
-                        const matchResult = cardMatchValues[index];
-                        const card = createCard(result, index, matchResult);
-                        cardsDiv.appendChild(card);
-                    } catch (error) {
-                        console.error('카드 생성 오류:', error, result);
-                    }
-                });
+                // 회차(gameID) 키로 바뀐 카드만 교체 — 새 회차 1장 추가·밀려난 1장 재활용
+                patchResultCards(cardsDiv, displayResults, cardMatchValues);
                 
-                // 정/꺽 블록 그래프: 조커(null)는 무시하고 같은 타입끼리만 한 열에 쌓기
-                const graphDiv = document.getElementById('jung-kkuk-graph');
-                if (graphDiv) {
-                    graphDiv.innerHTML = '';
-                    const filtered = graphValues.filter(v => v === true || v === false);
-                    const segments = [];
-                    let current = null;
-                    let count = 0;
-                    filtered.forEach(v => {
-                        if (v === current) {
-                            count++;
-                        } else {
-                            if (current !== null) segments.push({ type: current, count: count });
-                            current = v;
-                            count = 1;
-                        }
-                    });
-                    if (current !== null) segments.push({ type: current, count: count });
-                    const heights = segments.map(s => s.count);
-                    function getDynamicLineThreshold(h, w) {
-                        if (!h || h.length === 0) return 4;
-                        const lineHeights = h.slice(0, w).filter(x => x >= 2);
-                        if (lineHeights.length < 5) return 4;
-                        const avg = lineHeights.reduce((a, b) => a + b, 0) / lineHeights.length;
-                        const raw = Math.round(avg + 0.5);
-                        return Math.max(3, Math.min(6, raw));
-                    }
-                    const dynThresh = getDynamicLineThreshold(heights, 20);
-                    segments.forEach(seg => {
-                        const col = document.createElement('div');
-                        col.className = 'graph-column';
-                        for (let i = 0; i < seg.count; i++) {
-                            const block = document.createElement('div');
-                            block.className = 'graph-block ' + (seg.type === true ? 'jung' : 'kkuk');
-                            block.textContent = seg.type === true ? '정' : '꺽';
-                            col.appendChild(block);
-                        }
-                        const numSpan = document.createElement('span');
-                        numSpan.className = 'graph-column-num';
-                        numSpan.textContent = seg.count;
-                        numSpan.title = seg.count >= dynThresh ? '장줄' : (seg.count == 1 ? '퐁당' : '짧은줄');
-                        col.appendChild(numSpan);
-                        graphDiv.appendChild(col);
-                    });
-                }
-                // 계산기 내 미니 그래프: 최근 25열, 작은 블록 (메인과 동일 데이터)
-                [1, 2, 3].forEach(function(id) {
-                    var miniEl = document.getElementById('calc-' + id + '-mini-graph');
-                    if (miniEl && graphValues && Array.isArray(graphValues) && graphValues.length >= 2) {
-                        var filtered = graphValues.filter(function(v) { return v === true || v === false; });
-                        var segments = [];
-                        var current = null, count = 0;
-                        filtered.forEach(function(v) {
-                            if (v === current) { count++; } else {
-                                if (current !== null) segments.push({ type: current, count: count });
-                                current = v; count = 1;
-                            }
-                        });
-                        if (current !== null) segments.push({ type: current, count: count });
-                        var take = Math.min(25, segments.length);
-                        var show = segments.slice(0, take);
-                        miniEl.innerHTML = '';
-                        show.forEach(function(seg) {
-                            var col = document.createElement('div');
-                            col.className = 'calc-mini-col';
-                            for (var i = 0; i < seg.count; i++) {
-                                var block = document.createElement('div');
-                                block.className = 'calc-mini-block ' + (seg.type === true ? 'jung' : 'kkuk');
-                                block.textContent = seg.type === true ? '정' : '꺽';
-                                col.appendChild(block);
-                            }
-                            var numSpan = document.createElement('span');
-                            numSpan.className = 'calc-mini-col-num';
-                            numSpan.textContent = seg.count;
-                            col.appendChild(numSpan);
-                            miniEl.appendChild(col);
-                        });
-                    } else if (miniEl) { miniEl.innerHTML = ''; }
-                });
+                // 정/꺽 블록 그래프·계산기 미니 그래프·전이 확률 표: 분석 워커가 계산해 바뀐 뷰모델만 돌려주면 프레임 예산 안에서 렌더
+                // 구간반영(예측이력 15/30/100회)은 아래 예측 확률에도 쓰이므로 메인 스레드에서 동기 계산
+                var blendData = computeBlendData(predictionHistory);
+                postAnalyticsUpdate(graphValues, blendData);
                 
-                // 전이 확률 표: 전체 / 최근 30회 (연속된 비-null 쌍만 사용)
+                // 전이 확률: 최근 15/30회는 아래 예측 계산에 바로 쓰므로 동기 계산 (전체·표 렌더는 분석 워커)
                 function calcTransitions(arr) {
                     let jj = 0, jk = 0, kj = 0, kk = 0;
                     for (let i = 0; i < arr.length - 1; i++) {
@@ -8062,65 +10007,15 @@ RESULTS_HTML = '''
                         else if (a === false && b === true) kj++;
                         else kk++;
                     }
-                    const jungDenom = jj + jk, kkukDenom = kk + kj;
-                    return {
-                        pJung: jungDenom > 0 ? (100 * jj / jungDenom).toFixed(1) : '-',
-                        pKkuk: kkukDenom > 0 ? (100 * kk / kkukDenom).toFixed(1) : '-',
-                        pJungToKkuk: jungDenom > 0 ? (100 * jk / jungDenom).toFixed(1) : '-',
-                        pKkukToJung: kkukDenom > 0 ? (100 * kj / kkukDenom).toFixed(1) : '-',
-                        jj, jk, kj, kk, jungDenom, kkukDenom
-                    };
+                    return { jj, jk, kj, kk, jungDenom: jj + jk, kkukDenom: kk + kj };
                 }
-                var blendData = { p15: null, p30: null, p100: null, newProb: null };
                 const statsDiv = document.getElementById('graph-stats');
                 if (statsDiv && graphValues && Array.isArray(graphValues) && graphValues.length >= 2) {
                     if (!Array.isArray(predictionHistory)) predictionHistory = [];
                     let symmetryLineData = null;
                     let symmetryWindowsUsed = [];
-                    const full = calcTransitions(graphValues);
                     const recent30 = calcTransitions(graphValues.slice(0, 30));
                     const short15 = graphValues.length >= 15 ? calcTransitions(graphValues.slice(0, 15)) : null;
-                    const fmt = (p, n, d) => d > 0 ? p + '% (' + n + '/' + d + ')' : '-';
-                    // 예측 이력으로 15/30/100 구간 반영값 계산 (표 맨 아랫줄 + 확률 30% 반영용)
-                    const validHistBlend = Array.isArray(predictionHistory) ? predictionHistory.filter(function(h) { return h && typeof h === 'object'; }) : [];
-                    const outcomesNewestFirst = validHistBlend.filter(function(h) { return h.actual !== 'joker'; }).map(function(h) { return h.actual === '정'; }).reverse();
-                    if (outcomesNewestFirst.length >= 2) {
-                        function transCounts(arr) {
-                            var jj = 0, jk = 0, kj = 0, kk = 0;
-                            for (var i = 0; i < arr.length - 1; i++) {
-                                var a = arr[i], b = arr[i + 1];
-                                if (a === true && b === true) jj++; else if (a === true && b === false) jk++; else if (a === false && b === true) kj++; else if (a === false && b === false) kk++;
-                            }
-                            return { jj: jj, jk: jk, kj: kj, kk: kk, jungDenom: jj + jk, kkukDenom: kk + kj };
-                        }
-                        function probFromTrans(t, lastBool) {
-                            if (lastBool === true && t.jungDenom > 0) { var sameP = t.jj / t.jungDenom, changeP = t.jk / t.jungDenom; return { sameP: sameP, changeP: changeP }; }
-                            if (lastBool === false && t.kkukDenom > 0) { var sameP = t.kk / t.kkukDenom, changeP = t.kj / t.kkukDenom; return { sameP: sameP, changeP: changeP }; }
-                            return { sameP: 0.5, changeP: 0.5 };
-                        }
-                        var lastBool = outcomesNewestFirst[0];
-                        var s15 = outcomesNewestFirst.slice(0, Math.min(15, outcomesNewestFirst.length));
-                        var s30 = outcomesNewestFirst.slice(0, Math.min(30, outcomesNewestFirst.length));
-                        var s100 = outcomesNewestFirst.slice(0, Math.min(100, outcomesNewestFirst.length));
-                        var t15 = transCounts(s15), t30 = transCounts(s30), t100 = transCounts(s100);
-                        var r15 = probFromTrans(t15, lastBool), r30 = probFromTrans(t30, lastBool), r100 = probFromTrans(t100, lastBool);
-                        blendData.p15 = s15.length >= 2 ? (r15.sameP >= r15.changeP ? r15.sameP : r15.changeP) * 100 : null;
-                        blendData.p30 = s30.length >= 2 ? (r30.sameP >= r30.changeP ? r30.sameP : r30.changeP) * 100 : null;
-                        blendData.p100 = s100.length >= 2 ? (r100.sameP >= r100.changeP ? r100.sameP : r100.changeP) * 100 : null;
-                        var w15 = s15.length >= 2 ? 0.5 : 0, w30 = s30.length >= 2 ? 0.3 : 0, w100 = s100.length >= 2 ? 0.2 : 0;
-                        var denom = w15 + w30 + w100;
-                        if (denom > 0) blendData.newProb = (w15 * (blendData.p15 || 50) + w30 * (blendData.p30 || 50) + w100 * (blendData.p100 || 50)) / denom;
-                    }
-                    var rowBlend15 = blendData.p15 != null ? Number(blendData.p15).toFixed(1) + '%' : '-';
-                    var rowBlend30 = blendData.p30 != null ? Number(blendData.p30).toFixed(1) + '%' : '-';
-                    var rowBlend100 = blendData.p100 != null ? Number(blendData.p100).toFixed(1) + '%' : '-';
-                    statsDiv.innerHTML = '<table><thead><tr><th></th><th>최근 15회</th><th>최근 30회</th><th>전체</th></tr></thead><tbody>' +
-                        '<tr><td><span class="jung-next">정 ↑</span></td><td>' + (short15 ? fmt(short15.pJung, short15.jj, short15.jungDenom) : '-') + '</td><td>' + fmt(recent30.pJung, recent30.jj, recent30.jungDenom) + '</td><td>' + fmt(full.pJung, full.jj, full.jungDenom) + '</td></tr>' +
-                        '<tr><td><span class="kkuk-next">꺽 ↑</span></td><td>' + (short15 ? fmt(short15.pKkuk, short15.kk, short15.kkukDenom) : '-') + '</td><td>' + fmt(recent30.pKkuk, recent30.kk, recent30.kkukDenom) + '</td><td>' + fmt(full.pKkuk, full.kk, full.kkukDenom) + '</td></tr>' +
-                        '<tr><td><span class="jung-kkuk">← 꺽</span></td><td>' + (short15 ? fmt(short15.pJungToKkuk, short15.jk, short15.jungDenom) : '-') + '</td><td>' + fmt(recent30.pJungToKkuk, recent30.jk, recent30.jungDenom) + '</td><td>' + fmt(full.pJungToKkuk, full.jk, full.jungDenom) + '</td></tr>' +
-                        '<tr><td><span class="kkuk-jung">← 정</span></td><td>' + (short15 ? fmt(short15.pKkukToJung, short15.kj, short15.kkukDenom) : '-') + '</td><td>' + fmt(recent30.pKkukToJung, recent30.kj, recent30.kkukDenom) + '</td><td>' + fmt(full.pKkukToJung, full.kj, full.kkukDenom) + '</td></tr>' +
-                        '<tr><td><span style="color:#888">구간반영</span></td><td>' + rowBlend15 + '</td><td>' + rowBlend30 + '</td><td>' + rowBlend100 + '</td></tr>' +
-                        '</tbody></table><p class="graph-stats-note">※ 단기(15회) vs 장기(30회) 비교로 흐름 전환 감지<br>· 아랫줄=구간반영(예측이력 15/30/100회, 30% 적용)<br>· % 높을수록 예측 픽(정/꺽)에 대한 확신↑</p>';
                     
                     // 회차: 비교·저장·표시 모두 전체 gameID(11416052 등) 사용. 끝 3자리만 쓰면 11423052/11424052가 둘 다 052로 겹침 → 충돌 방지를 위해 전체 표시
                     function fullRoundFromGameID(g) {
@@ -8936,7 +10831,7 @@ RESULTS_HTML = '''
                         const total = inBucket.length;
                         return { label: b.min + '~' + (b.max === 101 ? '100' : b.max) + '%', total: total, wins: wins, pct: total > 0 ? (100 * wins / total).toFixed(1) : '-', min: b.min, max: b.max };
                     }).filter(function(s) { return s.total > 0; });
-                    // 기존 확률에 30% 반영 (blendData는 전이 확률 표에서 계산됨). 한 출처: 서버 픽 표시 중일 때는 서버 확률 유지.
+                    // 기존 확률에 30% 반영 (blendData는 computeBlendData — 예측 이력 구간반영). 한 출처: 서버 픽 표시 중일 때는 서버 확률 유지.
                     var usingServerPick = lastPrediction && (lastPrediction.value === '정' || lastPrediction.value === '꺽');
                     if (blendData && blendData.newProb != null && !is15Joker && !usingServerPick) predProb = 0.7 * predProb + 0.3 * blendData.newProb;
                     // 깜빡임: 예측픽 확률이 "승률 상위 2개 구간" 안에 있을 때만 (나올 확률 높은 게 아니라, 그 구간이 실제로 많이 이긴 구간일 때만)
@@ -9036,47 +10931,50 @@ RESULTS_HTML = '''
                             '</div>' +
                             '<div class="prediction-stats-note" style="font-size:0.8em;color:#888;margin-top:2px">※ 예측픽 기준(계산기와 독립) · 합산승률=15·30·100 반영(65·25·10)</div>';
                         // 예측기표: 실제 경고 합산승률 + 최근 50회 결과 + 회차별(정/꺽/승·패·조커) 표 — 예측픽만 사용
-                        let streakTableBlock = '';
+                        let streakTable = null;   // { keys: 회차, head: 열 머리, rows: [[구분, 칸들]] } — 열 단위 패치용
+                        let streakLineBlock = '';
                         try {
                         if (rev.length === 0) {
-                            streakTableBlock = '<div class="prediction-streak-line">최근 100회 기준 · <span class="streak-now">' + streakLine100 + '</span></div>';
+                            streakLineBlock = '<div class="prediction-streak-line">최근 100회 기준 · <span class="streak-now">' + streakLine100 + '</span></div>';
                         } else {
-                            const headerCells = '<th>구분</th>' + rev.map(function(h) { return '<th>' + displayRound(h.round) + '</th>'; }).join('');
-                            const rowProb = '<td>메인</td>' + rev.map(function(h) { return '<td>' + (h.probability != null ? Number(h.probability).toFixed(1) + '%' : '-') + '</td>'; }).join('');
-                            const rowPick = '<td>메인</td>' + rev.map(function(h) {
+                            const seenKeys = {};
+                            const colKeys = rev.map(function(h, i) { var k = String(h.round); if (seenKeys[k]) k += '#' + i; seenKeys[k] = true; return k; });
+                            const headerCells = rev.map(function(h) { return '<th>' + displayRound(h.round) + '</th>'; });
+                            const rowProb = rev.map(function(h) { return '<td>' + (h.probability != null ? Number(h.probability).toFixed(1) + '%' : '-') + '</td>'; });
+                            const rowPick = rev.map(function(h) {
                                 const c = pickColorToClass(h.pickColor || h.pick_color);
                                 return '<td class="' + c + '">' + (h.predicted != null ? h.predicted : '-') + '</td>';
-                            }).join('');
-                            const rowReversePick = '<td>반픽</td>' + rev.map(function(h) {
+                            });
+                            const rowReversePick = rev.map(function(h) {
                                 var rp = (h.predicted === '정') ? '꺽' : (h.predicted === '꺽') ? '정' : null;
                                 var mainC = normalizePickColor(h.pickColor || h.pick_color);
                                 var revC = (mainC === '빨강') ? '검정' : (mainC === '검정') ? '빨강' : (rp === '정' ? '빨강' : rp === '꺽' ? '검정' : '');
                                 var c = pickColorToClass(revC);
                                 return '<td class="' + (c || '') + '">' + (rp || '-') + '</td>';
-                            }).join('');
-                            const rowReverseOutcome = '<td>반픽</td>' + rev.map(function(h) {
+                            });
+                            const rowReverseOutcome = rev.map(function(h) {
                                 var actualForDisplay = (roundActualsFromServer[String(h.round)] && roundActualsFromServer[String(h.round)].actual) ? roundActualsFromServer[String(h.round)].actual : h.actual;
                                 var isJoker = (actualForDisplay === 'joker' || actualForDisplay === '조커');
                                 var rp = (h.predicted === '정') ? '꺽' : (h.predicted === '꺽') ? '정' : null;
                                 var out = !rp ? '-' : isJoker ? '조커' : (rp === actualForDisplay ? '승' : '패');
                                 var c = out === '승' ? 'streak-win' : out === '패' ? 'streak-lose' : out === '조커' ? 'streak-joker' : '';
                                 return '<td class="' + c + '">' + out + '</td>';
-                            }).join('');
-                            const rowOutcome = '<td>메인</td>' + rev.map(function(h) {
+                            });
+                            const rowOutcome = rev.map(function(h) {
                                 var actualForDisplay = (roundActualsFromServer[String(h.round)] && roundActualsFromServer[String(h.round)].actual) ? roundActualsFromServer[String(h.round)].actual : h.actual;
                                 var isJoker = (actualForDisplay === 'joker' || actualForDisplay === '조커');
                                 const out = isJoker ? '조커' : (h.predicted === actualForDisplay ? '승' : '패');
                                 const c = out === '승' ? 'streak-win' : out === '패' ? 'streak-lose' : 'streak-joker';
                                 return '<td class="' + c + '">' + out + '</td>';
-                            }).join('');
-                            const rowShapePick = '<td>모양</td>' + rev.map(function(h) {
+                            });
+                            const rowShapePick = rev.map(function(h) {
                                 const sp = (h.shape_pick && (h.shape_pick === '정' || h.shape_pick === '꺽')) ? h.shape_pick : null;
                                 var mainC = normalizePickColor(h.pickColor || h.pick_color);
                                 var spC = (mainC === '빨강' || mainC === '검정') ? (sp === h.predicted ? mainC : (mainC === '빨강' ? '검정' : '빨강')) : (sp === '정' ? '빨강' : sp === '꺽' ? '검정' : '');
                                 var c = pickColorToClass(spC);
                                 return '<td class="' + (c || '') + '">' + (sp || '-') + '</td>';
-                            }).join('');
-                            const rowShapeOutcome = '<td>모양</td>' + rev.map(function(h) {
+                            });
+                            const rowShapeOutcome = rev.map(function(h) {
                                 var actualForDisplay = (roundActualsFromServer[String(h.round)] && roundActualsFromServer[String(h.round)].actual) ? roundActualsFromServer[String(h.round)].actual : h.actual;
                                 if (typeof actualForDisplay === 'string') actualForDisplay = actualForDisplay.trim();
                                 var isJoker = (actualForDisplay === 'joker' || actualForDisplay === '조커');
@@ -9084,15 +10982,15 @@ RESULTS_HTML = '''
                                 const out = !sp ? '-' : isJoker ? '조커' : (actualForDisplay === '정' || actualForDisplay === '꺽') ? (sp === actualForDisplay ? '승' : '패') : '-';
                                 const c = out === '승' ? 'streak-win' : out === '패' ? 'streak-lose' : out === '조커' ? 'streak-joker' : '';
                                 return '<td class="' + c + '">' + (out || '-') + '</td>';
-                            }).join('');
-                            const rowPongPick = '<td>퐁당</td>' + rev.map(function(h) {
+                            });
+                            const rowPongPick = rev.map(function(h) {
                                 const pp = (h.pong_pick && (h.pong_pick === '정' || h.pong_pick === '꺽')) ? h.pong_pick : null;
                                 var mainC = normalizePickColor(h.pickColor || h.pick_color);
                                 var ppC = (mainC === '빨강' || mainC === '검정') ? (pp === h.predicted ? mainC : (mainC === '빨강' ? '검정' : '빨강')) : (pp === '정' ? '빨강' : pp === '꺽' ? '검정' : '');
                                 var c = pickColorToClass(ppC);
                                 return '<td class="' + (c || '') + '">' + (pp || '-') + '</td>';
-                            }).join('');
-                            const rowPongOutcome = '<td>퐁당</td>' + rev.map(function(h) {
+                            });
+                            const rowPongOutcome = rev.map(function(h) {
                                 var actualForDisplay = (roundActualsFromServer[String(h.round)] && roundActualsFromServer[String(h.round)].actual) ? roundActualsFromServer[String(h.round)].actual : h.actual;
                                 if (typeof actualForDisplay === 'string') actualForDisplay = actualForDisplay.trim();
                                 var isJoker = (actualForDisplay === 'joker' || actualForDisplay === '조커');
@@ -9100,7 +10998,7 @@ RESULTS_HTML = '''
                                 const out = !pp ? '-' : isJoker ? '조커' : (actualForDisplay === '정' || actualForDisplay === '꺽') ? (pp === actualForDisplay ? '승' : '패') : '-';
                                 const c = out === '승' ? 'streak-win' : out === '패' ? 'streak-lose' : out === '조커' ? 'streak-joker' : '';
                                 return '<td class="' + c + '">' + (out || '-') + '</td>';
-                            }).join('');
+                            });
                             var shapeWins = 0, shapeTotal = 0, pongWins = 0, pongTotal = 0, reverseWins = 0, reverseTotal = 0;
                             rev.forEach(function(h) {
                                 var a = (roundActualsFromServer[String(h.round)] && roundActualsFromServer[String(h.round)].actual) ? roundActualsFromServer[String(h.round)].actual : h.actual;
@@ -9119,19 +11017,13 @@ RESULTS_HTML = '''
                             var reverseRateStr = reverseTotal > 0 ? (100 * reverseWins / reverseTotal).toFixed(1) : '-';
                             var shapeRateStr = shapeTotal > 0 ? (100 * shapeWins / shapeTotal).toFixed(1) : '-';
                             var pongRateStr = pongTotal > 0 ? (100 * pongWins / pongTotal).toFixed(1) : '-';
-                            streakTableBlock = '<div class="main-streak-table-wrap" data-section="예측기표"><table class="main-streak-table" aria-label="예측기표">' +
-                                '<thead><tr>' + headerCells + '</tr></thead><tbody>' +
-                                '<tr>' + rowProb + '</tr>' +
-                                '<tr>' + rowPick + '</tr>' +
-                                '<tr>' + rowOutcome + '</tr>' +
-                                '<tr>' + rowReversePick + '</tr>' +
-                                '<tr>' + rowReverseOutcome + '</tr>' +
-                                '<tr>' + rowShapePick + '</tr>' +
-                                '<tr>' + rowShapeOutcome + '</tr>' +
-                                '<tr>' + rowPongPick + '</tr>' +
-                                '<tr>' + rowPongOutcome + '</tr>' +
-                                '</tbody></table></div>' +
-                                '<div class="prediction-streak-line" style="margin-top:6px">최근 100회 기준 · <span class="streak-now">' + streakLine100 + '</span>' +
+                            streakTable = {
+                                keys: colKeys,
+                                head: headerCells,
+                                rows: [['메인', rowProb], ['메인', rowPick], ['메인', rowOutcome], ['반픽', rowReversePick], ['반픽', rowReverseOutcome],
+                                    ['모양', rowShapePick], ['모양', rowShapeOutcome], ['퐁당', rowPongPick], ['퐁당', rowPongOutcome]]
+                            };
+                            streakLineBlock = '<div class="prediction-streak-line" style="margin-top:6px">최근 100회 기준 · <span class="streak-now">' + streakLine100 + '</span>' +
                                 (reverseTotal > 0 ? ' &nbsp;|&nbsp; 반픽승률: ' + reverseRateStr + '% (' + reverseWins + '/' + reverseTotal + ')' : '') +
                                 (shapeTotal > 0 ? ' &nbsp;|&nbsp; 모양승률: ' + shapeRateStr + '% (' + shapeWins + '/' + shapeTotal + ')' : '') +
                                 (pongTotal > 0 ? ' &nbsp;|&nbsp; 퐁당승률: ' + pongRateStr + '% (' + pongWins + '/' + pongTotal + ')' : '') +
@@ -9139,7 +11031,8 @@ RESULTS_HTML = '''
                         }
                         } catch (streakErr) {
                             console.warn('연승/연패 표 구성 오류:', streakErr);
-                            streakTableBlock = '<div class="prediction-streak-line">최근 100회 기준 · <span class="streak-now">' + streakLine100 + '</span></div>';
+                            streakTable = null;
+                            streakLineBlock = '<div class="prediction-streak-line">최근 100회 기준 · <span class="streak-now">' + streakLine100 + '</span></div>';
                         }
                         const probBucketBody = document.getElementById('prob-bucket-collapse-body');
                         const probBucketCollapse = document.getElementById('prob-bucket-collapse');
@@ -9436,11 +11329,14 @@ RESULTS_HTML = '''
                             noticeBlock = '<div class="prediction-notice' + (lowWinRate && !flowAdvice ? ' danger' : '') + '">' + notices.join(' &nbsp; · &nbsp; ') + '</div>';
                         }
                         const extraLine = '<div class="flow-type" style="margin-top:6px;font-size:clamp(0.75em,1.8vw,0.85em)">' + flowStr + (linePatternStr ? ' &nbsp;|&nbsp; ' + linePatternStr : '') + '</div>';
-                        var wrapEl = predDiv.querySelector('.main-streak-table-wrap');
-                        var savedScroll = wrapEl ? wrapEl.scrollLeft : 0;
-                        predDiv.innerHTML = noticeBlock + statsBlock + streakTableBlock + extraLine;
-                        var newWrap = predDiv.querySelector('.main-streak-table-wrap');
-                        if (newWrap && savedScroll > 0) newWrap.scrollLeft = savedScroll;
+                        // 구역별로 바뀐 것만 교체, 표는 회차 열 단위 패치 (표 래퍼를 유지하므로 가로 스크롤 위치도 그대로)
+                        var predParts = ensurePredictionParts(predDiv);
+                        setPartHtml(predParts.notice, noticeBlock);
+                        setPartHtml(predParts.stats, statsBlock);
+                        if (streakTable) patchStreakColumns(predParts.table, streakTable);
+                        else setPartHtml(predParts.table, '');
+                        setPartHtml(predParts.streak, streakLineBlock);
+                        setPartHtml(predParts.extra, extraLine);
                     }
                     
                     // 가상 배팅 계산기: history 변경된 것만 갱신 (배팅픽 표시 속도 개선)
@@ -9517,6 +11413,8 @@ RESULTS_HTML = '''
                     if (atw) atw.style.display = '';
                 }
                 } catch (renderErr) {
+                    lastResultsEtag = null;  // 다음 폴링에서 전체 다시 받아 재렌더
+                    lastResultsFull = null;
                     if (statusEl) statusEl.textContent = '표시 오류 - 새로고침 해 주세요';
                     console.error('표시 오류:', renderErr);
                 }
@@ -9543,6 +11441,11 @@ RESULTS_HTML = '''
                 }
             } finally {
                 isLoadingResults = false;  // 로딩 완료
+                if (resultsPushPending !== null) {
+                    var nextPush = resultsPushPending;
+                    resultsPushPending = null;
+                    setTimeout(function() { loadResults(nextPush || undefined).catch(function() {}); }, 0);
+                }
             }
         }
         
@@ -10932,16 +12835,21 @@ RESULTS_HTML = '''
                 if (displayRows.length === 0) {
                     tableWrap.innerHTML = '';
                 } else {
-                    let tbl = '<table class="calc-round-table"><thead><tr><th>회차</th><th>픽</th><th>경고 승률</th><th>모양적중률</th><th>15회승률</th><th>배팅금액</th><th>수익</th><th>승패</th></tr></thead><tbody>';
-                    displayRows.forEach(function(row) {
+                    // 회차 키 행 패치: 새 회차 행 추가·대기 행만 갱신·밀려난 행 재활용 (표 전체 재작성 없음)
+                    let tbody = tableWrap.__tbody;
+                    if (!tbody || !tableWrap.contains(tbody)) {
+                        tableWrap.innerHTML = '<table class="calc-round-table"><thead><tr><th>회차</th><th>픽</th><th>경고 승률</th><th>모양적중률</th><th>15회승률</th><th>배팅금액</th><th>수익</th><th>승패</th></tr></thead><tbody></tbody></table>';
+                        tbody = tableWrap.__tbody = tableWrap.querySelector('tbody');
+                    }
+                    const rowItems = displayRows.map(function(row, idx) {
                         const outClass = row.outClass || (row.outcome === '승' ? 'win' : row.outcome === '패' ? 'lose' : row.outcome === '조' ? 'joker' : 'skip');
                         const profitClass = (typeof row.profit === 'number' && row.profit > 0) || (typeof row.profit === 'string' && row.profit.indexOf('+') === 0) ? 'profit-plus' : (typeof row.profit === 'number' && row.profit < 0) || (typeof row.profit === 'string' && row.profit.indexOf('-') === 0 && row.profit !== '-') ? 'profit-minus' : '';
                         var roundTdClass = (row.roundNum != null) ? 'calc-td-round-' + getRoundIconType(row.roundNum) : '';
                         var roundCellHtml = (row.roundNum != null) ? (String(row.roundNum) + getRoundIconHtml(row.roundNum)) : row.roundStr;
-                        tbl += '<tr><td class="' + roundTdClass + '">' + roundCellHtml + '</td><td class="' + row.pickClass + '">' + row.pick + '</td><td class="calc-td-warning-rate">' + (row.warningWinRate || '-') + '</td><td class="calc-td-shape-rate">' + (row.shapeWinRate || '-') + '</td><td class="calc-td-rate15">' + (row.rate15 || '-') + '</td><td class="calc-td-bet">' + row.betAmount + '</td><td class="calc-td-profit ' + profitClass + '">' + row.profit + '</td><td class="' + outClass + '">' + row.outcome + '</td></tr>';
+                        var html = '<td class="' + roundTdClass + '">' + roundCellHtml + '</td><td class="' + row.pickClass + '">' + row.pick + '</td><td class="calc-td-warning-rate">' + (row.warningWinRate || '-') + '</td><td class="calc-td-shape-rate">' + (row.shapeWinRate || '-') + '</td><td class="calc-td-rate15">' + (row.rate15 || '-') + '</td><td class="calc-td-bet">' + row.betAmount + '</td><td class="calc-td-profit ' + profitClass + '">' + row.profit + '</td><td class="' + outClass + '">' + row.outcome + '</td>';
+                        return { key: row.roundNum != null ? 'r' + row.roundNum : 'i' + idx + ':' + row.roundStr, sig: html };
                     });
-                    tbl += '</tbody></table>';
-                    tableWrap.innerHTML = tbl;
+                    patchKeyedChildren(tbody, rowItems, function() { return document.createElement('tr'); }, function(tr, it) { tr.innerHTML = it.sig; });
                 }
             }
             }
@@ -11760,6 +13668,39 @@ RESULTS_HTML = '''
             } catch (e) { console.warn('refreshPredictionPickOnly:', e); }
         }
         
+        // /api/current-prediction 응답(폴링) 또는 prediction_update(푸시) 공통 처리
+        function handleCurrentPrediction(data) {
+            if (!document.body || !document.body.isConnected) return;
+            var sp = data && data.server_prediction;
+            if (!sp || (sp.value !== '정' && sp.value !== '꺽')) return;
+            var newRound = sp.round != null ? Number(sp.round) : NaN;
+            var prevRound = (lastPrediction && lastPrediction.round != null) ? Number(lastPrediction.round) : NaN;
+            if (isNaN(newRound) || (!isNaN(prevRound) && newRound < prevRound)) return;
+            var normColor = normalizePickColor(sp.color) || sp.color || null;
+            lastPrediction = { value: sp.value, round: sp.round, prob: sp.prob != null ? sp.prob : 0, color: normColor };
+            if (sp.shape_predicted === '정' || sp.shape_predicted === '꺽') lastPrediction.shape_predicted = sp.shape_predicted;
+            if (sp.calc_best_pred && sp.calc_best_color) { lastPrediction.calc_best_pred = sp.calc_best_pred; lastPrediction.calc_best_color = sp.calc_best_color; }
+            if (sp.calc_best_shape_pong_pred && sp.calc_best_shape_pong_color) { lastPrediction.calc_best_shape_pong_pred = sp.calc_best_shape_pong_pred; lastPrediction.calc_best_shape_pong_color = sp.calc_best_shape_pong_color; }
+            lastWarningU35 = !!(sp.warning_u35);
+            // light sp 병합: prediction_cache는 main_reverse·calc_best_type 등 없음 → lastSpForCards와 병합해 깜빡임 방지
+            var spToUse = sp;
+            if (lastSpForCards && sp.round != null && Number(sp.round) === Number(lastSpForCards.round)) {
+                var isLight = (sp.main_reverse === undefined && sp.main_reverse_color === undefined) || sp.calc_best_type === undefined;
+                if (isLight) {
+                    spToUse = Object.assign({}, lastSpForCards, { value: sp.value, round: sp.round, prob: sp.prob, color: sp.color, warning_u35: sp.warning_u35 });
+                }
+            }
+            try { updatePredictionPicksCards(spToUse); } catch (e) {}
+            try { refreshPredictionPickOnly(); } catch (e) {}
+            // 새 픽 수신 즉시 배팅기로 전달 — 25ms 대기 없이
+            try { if (document.body && document.body.isConnected) CALC_IDS.forEach(function(id) { if (typeof updateCalcStatus === 'function') updateCalcStatus(id); }); } catch (e) {}
+        }
+        // /api/shape-pick 응답(폴링) 또는 shape_pick_update(푸시) 공통 처리
+        function handleShapePick(data) {
+            if (!data || (data.shape_pick !== '정' && data.shape_pick !== '꺽')) return;
+            lastShapePickFromApi = { round: data.round, shape_pick: data.shape_pick, shape_color: data.shape_color, shape_15_rate: data.shape_15_rate };
+            if (lastSpForCards) updatePredictionPicksCards(lastSpForCards);
+        }
         function setupIntervals() {
             // 기존 interval 정리
             if (resultsPollIntervalId) clearInterval(resultsPollIntervalId);
@@ -11770,9 +13711,11 @@ RESULTS_HTML = '''
             if (shapePollIntervalId) clearInterval(shapePollIntervalId);
             
             // 탭 가시성에 따라 간격 조정. 10초 게임 8초 내 배팅 — 계산기 결과 반영 8초 내 완료 목표
-            var resultsInterval = isTabVisible ? 150 : 1200;   // 150ms — 결과·그래프 체크 주기 (빠른 반영)
+            // 서버 푸시 연결 중이면 결과·계산기 상태·예측픽·모양픽 폴링은 누락 대비 보조 주기로만
+            var pushActive = resultsSocketConnected;
+            var resultsInterval = pushActive ? 1000 : (isTabVisible ? 150 : 1200);   // 150ms — 결과·그래프 체크 주기 (빠른 반영)
             var calcStatusInterval = isTabVisible ? 200 : 1200; // 200ms — 픽 서버 전달
-            var calcStateInterval = isTabVisible ? 150 : 5000;   // 150ms — 계산기 상태 GET (빠른 반영)
+            var calcStateInterval = pushActive ? 5000 : (isTabVisible ? 150 : 5000);   // 150ms — 계산기 상태 GET (빠른 반영)
             var timerInterval = isTabVisible ? 300 : 1000;
             
             // 결과 폴링: 계산기 실행 중일 때만 150ms, 그 외 200~300ms — 10초 게임에 충분 (3단계 최적화)
@@ -11785,7 +13728,7 @@ RESULTS_HTML = '''
                     const criticalPhase = r <= 3 || r >= 8;
                     // 백그라운드일 때는 최소 1초 간격. 너무 짧으면 서버 부하로 예측픽 안 나옴
                     const baseInterval = allResults.length === 0 ? 150 : (anyRunning ? 100 : (criticalPhase ? 150 : 250));
-                    const interval = isTabVisible ? baseInterval : Math.max(1000, baseInterval);
+                    const interval = pushActive ? 3000 : (isTabVisible ? baseInterval : Math.max(1000, baseInterval));
                     if (Date.now() - lastResultsUpdate > interval) {
                         loadResults().catch(e => console.warn('결과 새로고침 실패:', e));
                     }
@@ -11822,54 +13765,71 @@ RESULTS_HTML = '''
             // 백그라운드일 때는 1초 간격으로 조정 (브라우저 제한)
             timerUpdateIntervalId = setInterval(updateTimer, timerInterval);
             
-            // 예측픽만 경량 폴링: 캐시 기반. 새 픽 수신 시 즉시 updateCalcStatus → 매크로로 빠른 전달
-            if (isTabVisible) {
+            // 예측픽만 경량 폴링: 캐시 기반. 새 픽 수신 시 즉시 updateCalcStatus → 매크로로 빠른 전달 (푸시 연결 중이면 생략)
+            if (isTabVisible && !pushActive) {
                 predictionPollIntervalId = setInterval(function() {
                     try {
                     if (!document.body || !document.body.isConnected) return;
-                    fetch('/api/current-prediction?t=' + Date.now(), { cache: 'no-cache' }).then(function(r) { return r.json(); }).then(function(data) {
-                        if (!document.body || !document.body.isConnected) return;
-                        var sp = data && data.server_prediction;
-                        if (!sp || (sp.value !== '정' && sp.value !== '꺽')) return;
-                        var newRound = sp.round != null ? Number(sp.round) : NaN;
-                        var prevRound = (lastPrediction && lastPrediction.round != null) ? Number(lastPrediction.round) : NaN;
-                        if (isNaN(newRound) || (!isNaN(prevRound) && newRound < prevRound)) return;
-                        var normColor = normalizePickColor(sp.color) || sp.color || null;
-                        lastPrediction = { value: sp.value, round: sp.round, prob: sp.prob != null ? sp.prob : 0, color: normColor };
-                        if (sp.shape_predicted === '정' || sp.shape_predicted === '꺽') lastPrediction.shape_predicted = sp.shape_predicted;
-                        if (sp.calc_best_pred && sp.calc_best_color) { lastPrediction.calc_best_pred = sp.calc_best_pred; lastPrediction.calc_best_color = sp.calc_best_color; }
-                        if (sp.calc_best_shape_pong_pred && sp.calc_best_shape_pong_color) { lastPrediction.calc_best_shape_pong_pred = sp.calc_best_shape_pong_pred; lastPrediction.calc_best_shape_pong_color = sp.calc_best_shape_pong_color; }
-                        lastWarningU35 = !!(sp.warning_u35);
-                        // light sp 병합: prediction_cache는 main_reverse·calc_best_type 등 없음 → lastSpForCards와 병합해 깜빡임 방지
-                        var spToUse = sp;
-                        if (lastSpForCards && sp.round != null && Number(sp.round) === Number(lastSpForCards.round)) {
-                            var isLight = (sp.main_reverse === undefined && sp.main_reverse_color === undefined) || sp.calc_best_type === undefined;
-                            if (isLight) {
-                                spToUse = Object.assign({}, lastSpForCards, { value: sp.value, round: sp.round, prob: sp.prob, color: sp.color, warning_u35: sp.warning_u35 });
-                            }
-                        }
-                        try { updatePredictionPicksCards(spToUse); } catch (e) {}
-                        try { refreshPredictionPickOnly(); } catch (e) {}
-                        // 새 픽 수신 즉시 배팅기로 전달 — 25ms 대기 없이
-                        try { if (document.body && document.body.isConnected) CALC_IDS.forEach(function(id) { if (typeof updateCalcStatus === 'function') updateCalcStatus(id); }); } catch (e) {}
-                    }).catch(function() {});
+                    fetch('/api/current-prediction?t=' + Date.now(), { cache: 'no-cache' }).then(function(r) { return r.json(); }).then(handleCurrentPrediction).catch(function() {});
                     } catch (e) {}
                 }, 300);  // 200→300ms 부하 완화
             }
-            // 모양판별 픽 전용 폴링 (400ms) — shape-pick API가 DB 쿼리하므로 간격 완화
-            if (isTabVisible) {
+            // 모양판별 픽 전용 폴링 (400ms) — shape-pick API가 DB 쿼리하므로 간격 완화 (푸시 연결 중이면 생략)
+            if (isTabVisible && !pushActive) {
                 shapePollIntervalId = setInterval(function() {
-                    fetch('/api/shape-pick?t=' + Date.now(), { cache: 'no-cache' }).then(function(r) { return r.json(); }).then(function(data) {
-                        if (!data || (data.shape_pick !== '정' && data.shape_pick !== '꺽')) return;
-                        lastShapePickFromApi = { round: data.round, shape_pick: data.shape_pick, shape_color: data.shape_color, shape_15_rate: data.shape_15_rate };
-                        if (lastSpForCards) updatePredictionPicksCards(lastSpForCards);
-                    }).catch(function() {});
+                    fetch('/api/shape-pick?t=' + Date.now(), { cache: 'no-cache' }).then(function(r) { return r.json(); }).then(handleShapePick).catch(function() {});
                 }, 400);
             }
         }
         
+        // 서버 푸시: 결과 새 버전(델타 포함)·예측픽·모양픽·계산기 상태 변경을 받아 즉시 반영. socket.io 미로드·연결 실패 시 폴링 유지
+        function initResultsSocket() {
+            if (resultsSocket || typeof window.io !== 'function') return;
+            try {
+                resultsSocket = window.io('/results', { transports: ['websocket', 'polling'], reconnectionDelayMax: 5000 });
+            } catch (e) { resultsSocket = null; return; }
+            resultsSocket.on('connect', function() {
+                resultsSocketConnected = true;
+                setupIntervals();
+            });
+            resultsSocket.on('disconnect', function() {
+                resultsSocketConnected = false;
+                lastResultsUpdate = 0;  // 폴링 즉시 재개 — 끊긴 사이 변경 따라잡기
+                setupIntervals();
+            });
+            resultsSocket.on('results_update', function(msg) {
+                if (!msg || msg.version == null) return;
+                if (lastResultsFull && lastResultsFull.version === msg.version) return;
+                var delta = null;
+                if (msg.delta_json && lastResultsFull && lastResultsFull.version === msg.since) {
+                    try { delta = JSON.parse(msg.delta_json); } catch (e) { delta = null; }
+                }
+                // 기준 버전이 맞으면 실린 델타 적용, 아니면 HTTP ?since= 로 따라잡음
+                loadResults(delta ? { data: delta, etag: msg.etag } : false).catch(function(e) { console.warn('결과 푸시 반영 실패:', e); });
+            });
+            resultsSocket.on('prediction_update', function(msg) { try { handleCurrentPrediction(msg); } catch (e) {} });
+            resultsSocket.on('shape_pick_update', function(msg) { try { handleShapePick(msg); } catch (e) {} });
+            var calcStatePushRetryId = null;
+            function onCalcStatePush() {
+                if (Date.now() - lastResetOrRunAt < 1000) return;  // 리셋/실행 직후 저장 완료 전 덮어쓰기 방지 (폴링과 동일)
+                if (window.__calcStateLoadInProgress) {
+                    // 진행 중 로드가 이 변경 이전 상태일 수 있음 — 끝난 뒤 1회 더
+                    if (!calcStatePushRetryId) calcStatePushRetryId = setTimeout(function() { calcStatePushRetryId = null; onCalcStatePush(); }, 150);
+                    return;
+                }
+                loadCalcStateFromServer(false).then(function() { updateAllCalcs(); }).catch(function(e) { console.warn('계산기 상태 푸시 반영:', e); });
+            }
+            resultsSocket.on('calc_state_update', function(msg) {
+                if (msg && msg.session_id && msg.session_id !== 'default') return;
+                onCalcStatePush();
+            });
+        }
+        window.initResultsSocket = initResultsSocket;
+        
         // 초기 설정
+        initAnalyticsWorker();
         setupIntervals();
+        initResultsSocket();
         
         // 탭 가시성 변경 시 interval 재설정
         document.addEventListener('visibilitychange', function() {
@@ -11926,11 +13886,244 @@ RESULTS_HTML = '''
 </html>
 '''
 
+# /results 파생 분석(그래프 열·미니 그래프·전이 확률 표). 같은 파일을 Web Worker로도, 메인 스레드 폴백(<script>)으로도 사용.
+RESULTS_ANALYTICS_JS = '''
+(function(root) {
+    'use strict';
+    // 정/꺽 값(최신순, 조커=null 제외)을 같은 값 연속 구간(열)으로 묶음
+    function segmentsOf(gv) {
+        var segments = [], current = null, count = 0;
+        for (var i = 0; i < gv.length; i++) {
+            var v = gv[i];
+            if (v !== true && v !== false) continue;
+            if (v === current) { count++; continue; }
+            if (current !== null) segments.push({ type: current, count: count });
+            current = v;
+            count = 1;
+        }
+        if (current !== null) segments.push({ type: current, count: count });
+        return segments;
+    }
+    // 최근 w열 중 2 이상 줄 높이 평균으로 장줄 기준(3~6)
+    function lineThreshold(heights, w) {
+        if (!heights || heights.length === 0) return 4;
+        var lines = heights.slice(0, w).filter(function(x) { return x >= 2; });
+        if (lines.length < 5) return 4;
+        var avg = lines.reduce(function(a, b) { return a + b; }, 0) / lines.length;
+        return Math.max(3, Math.min(6, Math.round(avg + 0.5)));
+    }
+    function transitions(arr) {
+        var jj = 0, jk = 0, kj = 0, kk = 0;
+        for (var i = 0; i < arr.length - 1; i++) {
+            var a = arr[i], b = arr[i + 1];
+            if (a !== true && a !== false || b !== true && b !== false) continue;
+            if (a === true && b === true) jj++;
+            else if (a === true && b === false) jk++;
+            else if (a === false && b === true) kj++;
+            else kk++;
+        }
+        var jungDenom = jj + jk, kkukDenom = kk + kj;
+        return {
+            pJung: jungDenom > 0 ? (100 * jj / jungDenom).toFixed(1) : '-',
+            pKkuk: kkukDenom > 0 ? (100 * kk / kkukDenom).toFixed(1) : '-',
+            pJungToKkuk: jungDenom > 0 ? (100 * jk / jungDenom).toFixed(1) : '-',
+            pKkukToJung: kkukDenom > 0 ? (100 * kj / kkukDenom).toFixed(1) : '-',
+            jj: jj, jk: jk, kj: kj, kk: kk, jungDenom: jungDenom, kkukDenom: kkukDenom
+        };
+    }
+    function statsHtml(gv, blend) {
+        var full = transitions(gv), recent30 = transitions(gv.slice(0, 30));
+        var short15 = gv.length >= 15 ? transitions(gv.slice(0, 15)) : null;
+        var fmt = function(p, n, d) { return d > 0 ? p + '% (' + n + '/' + d + ')' : '-'; };
+        var pct = function(v) { return v != null ? Number(v).toFixed(1) + '%' : '-'; };
+        function row(label, pk, nk, dk) {
+            return '<tr><td>' + label + '</td><td>' + (short15 ? fmt(short15[pk], short15[nk], short15[dk]) : '-') + '</td><td>' +
+                fmt(recent30[pk], recent30[nk], recent30[dk]) + '</td><td>' + fmt(full[pk], full[nk], full[dk]) + '</td></tr>';
+        }
+        blend = blend || {};
+        return '<table><thead><tr><th></th><th>최근 15회</th><th>최근 30회</th><th>전체</th></tr></thead><tbody>' +
+            row('<span class="jung-next">정 ↑</span>', 'pJung', 'jj', 'jungDenom') +
+            row('<span class="kkuk-next">꺽 ↑</span>', 'pKkuk', 'kk', 'kkukDenom') +
+            row('<span class="jung-kkuk">← 꺽</span>', 'pJungToKkuk', 'jk', 'jungDenom') +
+            row('<span class="kkuk-jung">← 정</span>', 'pKkukToJung', 'kj', 'kkukDenom') +
+            '<tr><td><span style="color:#888">구간반영</span></td><td>' + pct(blend.p15) + '</td><td>' + pct(blend.p30) + '</td><td>' + pct(blend.p100) + '</td></tr>' +
+            '</tbody></table><p class="graph-stats-note">※ 단기(15회) vs 장기(30회) 비교로 흐름 전환 감지<br>· 아랫줄=구간반영(예측이력 15/30/100회, 30% 적용)<br>· % 높을수록 예측 픽(정/꺽)에 대한 확신↑</p>';
+    }
+    function buildViewModels(gv, blend) {
+        var segments = segmentsOf(gv);
+        return {
+            graph: { segments: segments, thresh: lineThreshold(segments.map(function(s) { return s.count; }), 20) },
+            mini: { segments: gv.length >= 2 ? segments.slice(0, 25) : [] },
+            stats: { html: gv.length >= 2 ? statsHtml(gv, blend) : null }
+        };
+    }
+    function createState() { return { gv: [], blend: null, last: {} }; }
+    // update: reset이면 gv 전체, 아니면 prepend(새 회차 값)만 앞에 붙이고 length로 자름
+    function applyUpdate(state, msg) {
+        if (msg.reset) state.gv = (msg.gv || []).slice();
+        else state.gv = (msg.prepend || []).concat(state.gv).slice(0, msg.length);
+        if (Object.prototype.hasOwnProperty.call(msg, 'blend')) state.blend = msg.blend;
+        state.seq = msg.seq;
+    }
+    // 직전 회신과 달라진 뷰모델만 반환 (없으면 null)
+    function diffViewModels(state) {
+        var vms = buildViewModels(state.gv, state.blend), changed = null;
+        for (var key in vms) {
+            var sig = JSON.stringify(vms[key]);
+            if (state.last[key] === sig) continue;
+            state.last[key] = sig;
+            (changed = changed || {})[key] = vms[key];
+        }
+        return changed;
+    }
+    root.ResultsAnalytics = {
+        segmentsOf: segmentsOf, lineThreshold: lineThreshold, transitions: transitions,
+        buildViewModels: buildViewModels, createState: createState, applyUpdate: applyUpdate, diffViewModels: diffViewModels
+    };
+    if (typeof WorkerGlobalScope !== 'undefined' && root instanceof WorkerGlobalScope) {
+        var state = createState();
+        root.onmessage = function(e) {
+            var msg = e.data || {};
+            if (msg.type !== 'update') return;
+            // 증분은 직전 seq 위에만 적용 — 어긋나면 메인에 전체 재전송 요청
+            if (!msg.reset && state.seq != null && msg.seq !== state.seq + 1) { root.postMessage({ type: 'resync' }); return; }
+            applyUpdate(state, msg);
+            var changed = diffViewModels(state);
+            if (changed) root.postMessage({ type: 'vm', seq: msg.seq, changed: changed });
+        };
+    }
+})(self);
+'''
+
+
+# /results 정적 전달: RESULTS_HTML(Jinja 구문 없음)을 기동 시 1회 셸 HTML + 내용 해시 CSS/JS로 분리하고 gzip(·br) 미리 압축.
+# 셸은 no-cache+ETag(재검증 304), 자산은 이름에 해시가 들어가므로 immutable 1년 캐시 — 배포 후 재접속 폭주에도 CPU 거의 안 씀.
+RESULTS_ASSET_PATH = '/assets/'
+_results_assets = {}   # 파일명 -> 미리 압축한 엔트리
+_results_shell = None
+
+# Socket.IO 브라우저 클라이언트: static/vendor에 고정 사본이 있고 SRI 해시가 맞으면 해시 이름 자산으로 같은 출처에서 제공
+# (CSP script-src에 외부 호스트 없음). 사본이 없으면 CDN + integrity(SRI) — 사본은 scripts/vendor_socketio_client.py로 받아 커밋.
+SOCKETIO_CLIENT_VERSION = '4.7.5'
+SOCKETIO_CLIENT_CDN = f'https://cdn.socket.io/{SOCKETIO_CLIENT_VERSION}/socket.io.min.js'
+SOCKETIO_CLIENT_SRI = 'sha384-2huaZvOR9iDzHqslqwpR87isEmrfxqyWOF7hr7BY6KG0+hVKLoEXMPUJw3ynWuhO'
+SOCKETIO_CLIENT_VENDOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'vendor', f'socket.io-{SOCKETIO_CLIENT_VERSION}.min.js')
+_socketio_client_external = True  # CDN에서 로드 중이면 CSP에 cdn.socket.io 허용
+
+
+def _socketio_client_sri(raw):
+    import base64
+    return 'sha384-' + base64.b64encode(hashlib.sha384(raw).digest()).decode('ascii')
+
+
+def _load_socketio_client_asset():
+    """고정 사본을 읽어 SRI 검증. 반환: 미리 압축한 엔트리 또는 None(사본 없음·해시 불일치 → CDN 사용)."""
+    try:
+        with open(SOCKETIO_CLIENT_VENDOR, 'rb') as f:
+            raw = f.read()
+    except OSError:
+        return None
+    if _socketio_client_sri(raw) != SOCKETIO_CLIENT_SRI:
+        print(f"[경고] {SOCKETIO_CLIENT_VENDOR} 해시가 SOCKETIO_CLIENT_SRI와 다름 — CDN(SRI 검증)으로 로드")
+        return None
+    return _precompressed_entry(raw.decode('utf-8'), 'application/javascript')
+
+
+def _precompressed_entry(body, mimetype):
+    """본문 1회 인코딩: 원본·gzip·br(있으면) 바이트와 내용 해시 ETag."""
+    raw = body.encode('utf-8')
+    digest = hashlib.sha256(raw).hexdigest()
+    return {
+        'body': raw,
+        'gzip': gzip.compress(raw, compresslevel=9),
+        'br': brotli.compress(raw, quality=11) if brotli is not None else None,
+        'etag': f'"{digest[:16]}"',
+        'digest': digest,
+        'mimetype': mimetype,
+    }
+
+
+def _build_results_static():
+    """RESULTS_HTML의 <style> 블록과 본문 인라인 <script> 블록을 해시 이름 자산으로 빼고 셸에 link/script src로 치환."""
+    global _results_shell, _socketio_client_external
+    html = RESULTS_HTML
+    if WEB_CONCURRENCY > 1 or not _leader_state['leader']:
+        # 다중 워커: sticky session이 없어 롱폴링 폴백 요청이 다른 워커로 가면 세션 오류 — websocket만 (매크로와 같음)
+        html = html.replace("transports: ['websocket', 'polling']", "transports: ['websocket']")
+    css_start = html.index('<style>')
+    css_end = html.index('</style>', css_start)
+    js_start = html.rindex('<script>')
+    js_end = html.index('</script>', js_start)
+    css = _precompressed_entry(html[css_start + len('<style>'):css_end], 'text/css')
+    js = _precompressed_entry(html[js_start + len('<script>'):js_end], 'application/javascript')
+    analytics = _precompressed_entry(RESULTS_ANALYTICS_JS, 'application/javascript')
+    css_name = f"results.{css['digest'][:12]}.css"
+    js_name = f"results.{js['digest'][:12]}.js"
+    analytics_name = f"results-analytics.{analytics['digest'][:12]}.js"
+    shell = (
+        html[:css_start]
+        + f'<link rel="stylesheet" href="{RESULTS_ASSET_PATH}{css_name}">'
+        + html[css_end + len('</style>'):js_start]
+        # 분석 스크립트: 메인 스크립트가 data-results-analytics 태그의 src로 Worker 생성, 불가 시 여기서 로드된 ResultsAnalytics 사용
+        + f'<script src="{RESULTS_ASSET_PATH}{analytics_name}" data-results-analytics></script>\n    '
+        + f'<script src="{RESULTS_ASSET_PATH}{js_name}"></script>'  # 원래 위치(본문 끝) 그대로, 동기 실행 순서 유지
+        + html[js_end + len('</script>'):]
+    )
+    _results_assets.clear()
+    sio = _load_socketio_client_asset()
+    _socketio_client_external = sio is None
+    if sio is not None:
+        sio_name = f"socket.io.{sio['digest'][:12]}.js"
+        _results_assets[sio_name] = sio
+        shell = re.sub(r'src="' + re.escape(SOCKETIO_CLIENT_CDN) + r'" integrity="[^"]*" crossorigin="anonymous"',
+                       f'src="{RESULTS_ASSET_PATH}{sio_name}"', shell)
+    _results_assets[css_name] = css
+    _results_assets[js_name] = js
+    _results_assets[analytics_name] = analytics
+    _results_shell = _precompressed_entry(shell, 'text/html')
+    print(f"[✅] /results 정적 자산: 셸 {len(_results_shell['body'])}B, {css_name} {len(css['body'])}B, {js_name} {len(js['body'])}B"
+          f" (gzip {len(js['gzip'])}B{', br' if brotli is not None else ''})")
+
+
+def _precompressed_response(entry, cache_control):
+    """If-None-Match 일치 시 304, 아니면 Accept-Encoding에 맞춰 br > gzip > 원본."""
+    inm = request.headers.get('If-None-Match') or ''
+    if inm and (inm.strip() == '*' or entry['etag'] in [t.strip() for t in inm.split(',')]):
+        resp = Response(status=304)
+    else:
+        ae = (request.headers.get('Accept-Encoding') or '').lower()
+        if entry['br'] is not None and 'br' in ae:
+            resp = Response(entry['br'], mimetype=entry['mimetype'])
+            resp.headers['Content-Encoding'] = 'br'
+        elif 'gzip' in ae:
+            resp = Response(entry['gzip'], mimetype=entry['mimetype'])
+            resp.headers['Content-Encoding'] = 'gzip'
+        else:
+            resp = Response(entry['body'], mimetype=entry['mimetype'])
+    resp.headers['ETag'] = entry['etag']
+    resp.headers['Vary'] = 'Accept-Encoding'
+    resp.headers['Cache-Control'] = cache_control
+    return resp
+
+
+_build_results_static()
+
+
 @app.route('/results', methods=['GET'])
 def results_page():
-    """경기 결과 웹페이지"""
-    return render_template_string(RESULTS_HTML)
+    """경기 결과 웹페이지 (기동 시 만든 셸 — 매 요청 템플릿 컴파일 없음)"""
+    return _precompressed_response(_results_shell, 'no-cache')
+
 
+@app.route(RESULTS_ASSET_PATH + '<name>', methods=['GET'])
+def results_asset(name):
+    """/results 셸이 참조하는 해시 이름 CSS/JS. 내용이 바뀌면 이름이 바뀌므로 immutable."""
+    entry = _results_assets.get(name)
+    if entry is None:
+        return jsonify({'error': 'not found'}), 404
+    return _precompressed_response(entry, 'public, max-age=31536000, immutable')
+
+@_perf_timed('build_server_prediction_light')
 def _build_server_prediction_light(results=None, hours=24):
     """예측픽 캐시 전용 경량 경로. _build_results_payload_db_only 대비 calc_best·shape_pick·get_shape_prediction_hint 등 생략."""
     try:
@@ -12060,6 +14253,7 @@ def _build_results_payload_db_only(hours=24, backfill=False, results=None, ph=No
         if len(results) >= 16:
             try:
                 pred_rnd = int(str(results[0].get('gameID') or '0'), 10) + 1
+                _shared_pull('shape_pick')
                 cached = _shape_pick_cache.get(pred_rnd) if isinstance(_shape_pick_cache, dict) else None
                 if cached and cached.get('shape_pick') in ('정', '꺽'):
                     sp = cached['shape_pick']
@@ -12082,6 +14276,7 @@ def _build_results_payload_db_only(hours=24, backfill=False, results=None, ph=No
                         for k in list(_shape_pick_cache.keys()):
                             if k != pred_rnd and (not isinstance(k, (int, float)) or k < pred_rnd - 5):
                                 del _shape_pick_cache[k]
+                        _state_publish('shape_pick', _shape_pick_cache)
                 server_pred['pong_pick'] = _get_pong_pick_for_round(results, pred_rnd)
                 is_15_red = _get_card_15_color_for_latest_round(results)
                 if is_15_red is True:
@@ -12355,6 +14550,7 @@ def _build_results_payload():
             if len(results) >= 16:
                 try:
                     pred_rnd = int(str(results[0].get('gameID') or '0'), 10) + 1
+                    _shared_pull('shape_pick')
                     cached = _shape_pick_cache.get(pred_rnd) if isinstance(_shape_pick_cache, dict) else None
                     if cached and cached.get('shape_pick') in ('정', '꺽'):
                         sp = cached['shape_pick']
@@ -12377,6 +14573,7 @@ def _build_results_payload():
                             for k in list(_shape_pick_cache.keys()):
                                 if k != pred_rnd and (not isinstance(k, (int, float)) or k < pred_rnd - 5):
                                     del _shape_pick_cache[k]
+                            _state_publish('shape_pick', _shape_pick_cache)
                     server_pred['pong_pick'] = _get_pong_pick_for_round(results, pred_rnd)
                     is_15_red = _get_card_15_color_for_latest_round(results)
                     if is_15_red is True:
@@ -12541,6 +14738,7 @@ def _build_results_payload():
             if len(results) >= 16:
                 try:
                     pred_rnd = int(str(results[0].get('gameID') or '0'), 10) + 1
+                    _shared_pull('shape_pick')
                     cached = _shape_pick_cache.get(pred_rnd) if isinstance(_shape_pick_cache, dict) else None
                     if cached and cached.get('shape_pick') in ('정', '꺽'):
                         sp = cached['shape_pick']
@@ -12563,6 +14761,7 @@ def _build_results_payload():
                             for k in list(_shape_pick_cache.keys()):
                                 if k != pred_rnd and (not isinstance(k, (int, float)) or k < pred_rnd - 5):
                                     del _shape_pick_cache[k]
+                            _state_publish('shape_pick', _shape_pick_cache)
                     server_pred['pong_pick'] = _get_pong_pick_for_round(results, pred_rnd)
                     is_15_red = _get_card_15_color_for_latest_round(results)
                     if is_15_red is True:
@@ -12648,6 +14847,15 @@ _results_refreshing = False
 _last_refresh_trigger_at = 0.0  # /api/results에서 refresh 트리거 스로틀 (REFRESH_TRIGGER_THROTTLE_SEC)
 _apply_lock = threading.Lock()
 _prediction_light_lock = threading.Lock()
+# /api/results 직렬화 캐시: 페이로드 내용(timestamp 제외)이 바뀔 때만 버전 증가 + JSON·gzip 바이트 1회 인코딩.
+# 폴링은 ETag(If-None-Match) 일치 시 304, 불일치 시 미리 만든 바이트를 그대로 전송 (요청마다 jsonify·정렬·copy 없음)
+_results_encode_lock = threading.Lock()
+_results_version = int(time.time() * 1000)  # 재시작 후에도 이전 프로세스 버전과 겹치지 않도록 시각 기반 시작값
+_results_encoded = None  # {'version', 'digest', 'etag', 'body', 'gzip', 'payload', 'fp'}
+# ?since=<version> 델타용: 최근 버전별 지문(결과 gameID·히스토리 round·필드별 해시). 범위 밖 버전은 전체 스냅샷
+RESULTS_DELTA_HISTORY = 32
+_results_fp_history = deque(maxlen=RESULTS_DELTA_HISTORY)  # (version, fp)
+_results_delta_cache = {}  # (since, version) -> 인코딩된 델타
 _last_prediction_light_at = 0.0  # apply 스킵 시 경량 prediction 갱신 스로틀 (0.1초)
 
 def _update_prediction_cache_from_db(results=None):
@@ -12658,6 +14866,9 @@ def _update_prediction_cache_from_db(results=None):
             return
         sp = _build_server_prediction_light(results=results, hours=24)
         if sp:
+            if sp != prediction_cache:
+                _ws_results_push('prediction_update', {'server_prediction': sp})
+                _state_publish('prediction', sp)
             prediction_cache = sp
             if sp.get('value') is None and sp.get('round'):
                 # 보류 원인 로그 (60초마다, 스팸 방지)
@@ -12677,18 +14888,164 @@ def _update_prediction_cache_from_db(results=None):
     except Exception as e:
         print(f"[API] prediction_cache 갱신 오류: {str(e)[:100]}")
 
+def _set_results_cache(payload, version=None):
+    """results_cache 갱신. 응답 순서 규칙(맨 앞=최신)은 여기서 한 번 정렬해 보장.
+    내용이 직전 버전과 같으면 기존 버전·인코딩 유지(ETag 불변), 다르면 version+1 후 JSON·gzip 바이트 생성. 반환: 인코딩 엔트리.
+    version 지정(팔로워 워커가 리더 스냅샷 반영) 시 그 버전을 그대로 써서 워커 간 ETag·since_version이 일치."""
+    global results_cache, last_update_time, _results_version, _results_encoded
+    if not payload or not payload.get('results'):
+        return None
+    t0 = time.time()
+    payload = dict(payload)
+    payload.pop('version', None)
+    if version is None and not _leader_state['leader']:
+        # 팔로워는 버전을 만들지 않음 — 로컬 번호가 리더의 다음 스냅샷 번호와 겹쳐 다른 내용에 since=버전 304가 나감
+        return _results_encoded
+    payload['results'] = _sort_results_newest_first(list(payload['results']))
+    core = {k: v for k, v in payload.items() if k != 'timestamp'}
+    digest = hashlib.blake2b(app.json.dumps(core, separators=(',', ':')).encode('utf-8'), digest_size=12).hexdigest()
+    pushed_from = False
+    with _results_encode_lock:
+        enc = _results_encoded
+        if enc is None or enc['digest'] != digest:
+            pushed_from = enc['version'] if enc is not None else None
+            _results_version = int(version) if version is not None else _results_version + 1
+            payload['version'] = _results_version
+            body = (app.json.dumps(payload, separators=(',', ':')) + '\n').encode('utf-8')
+            enc = {
+                'version': _results_version,
+                'digest': digest,
+                'etag': f'"r{_results_version}-{digest}"',
+                'body': body,
+                'gzip': gzip.compress(body, compresslevel=5),
+                'payload': payload,
+                'fp': _results_payload_fingerprint(payload),
+            }
+            _results_encoded = enc
+            _results_fp_history.append((enc['version'], enc['fp']))
+            _results_delta_cache.clear()
+            if version is None:
+                _state_publish('results', enc)
+        results_cache = enc['payload']
+        last_update_time = time.time() * 1000
+    if pushed_from is not False and _results_ws_clients > 0:
+        # 새 버전 푸시는 실행기에서 (델타 인코딩이 apply 틱을 잡지 않게). 밀리면 최신 버전 1건으로 병합
+        _bg_submit('ws_results_push', _ws_push_results_update, enc, pushed_from, key='ws_results_push')
+        _bg_submit('ws_shape_pick_push', _ws_push_shape_pick, key='ws_shape_pick_push')
+    _perf_log('set_results_cache', (time.time() - t0) * 1000)
+    return enc
+
+
+def _ws_push_results_update(enc, since):
+    """/results 탭에 새 버전 알림. 직전 버전 기준 델타(JSON 문자열)를 함께 실어 탭이 HTTP 없이 적용하게 함.
+    델타를 못 만들면 버전·ETag만 — 탭이 ?since= 로 가져감."""
+    msg = {'version': enc['version'], 'etag': enc['etag']}
+    if since is not None:
+        d = _results_delta_encoded(enc, since)
+        if d is not None:
+            msg['since'] = since
+            msg['delta_json'] = d['body'].decode('utf-8')
+    _ws_results_push('results_update', msg)
+
+
+def _ws_push_shape_pick():
+    """결과 새 버전마다 모양픽 재빌드(/api/shape-pick 캐시 공유) 후 바뀌었으면 푸시."""
+    prev = _sf_cache.get('shape_pick')
+    val = _sf_refresh('shape_pick', _build_shape_pick_response)
+    if val is not None and (prev is None or prev[0] != val):
+        _ws_results_push('shape_pick_update', val)
+
+
+def _results_payload_fingerprint(payload):
+    """델타 비교용 지문. results는 gameID별, prediction_history는 round별, 나머지는 필드별 해시."""
+    dumps = lambda v: hash(app.json.dumps(v, separators=(',', ':')))
+    ph = payload.get('prediction_history') or []
+    return {
+        'results': {str(r.get('gameID')): dumps(r) for r in (payload.get('results') or [])},
+        # round 없는 행이 있으면 round 단위 델타 불가 → None (전체 히스토리 전송)
+        'ph': {h['round']: dumps(h) for h in ph} if all(isinstance(h, dict) and h.get('round') is not None for h in ph) else None,
+        'fields': {k: dumps(v) for k, v in payload.items() if k not in ('results', 'prediction_history', 'version')},
+    }
+
+
+def _results_delta_encoded(enc, since):
+    """since 버전 → 현재 버전 델타(추가·변경 결과/히스토리 행, 삭제 키, 바뀐 필드). since가 이력에 없으면 None(전체 스냅샷)."""
+    key = (since, enc['version'])
+    with _results_encode_lock:
+        cached = _results_delta_cache.get(key)
+        base_fp = next((fp for v, fp in _results_fp_history if v == since), None)
+    if cached is not None:
+        return cached
+    if base_fp is None:
+        return None
+    cur_fp = enc['fp']
+    payload = enc['payload']
+    delta = {'delta': True, 'since': since, 'version': enc['version']}
+    old_r, new_r = base_fp['results'], cur_fp['results']
+    delta['results_upsert'] = [r for r in (payload.get('results') or []) if old_r.get(str(r.get('gameID'))) != new_r.get(str(r.get('gameID')))]
+    delta['results_removed'] = [gid for gid in old_r if gid not in new_r]
+    if base_fp['ph'] is None or cur_fp['ph'] is None:
+        delta['prediction_history'] = payload.get('prediction_history') or []
+    else:
+        old_h, new_h = base_fp['ph'], cur_fp['ph']
+        delta['ph_upsert'] = [h for h in (payload.get('prediction_history') or []) if old_h.get(h['round']) != new_h.get(h['round'])]
+        delta['ph_removed'] = [rnd for rnd in old_h if rnd not in new_h]
+    old_f, new_f = base_fp['fields'], cur_fp['fields']
+    delta['fields'] = {k: payload[k] for k in new_f if old_f.get(k) != new_f[k]}
+    delta['fields_removed'] = [k for k in old_f if k not in new_f]
+    body = (app.json.dumps(delta, separators=(',', ':')) + '\n').encode('utf-8')
+    out = {'body': body, 'gzip': gzip.compress(body, compresslevel=5)}
+    with _results_encode_lock:
+        if _results_encoded is enc:  # 그 사이 새 버전이 나왔으면 캐시하지 않음
+            _results_delta_cache[key] = out
+    return out
+
+
+def _build_and_cache_results(hours, backfill=False):
+    """DB 전용 페이로드 빌드 + 직렬화 캐시 반영. 같은 (hours, backfill) 동시 호출은 1회 빌드 공유. 반환: 인코딩 엔트리 또는 None."""
+    def _build():
+        payload = _build_results_payload_db_only(hours=hours, backfill=backfill)
+        return _set_results_cache(payload) if payload and payload.get('results') else None
+    return _single_flight(('results_payload', hours, bool(backfill)), _build)
+
+
+def _results_encoded_response(enc):
+    """인코딩 엔트리로 응답. If-None-Match 일치(또는 since=현재 버전) 시 본문 없는 304,
+    since가 최근 버전이면 델타, 아니면 전체 스냅샷. gzip 수용 시 미리 압축한 바이트 전송."""
+    inm = request.headers.get('If-None-Match') or ''
+    try:
+        since = int(request.args.get('since')) if request.args.get('since') else None
+    except (TypeError, ValueError):
+        since = None
+    if (inm and enc['etag'] in [t.strip() for t in inm.split(',')]) or since == enc['version']:
+        resp = Response(status=304)
+    else:
+        src = (_results_delta_encoded(enc, since) if since is not None else None) or enc
+        use_gzip = 'gzip' in (request.headers.get('Accept-Encoding') or '').lower()
+        resp = Response(src['gzip'] if use_gzip else src['body'], mimetype='application/json')
+        if use_gzip:
+            resp.headers['Content-Encoding'] = 'gzip'
+    resp.headers['ETag'] = enc['etag']
+    resp.headers['Vary'] = 'Accept-Encoding'
+    # no-store 대신 no-cache: 브라우저가 저장 후 매번 재검증(If-None-Match) → 변경 없으면 304
+    resp.headers['Cache-Control'] = 'no-cache, must-revalidate'
+    return resp
+
+
+@_sql_scoped('refresh_results_background')
 def _refresh_results_background():
     """백그라운드에서 캐시 갱신. 서버가 항상 최신 결과를 송출하려면 유효한 페이로드가 오면 캐시를 덮어쓴다."""
-    global results_cache, last_update_time, _results_refreshing
+    global _results_refreshing
     t0 = time.time()
+    if not _leader_state['leader']:
+        return  # 다중 워커: 수집·apply는 리더만. 팔로워는 공유 스냅샷으로 캐시 갱신
     if not _results_refresh_lock.acquire(blocking=False):
         return
     _results_refreshing = True
     try:
         payload = _build_results_payload()
         if payload is not None and payload.get('results'):
-            results_cache = payload
-            last_update_time = time.time() * 1000
+            _set_results_cache(payload)
             # fetch 완료 직후 apply 즉시 실행 — 금액(마틴 단계) 정확도
             if DB_AVAILABLE and DATABASE_URL and _apply_lock.acquire(blocking=False):
                 try:
@@ -12697,6 +15054,7 @@ def _refresh_results_background():
                     if results and len(results) >= 16:
                         ensure_stored_prediction_for_current_round(results)
                         ph_refresh = _apply_results_to_calcs(results)
+                        _trace_round(_latest_round_of(results), 'apply_done')
                         _backfill_latest_round_to_prediction_history(results)
                     _update_prediction_cache_from_db(results=results)
                     _update_relay_cache_for_running_calcs(results=results, ph=ph_refresh)
@@ -12715,87 +15073,114 @@ def _refresh_results_background():
         except Exception:
             pass
 
+# result_source별 round_actuals 캐시: base -> (갱신 시각, round_actuals). 요청 핸들러는 읽기만, 외부 조회는 _bg_submit으로
+RESULT_SOURCE_CACHE_TTL_SEC = float(os.getenv('RESULT_SOURCE_CACHE_TTL_SEC', '2'))
+RESULT_SOURCE_CACHE_MAX = 8
+_result_source_cache = {}
+
+
+def _refresh_result_source(base):
+    results_from_source = load_results_data(base_url=base)
+    if results_from_source and len(results_from_source) >= 16:
+        ra = _build_round_actuals(_sort_results_newest_first(results_from_source))
+        if base not in _result_source_cache and len(_result_source_cache) >= RESULT_SOURCE_CACHE_MAX:
+            oldest = min(_result_source_cache, key=lambda k: _result_source_cache[k][0])
+            _result_source_cache.pop(oldest, None)
+        _result_source_cache[base] = (time.time(), ra)
+        _log_throttle(f'result_source:{base}', 30, f"[API] result_source 갱신: {base} → round_actuals {len(ra)}건")
+
+
+def _result_source_round_actuals(base):
+    """base 소스의 캐시된 round_actuals. 없거나 TTL 지났으면 백그라운드 갱신 예약(첫 요청은 None → 기본 round_actuals 사용)."""
+    ent = _result_source_cache.get(base)
+    if ent is None or (time.time() - ent[0]) >= RESULT_SOURCE_CACHE_TTL_SEC:
+        _bg_submit('result_source_refresh', _refresh_result_source, base, key=f'result_source:{base}')
+    return ent[1] if ent else None
+
+
 @app.route('/api/results', methods=['GET'])
 def get_results():
-    """경기 결과 API. 화면 송출 보장: 캐시 유효 시 즉시 반환, 만료 시 DB에서 결과 생성."""
+    """경기 결과 API. 화면 송출 보장: 캐시 유효 시 미리 인코딩한 바이트(ETag/304) 반환, 만료 시 DB에서 결과 생성."""
     try:
-        global results_cache, last_update_time, _last_refresh_trigger_at
+        global last_update_time, _last_refresh_trigger_at
         result_source = request.args.get('result_source', '').strip()
         do_backfill = request.args.get('backfill') == '1'
+        _shared_pull('results')
 
-        # [1단계 최적화] 캐시 유효 시 DB 조회 생략. 0.1초 TTL — 10초 게임에 영향 없이 부하 대폭 감소
-        now_ms = time.time() * 1000
-        use_cache = (
-            not result_source and not do_backfill
-            and results_cache and results_cache.get('results')
-            and (now_ms - last_update_time) < RESULTS_RESPONSE_CACHE_TTL_MS
-        )
-        if use_cache:
-            payload = results_cache.copy()
-        else:
-            # 매 요청마다 DB에서 응답 생성. 24h 구간으로 타임존/커밋 타이밍에 따른 최신 회차 누락 방지 (규칙 준수)
-            payload = _build_results_payload_db_only(hours=24, backfill=do_backfill)
-        if payload and payload.get('results'):
-            results_cache = payload
-            last_update_time = time.time() * 1000
-        if not payload or not payload.get('results'):
-            payload = _build_results_payload_db_only(hours=72, backfill=do_backfill) or payload
-            if payload and payload.get('results'):
-                results_cache = payload
-                last_update_time = time.time() * 1000
-        if not payload or not payload.get('results'):
-            if results_cache and results_cache.get('results'):
-                payload = results_cache.copy()
-            else:
-                # DB·캐시 모두 비어 있으면 외부 fetch 시도 (콜드스타트·다운 복구)
-                try:
-                    sync_payload = _build_results_payload()
-                    if sync_payload and sync_payload.get('results'):
-                        payload = sync_payload
-                        results_cache = sync_payload
-                        last_update_time = time.time() * 1000
-                        print(f"[API] 콜드스타트 fetch 성공: {len(payload.get('results', []))}건")
-                except Exception as e:
-                    print(f"[API] 콜드스타트 fetch 실패: {str(e)[:150]}")
-                if not payload or not payload.get('results'):
-                    payload = {
-                        'results': [], 'count': 0, 'timestamp': datetime.now().isoformat(),
-                        'error': 'loading', 'prediction_history': [], 'server_prediction': {'value': None, 'round': 0, 'prob': 0, 'color': None, 'warning_u35': False, 'pong_chunk_phase': None, 'pong_chunk_debug': {}},
-                        'blended_win_rate': None, 'round_actuals': {}, 'joker_stats': {}
-                    }
         # refresh 트리거: 0.5초 스로틀 — fetch·apply 경합 완화 (2단계 최적화)
         now_tr = time.time()
         if not _results_refreshing and (now_tr - _last_refresh_trigger_at) >= REFRESH_TRIGGER_THROTTLE_SEC:
             _last_refresh_trigger_at = now_tr
-            threading.Thread(target=_refresh_results_background, daemon=True).start()
-        
-        # result_source 지정 시: 베팅 사이트와 동일한 결과 소스에서 round_actuals 재조회
+            _bg_submit('refresh_results', _refresh_results_background)
+
+        # [1단계 최적화] 캐시 유효 시 DB 조회·직렬화 생략. 정렬은 _set_results_cache에서 저장 시 1회
+        now_ms = time.time() * 1000
+        enc = _results_encoded
+        follower = not _leader_state['leader']
+        if follower and enc is None and not result_source:
+            # 팔로워 기동 직후(첫 스냅샷 전): DB로 만든 페이로드를 버전 없이 1회성 응답 — 캐시·버전은 리더 스냅샷만
+            payload = _single_flight(('results_payload_follower', 24), lambda: _build_results_payload_db_only(hours=24, backfill=False))
+            if payload and payload.get('results'):
+                payload = dict(payload)
+                payload.pop('version', None)
+                resp = jsonify(payload)
+                resp.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate'
+                return resp
+        if follower and enc is not None and not result_source:
+            # 팔로워: 리더 스냅샷(버전·ETag) 그대로 — 로컬 재빌드 없음(backfill도 리더 몫)
+            return _results_encoded_response(enc)
+        if (not result_source and not do_backfill and enc is not None and results_cache is enc['payload']
+                and (now_ms - last_update_time) < RESULTS_RESPONSE_CACHE_TTL_MS):
+            last_update_time = now_ms  # 기존 동작 유지: 폴링 중에는 캐시 유지, 갱신은 스케줄러 apply가 담당
+            return _results_encoded_response(enc)
+
+        # 만료 직후(stale-while-revalidate 구간): 직전 바이트 즉시 반환, 재빌드는 백그라운드 1건으로 병합
+        if (not result_source and not do_backfill and enc is not None and results_cache is enc['payload']
+                and (now_ms - last_update_time) < RESULTS_RESPONSE_CACHE_TTL_MS + RESULTS_STALE_WHILE_REVALIDATE_MS):
+            _bg_submit('results_rebuild', _build_and_cache_results, 24, False)
+            return _results_encoded_response(enc)
+
+        # DB에서 응답 생성 — 동시 요청은 single-flight로 1회 빌드 공유. 24h 구간으로 타임존/커밋 타이밍에 따른 최신 회차 누락 방지 (규칙 준수)
+        enc = _build_and_cache_results(24, do_backfill) if not follower else None
+        if enc is None and not follower:
+            enc = _build_and_cache_results(72, do_backfill)
+        if enc is None and results_cache and results_cache.get('results'):
+            enc = _results_encoded
+        if enc is None:
+            # DB·캐시 모두 비어 있음(콜드스타트·다운 복구): 요청 안에서 외부 fetch하지 않음 — 위에서 백그라운드 갱신을 걸었으니 loading 응답
+            payload = {
+                'results': [], 'count': 0, 'timestamp': datetime.now().isoformat(),
+                'error': 'loading', 'prediction_history': [], 'server_prediction': {'value': None, 'round': 0, 'prob': 0, 'color': None, 'warning_u35': False, 'pong_chunk_phase': None, 'pong_chunk_debug': {}},
+                'blended_win_rate': None, 'round_actuals': {}, 'joker_stats': {}
+            }
+            resp = jsonify(payload)
+            resp.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate'
+            resp.headers['Pragma'] = 'no-cache'
+            resp.headers['Retry-After'] = '1'
+            return resp
+        payload = enc['payload']
+        first_id = (payload['results'][0].get('gameID') if payload.get('results') else None)
+        _log_throttle('api_results_resp', 10, f"[API] 응답 결과 수: {len(payload.get('results') or [])}개, 맨 앞(최신) gameID: {first_id}")
+
+        # result_source 지정 시: 베팅 사이트와 동일한 결과 소스의 round_actuals로 교체 (요청별 응답 — 직렬화 캐시 미사용)
+        # 외부 조회는 백그라운드에서만 — 요청은 소스별 캐시를 쓰고, 오래됐으면 갱신만 걸어 둠
         if result_source:
             try:
                 from urllib.parse import urlparse
                 parsed = urlparse(result_source)
                 base = f"{parsed.scheme or 'https'}://{parsed.netloc}" if parsed.netloc else result_source.rstrip('/')
-                results_from_source = load_results_data(base_url=base)
-                if results_from_source and len(results_from_source) >= 16:
-                    ra = _build_round_actuals(_sort_results_newest_first(results_from_source))
+                ra = _result_source_round_actuals(base)
+                if ra:
                     payload = dict(payload)
                     payload['round_actuals'] = ra
                     payload['result_source_used'] = base
-                    print(f"[API] result_source 적용: {base} → round_actuals {len(ra)}건")
             except Exception as e:
                 print(f"[API] result_source 조회 실패: {result_source} - {str(e)[:100]}")
-        
-        # 화면 맨 왼쪽 = 최신 회차 보장: 응답 직전에 game_id 기준 내림차순 강제 정렬 (캐시/병합 출처와 무관)
-        if payload and payload.get('results'):
-            payload = dict(payload)
-            payload['results'] = _sort_results_newest_first(list(payload['results']))
-            first_id = (payload['results'][0].get('gameID') if payload['results'] else None)
-            _log_throttle('api_results_resp', 10, f"[API] 응답 결과 수: {len(payload['results'])}개, 맨 앞(최신) gameID: {first_id}")
-        
-        resp = jsonify(payload)
-        resp.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate'
-        resp.headers['Pragma'] = 'no-cache'
-        return resp
+            resp = jsonify(payload)
+            resp.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate'
+            resp.headers['Pragma'] = 'no-cache'
+            return resp
+        return _results_encoded_response(enc)
     except Exception as e:
         import traceback
         error_msg = str(e)[:200]
@@ -12919,56 +15304,57 @@ def debug_prediction():
 def get_current_prediction():
     """예측픽만 경량 반환(캐시 기반). prediction_cache 우선 → results_cache. 화면에서 예측픽을 빨리 표시."""
     global results_cache, prediction_cache
+    _shared_pull('prediction')
     sp = None
     if prediction_cache is not None:
         sp = prediction_cache
     elif results_cache and results_cache.get('server_prediction'):
         sp = results_cache['server_prediction']
     else:
-        # 첫 요청 시 캐시 비어 있으면 DB에서 1회 갱신 (페이지 멈춤·예측픽 안 나오는 현상 방지)
-        _update_prediction_cache_from_db()
+        # 첫 요청 시 캐시 비어 있으면 DB에서 1회 갱신 (페이지 멈춤·예측픽 안 나오는 현상 방지). 동시 요청은 1회 갱신 공유
+        _single_flight('prediction_cache', _update_prediction_cache_from_db)
         sp = prediction_cache if prediction_cache is not None else {'value': None, 'round': 0, 'prob': 0, 'color': None, 'warning_u35': False, 'pong_chunk_phase': None, 'pong_chunk_debug': {}}
     return jsonify({'server_prediction': sp})
 
 
 @app.route('/api/shape-pick', methods=['GET'])
 def get_shape_pick():
-    """모양판별 '가장 최근 다음 픽' 전용 경량 API. 예측기픽 모양 카드 빠른 표시용. 350ms 캐시로 DB 부하 완화."""
-    global _shape_pick_cache, _shape_pick_cache_at
+    """모양판별 '가장 최근 다음 픽' 전용 경량 API. 예측기픽 모양 카드 빠른 표시용. 350ms 캐시 + stale-while-revalidate로 DB 부하 완화."""
+    empty = {'shape_pick': None, 'shape_color': None, 'round': None, 'shape_15_rate': None}
     try:
-        now = time.time()
-        if _shape_pick_cache is not None and (now - _shape_pick_cache_at) < SHAPE_PICK_CACHE_TTL_SEC:
-            return jsonify(_shape_pick_cache), 200
         if not DB_AVAILABLE or not DATABASE_URL:
-            return jsonify({'shape_pick': None, 'shape_color': None, 'round': None, 'shape_15_rate': None}), 200
-        results = get_recent_results(hours=3)
-        results = _sort_results_newest_first(results) if results else []
-        if len(results) < 16:
-            return jsonify({'shape_pick': None, 'shape_color': None, 'round': None, 'shape_15_rate': None}), 200
-        pred_rnd = int(str(results[0].get('gameID') or '0'), 10) + 1
-        ph = get_prediction_history(100)
-        sp = _get_latest_next_pick_for_chunk(results, exclude_round=pred_rnd)
-        shape_pick = sp if sp in ('정', '꺽') else None
-        is_15_red = _get_card_15_color_for_latest_round(results)
-        if is_15_red is True:
-            shape_color = '빨강' if shape_pick == '정' else '검정' if shape_pick == '꺽' else None
-        elif is_15_red is False:
-            shape_color = '검정' if shape_pick == '정' else '빨강' if shape_pick == '꺽' else None
-        else:
-            shape_color = '빨강' if shape_pick == '정' else '검정' if shape_pick == '꺽' else None
-        shape_15_rate = _get_shape_15_win_rate_weighted(ph, decay=PRED_PICKS_DECAY) if ph else None
-        out = {
-            'shape_pick': shape_pick,
-            'shape_color': shape_color,
-            'round': pred_rnd,
-            'shape_15_rate': round(shape_15_rate, 1) if shape_15_rate is not None else None
-        }
-        _shape_pick_cache = out
-        _shape_pick_cache_at = time.time()
-        return jsonify(out), 200
+            return jsonify(empty), 200
+        out = _cached_single_flight('shape_pick', _build_shape_pick_response, SHAPE_PICK_CACHE_TTL_SEC, SHAPE_PICK_STALE_SEC)
+        return jsonify(out if out is not None else empty), 200
     except Exception as e:
         print(f"[경고] shape-pick API 오류: {str(e)[:80]}")
-        return jsonify({'shape_pick': None, 'shape_color': None, 'round': None, 'shape_15_rate': None}), 200
+        return jsonify(empty), 200
+
+
+def _build_shape_pick_response():
+    """shape-pick 응답 생성 (DB 조회). 결과 16건 미만이면 None — 캐시하지 않음."""
+    results = get_recent_results(hours=3)
+    results = _sort_results_newest_first(results) if results else []
+    if len(results) < 16:
+        return None
+    pred_rnd = int(str(results[0].get('gameID') or '0'), 10) + 1
+    ph = get_prediction_history(100)
+    sp = _get_latest_next_pick_for_chunk(results, exclude_round=pred_rnd)
+    shape_pick = sp if sp in ('정', '꺽') else None
+    is_15_red = _get_card_15_color_for_latest_round(results)
+    if is_15_red is True:
+        shape_color = '빨강' if shape_pick == '정' else '검정' if shape_pick == '꺽' else None
+    elif is_15_red is False:
+        shape_color = '검정' if shape_pick == '정' else '빨강' if shape_pick == '꺽' else None
+    else:
+        shape_color = '빨강' if shape_pick == '정' else '검정' if shape_pick == '꺽' else None
+    shape_15_rate = _get_shape_15_win_rate_weighted(ph, decay=PRED_PICKS_DECAY) if ph else None
+    return {
+        'shape_pick': shape_pick,
+        'shape_color': shape_color,
+        'round': pred_rnd,
+        'shape_15_rate': round(shape_15_rate, 1) if shape_15_rate is not None else None
+    }
 
 
 @app.route('/api/calc-state', methods=['GET', 'POST'])
@@ -13116,22 +15502,16 @@ def api_calc_state():
                 out[cid] = {'running': False, 'started_at': 0, 'history': [], 'capital': 1000000, 'base': 10000, 'odds': 1.97, 'duration_limit': 0, 'use_duration_limit': False, 'reverse': False, 'timer_completed': False, 'smart_reverse': False, 'smart_reverse_threshold': 43, 'smart_reverse_min_streak': 3, 'streak_suppress_reverse': False, 'lock_direction_on_lose_streak': True, 'prediction_picks_best': False, 'prediction_picks_shape_pong_only': False, 'shape_only_latest_next_pick': False, 'shape_prediction': False, 'shape_weight': 1, 'chunk_weight': 1, 'pong_weight': 1, 'symmetry_weight': 1, 'last_trend_direction': None, 'martingale': False, 'martingale_type': 'pyo', 'target_enabled': False, 'target_amount': 0, 'pause_low_win_rate_enabled': False, 'pause_win_rate_threshold': 45, 'paused': False, 'max_win_streak_ever': 0, 'max_lose_streak_ever': 0, 'first_bet_round': 0, 'pending_round': None, 'pending_predicted': None, 'pending_prob': None, 'pending_color': None, 'pending_bet_amount': None, 'last_win_rate_zone': None, 'last_win_rate_zone_change_round': None, 'last_win_rate_zone_on_win': None}
         save_calc_state(session_id, out)
         # 계산기 running 상태를 current_pick에 반영 → 에뮬레이터 매크로가 목표 달성 시 자동 중지
+        # write-behind 큐로 — 직접 UPDATE하면 큐의 대기 값·flushed 기록과 어긋나 재시작 시 running=True가 생략됨
         if bet_int:
-            conn = get_db_connection(statement_timeout_sec=3)
-            if conn:
-                try:
-                    for cid in ('1', '2', '3'):
-                        if cid in out and isinstance(out[cid], dict):
-                            r = out[cid].get('running', True)
-                            bet_int.set_calculator_running(conn, int(cid), r)
-                            # relay 캐시 즉시 반영 — 정지/리셋 후 캐시에 이전 픽 남아 매크로가 계속 배팅하는 버그 방지
-                            if not r:
-                                _current_pick_relay_cache[int(cid)] = {'round': None, 'pick_color': None, 'suggested_amount': None, 'running': False, 'probability': None}
-                    conn.commit()
-                except Exception:
-                    conn.rollback()
-                finally:
-                    conn.close()
+            for cid in ('1', '2', '3'):
+                if cid in out and isinstance(out[cid], dict):
+                    r = out[cid].get('running', True)
+                    _queue_pick_write(int(cid), running=r, force=True)
+                    # relay 캐시 즉시 반영 — 정지/리셋 후 캐시에 이전 픽 남아 매크로가 계속 배팅하는 버그 방지
+                    # (헬퍼 경유: 버전 올림 + relay:N 공유 상태 기록 → 다른 워커도 정지 픽을 응답)
+                    if not r:
+                        _update_current_pick_relay_cache(int(cid), None, None, None, False)
         return jsonify({'session_id': session_id, 'server_time': server_time, 'calcs': out}), 200
     except Exception as e:
         # 계산기 실행이 서버 오류로 실패해도 클라이언트가 실행 상태 유지할 수 있도록 요청 body 기준으로 fallback 응답 반환
@@ -13178,45 +15558,192 @@ def _backfill_blended_win_rate(conn):
             r15, r30, r100, blended = comp
             cur2 = conn.cursor()
             cur2.execute('''
-                UPDATE prediction_history SET blended_win_rate = %s, rate_15 = %s, rate_30 = %s, rate_100 = %s WHERE round_num = %s
+                UPDATE prediction_history SET blended_win_rate = %s, rate_15 = %s, rate_30 = %s, rate_100 = %s
+                WHERE round_num = %s AND blended_win_rate IS NULL
+                RETURNING predicted, actual, FLOOR(EXTRACT(EPOCH FROM created_at) / 3600)::bigint
             ''', (round(blended, 1), round(r15, 1), round(r30, 1), round(r100, 1), rn))
+            row = cur2.fetchone()
+            if row:
+                # null → 값: 이전 기여분 없음, 새 구간에만 더함
+                _apply_win_rate_bucket_delta(cur2, _win_rate_bucket_rows(row[0], row[1], round(blended, 1), rn, row[2], 1))
             cur2.close()
         conn.commit()
     except Exception as e:
         print(f"[경고] blended_win_rate backfill 실패: {str(e)[:150]}")
 
 
+def _backfill_blended_win_rate_background():
+    """?backfill=1 요청은 응답을 막지 않도록 실행기에서 (같은 key로 병합)."""
+    conn = get_db_connection(statement_timeout_sec=60)
+    if not conn:
+        return
+    try:
+        _backfill_blended_win_rate(conn)
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+# /api/win-rate-buckets 집계 — win_rate_bucket_stats 20행(전체) 또는 block·hour 행 합 + 창 경계 부분만 원본 조회
+WIN_RATE_BUCKET_BLOCK = 100           # block scope 단위 회차 수
+WIN_RATE_BUCKET_MAX_ROUNDS = 50000    # ?rounds= 상한 (block 행 보관 범위)
+WIN_RATE_BUCKET_MAX_HOURS = 24 * 30   # ?hours= 상한 (hour 행 보관 범위)
+
+
+def _win_rate_bucket_index(blended):
+    """합산승률 → 5% 구간 번호 0~19."""
+    return min(19, max(0, int(float(blended) // 5)))
+
+
+def _win_rate_bucket_rows(predicted, actual, blended, round_num, hour, sign):
+    """prediction_history 1행의 집계 기여분 [(scope, period, bucket, 승, 패)]. 합산승률 없음·조커는 기여 없음."""
+    if blended is None or actual is None or actual == 'joker':
+        return []
+    b = _win_rate_bucket_index(blended)
+    win = 1 if predicted == actual else 0
+    dw, dl = sign * win, sign * (1 - win)
+    out = [('all', 0, b, dw, dl), ('block', int(round_num) // WIN_RATE_BUCKET_BLOCK, b, dw, dl)]
+    if hour is not None:
+        out.append(('hour', int(hour), b, dw, dl))
+    return out
+
+
+def _apply_win_rate_bucket_delta(cur, delta, prune=False):
+    """집계 증감 반영 (같은 키는 합쳐서 1행). 실패해도 예측 기록 저장은 유지 — 집계는 재구성으로 복구 가능."""
+    merged = {}
+    for scope, period, b, dw, dl in delta:
+        k = (scope, period, b)
+        w0, l0 = merged.get(k, (0, 0))
+        merged[k] = (w0 + dw, l0 + dl)
+    rows = [(k[0], k[1], k[2], w, l) for k, (w, l) in merged.items() if w or l]
+    if not rows and not prune:
+        return
+    try:
+        cur.execute('SAVEPOINT win_rate_bucket_delta')
+        if rows:
+            cur.execute('''
+                INSERT INTO win_rate_bucket_stats (scope, period, bucket, wins, losses)
+                VALUES ''' + ', '.join(['(%s, %s, %s, %s, %s)'] * len(rows)) + '''
+                ON CONFLICT (scope, period, bucket) DO UPDATE SET
+                    wins = win_rate_bucket_stats.wins + EXCLUDED.wins, losses = win_rate_bucket_stats.losses + EXCLUDED.losses
+            ''', [v for r in rows for v in r])
+        if prune:
+            # 창 상한 밖 block·hour 행 정리 (WIN_RATE_BUCKET_BLOCK 회차마다 1번)
+            cur.execute('''
+                DELETE FROM win_rate_bucket_stats
+                WHERE (scope = 'block' AND period < (SELECT MAX(period) FROM win_rate_bucket_stats WHERE scope = 'block') - %s)
+                   OR (scope = 'hour' AND period < FLOOR(EXTRACT(EPOCH FROM LOCALTIMESTAMP) / 3600)::bigint - %s)
+            ''', (WIN_RATE_BUCKET_MAX_ROUNDS // WIN_RATE_BUCKET_BLOCK + 1, WIN_RATE_BUCKET_MAX_HOURS + 1))
+        cur.execute('RELEASE SAVEPOINT win_rate_bucket_delta')
+    except Exception as e:
+        cur.execute('ROLLBACK TO SAVEPOINT win_rate_bucket_delta')
+        _log_throttle('win_rate_bucket_delta', 60, f"[경고] 합산승률 구간 집계 갱신 실패: {str(e)[:100]}")
+
+
+def _rebuild_win_rate_bucket_stats(cur):
+    """prediction_history 전체로 win_rate_bucket_stats 재구성 (초기 생성·오프라인 복구용, scripts/rebuild_win_rate_buckets.py)."""
+    cur.execute('DELETE FROM win_rate_bucket_stats')
+    cur.execute('''
+        WITH base AS (
+            SELECT round_num / %s AS blk,
+                   FLOOR(EXTRACT(EPOCH FROM created_at) / 3600)::bigint AS hr,
+                   LEAST(19, GREATEST(0, FLOOR(blended_win_rate / 5)))::smallint AS b,
+                   (predicted = actual)::int AS w, (predicted <> actual)::int AS l
+            FROM prediction_history
+            WHERE blended_win_rate IS NOT NULL AND actual != 'joker'
+        )
+        INSERT INTO win_rate_bucket_stats (scope, period, bucket, wins, losses)
+        SELECT 'all', 0, b, SUM(w), SUM(l) FROM base GROUP BY b
+        UNION ALL
+        SELECT 'block', blk, b, SUM(w), SUM(l) FROM base WHERE blk >= (SELECT MAX(blk) FROM base) - %s GROUP BY blk, b
+        UNION ALL
+        SELECT 'hour', hr, b, SUM(w), SUM(l) FROM base
+        WHERE hr IS NOT NULL AND hr >= FLOOR(EXTRACT(EPOCH FROM LOCALTIMESTAMP) / 3600)::bigint - %s GROUP BY hr, b
+    ''', (WIN_RATE_BUCKET_BLOCK, WIN_RATE_BUCKET_MAX_ROUNDS // WIN_RATE_BUCKET_BLOCK + 1, WIN_RATE_BUCKET_MAX_HOURS + 1))
+    return cur.rowcount
+
+
+def _read_win_rate_buckets(cur, rounds=None, hours=None):
+    """구간별 [승, 패] 20개. 창 없으면 all 20행, rounds/hours면 창에 완전히 들어가는 block·hour 행 합
+    + 창 시작이 걸친 block·hour 안의 원본 행만 조회(최대 1 block·1시간). 반환: (buckets, window 정보)."""
+    acc = [[0, 0] for _ in range(20)]
+    window = None
+    edge_rows = []
+    if rounds:
+        cur.execute('SELECT MAX(round_num) FROM prediction_history')
+        latest = cur.fetchone()[0]
+        if latest is not None:
+            lo = int(latest) - int(rounds) + 1
+            first_full = -(-lo // WIN_RATE_BUCKET_BLOCK)  # 창 안에서 시작하는 첫 block
+            cur.execute('''
+                SELECT bucket, SUM(wins), SUM(losses) FROM win_rate_bucket_stats
+                WHERE scope = 'block' AND period >= %s GROUP BY bucket
+            ''', (first_full,))
+            agg = cur.fetchall()
+            cur.execute('''
+                SELECT predicted, actual, blended_win_rate FROM prediction_history
+                WHERE round_num >= %s AND round_num < %s AND blended_win_rate IS NOT NULL AND actual != 'joker'
+            ''', (lo, first_full * WIN_RATE_BUCKET_BLOCK))
+            edge_rows = cur.fetchall()
+            window = {'rounds': int(rounds), 'from_round': lo, 'to_round': int(latest)}
+        else:
+            agg = []
+    elif hours:
+        cur.execute('''
+            WITH c AS (SELECT LOCALTIMESTAMP - (INTERVAL '1 hour' * %s) AS t)
+            SELECT bucket, SUM(wins), SUM(losses) FROM win_rate_bucket_stats
+            WHERE scope = 'hour' AND period >= FLOOR(EXTRACT(EPOCH FROM (SELECT date_trunc('hour', t) + INTERVAL '1 hour' FROM c)) / 3600)::bigint
+            GROUP BY bucket
+        ''', (float(hours),))
+        agg = cur.fetchall()
+        cur.execute('''
+            WITH c AS (SELECT LOCALTIMESTAMP - (INTERVAL '1 hour' * %s) AS t)
+            SELECT predicted, actual, blended_win_rate FROM prediction_history, c
+            WHERE created_at >= c.t AND created_at < date_trunc('hour', c.t) + INTERVAL '1 hour'
+              AND blended_win_rate IS NOT NULL AND actual != 'joker'
+        ''', (float(hours),))
+        edge_rows = cur.fetchall()
+        window = {'hours': float(hours)}
+    else:
+        cur.execute("SELECT bucket, wins, losses FROM win_rate_bucket_stats WHERE scope = 'all' AND period = 0")
+        agg = cur.fetchall()
+    for b, w, l in agg:
+        if 0 <= int(b) < 20:
+            acc[int(b)][0] += int(w or 0)
+            acc[int(b)][1] += int(l or 0)
+    for predicted, actual, blended in edge_rows:
+        b = _win_rate_bucket_index(blended)
+        win = 1 if predicted == actual else 0
+        acc[b][0] += win
+        acc[b][1] += 1 - win
+    return acc, window
+
+
 @app.route('/api/win-rate-buckets', methods=['GET'])
 def api_win_rate_buckets():
-    """합산승률 구간별 승/패 집계. prediction_history의 blended_win_rate 기준 5% 단위 구간(승률반픽 % 설정 참고용). ?backfill=1 시 null 행 보정."""
+    """합산승률 구간별 승/패 집계. prediction_history의 blended_win_rate 기준 5% 단위 구간(승률반픽 % 설정 참고용).
+    win_rate_bucket_stats(저장 시 증감 유지)에서 읽음. ?rounds=N 최근 N회차 / ?hours=K 최근 K시간 창. ?backfill=1 시 null 행 보정을 백그라운드로."""
     if not DB_AVAILABLE or not DATABASE_URL:
         return jsonify({'buckets': []}), 200
     try:
+        try:
+            rounds = min(WIN_RATE_BUCKET_MAX_ROUNDS, max(1, int(request.args['rounds']))) if request.args.get('rounds') else None
+            hours = min(WIN_RATE_BUCKET_MAX_HOURS, max(0.1, float(request.args['hours']))) if request.args.get('hours') else None
+        except ValueError:
+            return jsonify({'buckets': [], 'error': 'rounds/hours 형식 오류'}), 400
+        if request.args.get('backfill') == '1':
+            _bg_submit('win_rate_backfill', _backfill_blended_win_rate_background)
         conn = get_db_connection(statement_timeout_sec=10)
         if not conn:
             return jsonify({'buckets': []}), 200
-        if request.args.get('backfill') == '1':
-            _backfill_blended_win_rate(conn)
         cur = conn.cursor()
-        cur.execute('''
-            SELECT round_num, predicted, actual, blended_win_rate
-            FROM prediction_history
-            WHERE blended_win_rate IS NOT NULL AND actual != 'joker'
-            ORDER BY round_num ASC
-        ''')
-        rows = cur.fetchall()
+        acc, window = _read_win_rate_buckets(cur, rounds, hours)
         cur.close()
         conn.close()
         # 5% 단위 20개 구간 (0~5, 5~10, ..., 95~100) — 승률반픽 % 설정 시 참고
-        buckets = {i: {'bucket_min': i * 5, 'bucket_max': i * 5 + 5, 'wins': 0, 'losses': 0} for i in range(20)}
-        for r in rows:
-            b = float(r[3]) if r[3] is not None else None
-            if b is None:
-                continue
-            idx = min(19, max(0, int(b // 5)))
-            win = 1 if r[1] == r[2] else 0
-            buckets[idx]['wins'] += win
-            buckets[idx]['losses'] += (1 - win)
+        buckets = {i: {'bucket_min': i * 5, 'bucket_max': i * 5 + 5, 'wins': acc[i][0], 'losses': acc[i][1]} for i in range(20)}
         out = []
         recommended_upper = None  # 승률 50% 미만인 구간의 상한(맨 위 %)
         for i in range(20):
@@ -13236,146 +15763,271 @@ def api_win_rate_buckets():
                 upper = d['bucket_max']
                 if recommended_upper is None or upper > recommended_upper:
                     recommended_upper = upper
-        return jsonify({'buckets': out, 'recommended_threshold': recommended_upper}), 200
+        return jsonify({'buckets': out, 'recommended_threshold': recommended_upper, 'window': window}), 200
     except Exception as e:
         print(f"[❌ 오류] win-rate-buckets 실패: {str(e)[:200]}")
         return jsonify({'buckets': [], 'error': str(e)[:200]}), 200
 
 
+# 연패 구간·2연패 확률 범위 분석: prediction_history 최근 LOSS_ANALYTICS_MAX건을 메모리에 두고
+# 회차가 확정될 때마다(save_prediction_record) 1건씩 반영. 요청 limit별 창(_LossWindow)은 뒤에 1건 추가·앞에서 1건 제거가 O(1),
+# 응답 바이트는 (종류, limit, 이력 버전)별 1회만 인코딩. 다른 프로세스가 저장한 회차는 LOSS_ANALYTICS_TAIL_SYNC_SEC마다 꼬리만 조회.
+LOSS_ANALYTICS_MAX = 2000
+LOSS_ANALYTICS_TAIL_SYNC_SEC = 1.0
+LOSS_ANALYTICS_RELOAD_SEC = 60.0   # 덮어쓰기·순서 어긋난 저장 대비 전체 재적재 주기
+LOSS_ANALYTICS_MAX_WINDOWS = 4     # 유지하는 limit 창 수 (회차당 갱신 비용 상한)
+
+
+class _LossWindow:
+    """최근 limit건 창의 연속 패 run 집계. items=(round, loss, prob) — loss None은 조커(run 끊김).
+    3연패 이상 run의 회차(확률 10% 구간별)·run 수, 2연패 쌍 수·쌍에 속한 회차의 확률(정수 반올림별 개수)을 증감으로 유지."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.items = deque()
+        self.runs = deque()        # run = deque[(round, prob)], 창 안 순서대로
+        self.open = False          # 마지막 항목이 패라서 runs[-1]이 이어지는 중
+        self.streak_buckets = [0] * 10
+        self.streak_rounds = 0
+        self.streak_count = 0
+        self.pair_count = 0
+        self.pair_probs = {}       # round(prob) -> 개수
+
+    def _prob(self, entry, sign, streak=False):
+        p = entry[1]
+        if p is None:
+            return
+        if streak:
+            self.streak_buckets[min(9, max(0, int(p // 10)))] += sign
+        else:
+            k = round(p)
+            c = self.pair_probs.get(k, 0) + sign
+            if c:
+                self.pair_probs[k] = c
+            else:
+                self.pair_probs.pop(k, None)
+
+    def push(self, item):
+        self.items.append(item)
+        rnd, loss, prob = item
+        if not loss:
+            self.open = False
+        else:
+            if not self.open:
+                self.runs.append(deque())
+                self.open = True
+            run = self.runs[-1]
+            entry = (rnd, prob)
+            run.append(entry)
+            n = len(run)
+            if n >= 2:
+                self.pair_count += 1
+                if n == 2:
+                    self._prob(run[0], 1)
+                self._prob(entry, 1)
+            if n == 3:
+                self.streak_count += 1
+                self.streak_rounds += 3
+                for e in run:
+                    self._prob(e, 1, streak=True)
+            elif n > 3:
+                self.streak_rounds += 1
+                self._prob(entry, 1, streak=True)
+        while len(self.items) > self.limit:
+            self._evict()
+
+    def _evict(self):
+        _, loss, _ = self.items.popleft()
+        if not loss:
+            return
+        run = self.runs[0]
+        n = len(run)
+        entry = run[0]
+        if n >= 2:
+            self.pair_count -= 1
+            if n == 2:
+                self._prob(run[1], -1)
+            self._prob(entry, -1)
+        if n == 3:
+            self.streak_count -= 1
+            self.streak_rounds -= 3
+            for e in run:
+                self._prob(e, -1, streak=True)
+        elif n > 3:
+            self.streak_rounds -= 1
+            self._prob(entry, -1, streak=True)
+        run.popleft()
+        if not run:
+            self.runs.popleft()
+            if not self.runs:
+                self.open = False
+
+    def losing_streaks(self):
+        streak_list = []
+        for run in reversed(self.runs):
+            if len(streak_list) >= 20:
+                break
+            if len(run) < 3:
+                continue
+            probs = [p for _, p in run if p is not None]
+            streak_list.append({
+                'start_round': run[0][0],
+                'end_round': run[-1][0],
+                'length': len(run),
+                'avg_probability': round(sum(probs) / len(probs), 1) if probs else None,
+            })
+        return {
+            'prob_buckets': [{'bucket_min': i * 10, 'bucket_max': i * 10 + 10, 'count': self.streak_buckets[i]} for i in range(10)],
+            'streaks': streak_list,
+            'total_streak_rounds': self.streak_rounds,
+            'total_streaks': self.streak_count,
+        }
+
+    def dont_bet_ranges(self):
+        ranges = [{'min': min(self.pair_probs), 'max': max(self.pair_probs)}] if self.pair_probs else []
+        return {'dont_bet_ranges': ranges, 'two_streak_count': self.pair_count}
+
+
+_loss_analytics_lock = threading.Lock()
+_loss_analytics_sync_lock = threading.Lock()
+_loss_analytics = {
+    'rows': deque(maxlen=LOSS_ANALYTICS_MAX),  # (round, loss, prob) 회차 오름차순
+    'windows': {},          # limit -> _LossWindow (삽입 순서 = LRU)
+    'version': 0,           # 이력 버전: 반영할 때마다 +1
+    'bodies': {},           # (kind, limit) -> (version, bytes)
+    'loaded_at': 0.0,
+    'synced_at': 0.0,
+    'dirty': True,
+}
+
+
+def _loss_item(round_num, predicted, actual, probability):
+    actual = (actual or '').strip()
+    loss = None if actual == 'joker' else ((predicted or '').strip() != actual)
+    try:
+        prob = float(probability) if probability is not None else None
+    except (TypeError, ValueError):
+        prob = None
+    return (int(round_num), loss, prob)
+
+
+def _loss_analytics_append(items):
+    """회차 오름차순 새 항목을 원본·모든 창에 반영 (호출자가 락 보유). 마지막 회차 이하가 섞이면 재적재 표시."""
+    st = _loss_analytics
+    rows = st['rows']
+    for it in items:
+        if rows and it[0] <= rows[-1][0]:
+            st['dirty'] = True  # 덮어쓰기·순서 어긋남 — 다음 요청에서 전체 재적재
+            return
+        rows.append(it)
+        for w in st['windows'].values():
+            w.push(it)
+        st['version'] += 1
+
+
+def _loss_analytics_on_saved(round_num, predicted, actual, probability):
+    """save_prediction_record 성공 후: 확정된 회차 1건을 바로 반영 (아직 적재 전이면 다음 요청이 적재)."""
+    with _loss_analytics_lock:
+        if not _loss_analytics['dirty']:
+            _loss_analytics_append([_loss_item(round_num, predicted, actual, probability)])
+
+
+def _loss_analytics_sync():
+    """재적재가 필요하면 최근 LOSS_ANALYTICS_MAX건 1회 조회, 아니면 마지막 회차 이후 꼬리만 조회 (스로틀·동시 요청은 1건만)."""
+    st = _loss_analytics
+    now = time.time()
+    need_reload = st['dirty'] or now - st['loaded_at'] > LOSS_ANALYTICS_RELOAD_SEC
+    if not need_reload and now - st['synced_at'] < LOSS_ANALYTICS_TAIL_SYNC_SEC:
+        return
+    if not _loss_analytics_sync_lock.acquire(blocking=not st['rows']):
+        return  # 다른 요청이 동기화 중 — 현재 집계로 응답
+    try:
+        if need_reload:
+            hist = get_prediction_history(LOSS_ANALYTICS_MAX)
+            items = [_loss_item(h['round'], h.get('predicted'), h.get('actual'), h.get('probability')) for h in hist]
+            with _loss_analytics_lock:
+                st['rows'].clear()
+                st['rows'].extend(items)
+                for limit in list(st['windows']):
+                    st['windows'][limit] = _loss_window_from_rows(limit)
+                st['version'] += 1
+                st['dirty'] = False
+                st['loaded_at'] = st['synced_at'] = time.time()
+            return
+        last = st['rows'][-1][0] if st['rows'] else 0
+        conn = get_db_connection(statement_timeout_sec=5)
+        if not conn:
+            return
+        try:
+            cur = conn.cursor()
+            cur.execute('''
+                SELECT round_num, predicted, actual, probability FROM prediction_history
+                WHERE round_num > %s ORDER BY round_num ASC LIMIT %s
+            ''', (last, LOSS_ANALYTICS_MAX))
+            items = [_loss_item(*r) for r in cur.fetchall()]
+            cur.close()
+        finally:
+            conn.close()
+        with _loss_analytics_lock:
+            _loss_analytics_append(items)
+            st['synced_at'] = time.time()
+    finally:
+        _loss_analytics_sync_lock.release()
+
+
+def _loss_window_from_rows(limit):
+    w = _LossWindow(limit)
+    rows = _loss_analytics['rows']
+    for it in list(rows)[-limit:]:
+        w.push(it)
+    return w
+
+
+def _loss_analytics_body(kind, limit):
+    """(종류, limit) 응답 바이트. 이력 버전이 같으면 캐시 그대로 — 반복 요청은 조회·계산 없음."""
+    _loss_analytics_sync()
+    st = _loss_analytics
+    with _loss_analytics_lock:
+        ent = st['bodies'].get((kind, limit))
+        if ent is not None and ent[0] == st['version']:
+            return ent[1]
+        w = st['windows'].pop(limit, None)
+        if w is None:
+            w = _loss_window_from_rows(limit)
+            while len(st['windows']) >= LOSS_ANALYTICS_MAX_WINDOWS:
+                old = next(iter(st['windows']))
+                del st['windows'][old]
+                for k in ('losing', 'dont_bet'):
+                    st['bodies'].pop((k, old), None)
+        st['windows'][limit] = w  # 최근 사용을 맨 뒤로
+        out = w.losing_streaks() if kind == 'losing' else w.dont_bet_ranges()
+        body = app.json.dumps(out, separators=(',', ':')).encode('utf-8')
+        st['bodies'][(kind, limit)] = (st['version'], body)
+        return body
+
+
 @app.route('/api/dont-bet-ranges', methods=['GET'])
 def api_dont_bet_ranges():
-    """2연패가 발생한 회차들의 예측확률 범위(최소~최대)를 구해, '몇%부터 몇%까지 2연패 했다면 배팅하지 마세요' 반환."""
+    """2연패가 발생한 회차들의 예측확률 범위(최소~최대)를 구해, '몇%부터 몇%까지 2연패 했다면 배팅하지 마세요' 반환.
+    최근 limit건 창 집계를 회차 확정마다 증감으로 유지 — 요청은 캐시된 응답 바이트."""
     if not DB_AVAILABLE or not DATABASE_URL:
         return jsonify({'dont_bet_ranges': [], 'two_streak_count': 0}), 200
     try:
         limit = min(2000, max(300, int(request.args.get('limit', 1000))))
-        history = get_prediction_history(limit)
-        # 2연패 찾기: 연속 두 회차 모두 패(조커 제외)
-        probs_in_2streak = []
-        n = len(history or [])
-        for i in range(n - 1):
-            h0 = history[i] if i < len(history) else None
-            h1 = history[i + 1] if i + 1 < len(history) else None
-            if not h0 or not h1:
-                continue
-            if h0.get('actual') == 'joker' or h1.get('actual') == 'joker':
-                continue
-            loss0 = (h0.get('predicted') or '') != (h0.get('actual') or '')
-            loss1 = (h1.get('predicted') or '') != (h1.get('actual') or '')
-            if not (loss0 and loss1):
-                continue
-            for h in (h0, h1):
-                prob = h.get('probability')
-                if prob is not None:
-                    try:
-                        probs_in_2streak.append(float(prob))
-                    except (TypeError, ValueError):
-                        pass
-        dont_bet_ranges = []
-        if probs_in_2streak:
-            min_p = min(probs_in_2streak)
-            max_p = max(probs_in_2streak)
-            dont_bet_ranges = [{'min': round(min_p), 'max': round(max_p)}]
-        two_streak_count = sum(1 for i in range(n - 1) if _is_2streak_at(history, i))
-        return jsonify({
-            'dont_bet_ranges': dont_bet_ranges,
-            'two_streak_count': two_streak_count,
-        }), 200
+        return Response(_loss_analytics_body('dont_bet', limit), mimetype='application/json')
     except Exception as e:
         print(f"[❌ 오류] dont-bet-ranges 실패: {str(e)[:200]}")
         return jsonify({'dont_bet_ranges': [], 'two_streak_count': 0, 'error': str(e)[:200]}), 200
 
 
-def _is_2streak_at(history, i):
-    """history에서 i, i+1이 둘 다 패(조커 제외)인지."""
-    if not history or i + 1 >= len(history):
-        return False
-    h0, h1 = history[i], history[i + 1]
-    if not h0 or not h1 or h0.get('actual') == 'joker' or h1.get('actual') == 'joker':
-        return False
-    return (h0.get('predicted') or '') != (h0.get('actual') or '') and (h1.get('predicted') or '') != (h1.get('actual') or '')
-
-
-def _compute_losing_streaks(history, min_streak=3):
-    """예측 이력에서 min_streak(기본 3)연패 이상 구간 추출. 조커 제외, round 오름차순 가정."""
-    streaks = []
-    current = []
-    for h in (history or []):
-        if not h or not isinstance(h, dict):
-            continue
-        actual = (h.get('actual') or '').strip()
-        if actual == 'joker':
-            if len(current) >= min_streak:
-                streaks.append(list(current))
-            current = []
-            continue
-        predicted = (h.get('predicted') or '').strip()
-        is_loss = (predicted != actual)
-        if is_loss:
-            current.append({
-                'round': h.get('round'),
-                'probability': h.get('probability'),
-            })
-        else:
-            if len(current) >= min_streak:
-                streaks.append(list(current))
-            current = []
-    if len(current) >= min_streak:
-        streaks.append(list(current))
-    return streaks
-
-
 @app.route('/api/losing-streaks', methods=['GET'])
 def api_losing_streaks():
-    """3연패 이상 구간 감지 후, 해당 구간의 예측확률 구간별 집계. 연패 구간 메뉴용."""
+    """3연패 이상 구간 감지 후, 해당 구간의 예측확률 구간별 집계. 연패 구간 메뉴용. 최근 연패 구간 목록은 최대 20개(최신 먼저)."""
     if not DB_AVAILABLE or not DATABASE_URL:
         return jsonify({'prob_buckets': [], 'streaks': [], 'total_streak_rounds': 0}), 200
     try:
         limit = min(2000, max(300, int(request.args.get('limit', 500))))
-        history = get_prediction_history(limit)
-        streaks = _compute_losing_streaks(history, min_streak=3)
-        # 예측확률 10% 단위 구간별: 연패 구간에 속한 회차 수
-        prob_buckets = {i: {'bucket_min': i * 10, 'bucket_max': i * 10 + 10, 'count': 0} for i in range(10)}
-        total_streak_rounds = 0
-        for s in streaks:
-            for r in s:
-                total_streak_rounds += 1
-                prob = r.get('probability')
-                if prob is not None:
-                    p = float(prob)
-                    idx = min(9, max(0, int(p // 10)))
-                    prob_buckets[idx]['count'] += 1
-        out_buckets = []
-        for i in range(10):
-            d = prob_buckets[i]
-            out_buckets.append({
-                'bucket_min': d['bucket_min'],
-                'bucket_max': d['bucket_max'],
-                'count': d['count'],
-            })
-        # 최근 연패 구간 목록 (최대 20개): start_round, end_round, length, avg_prob
-        streak_list = []
-        for s in streaks[-20:]:
-            if not s:
-                continue
-            rounds = [x.get('round') for x in s if x.get('round') is not None]
-            probs = [float(x['probability']) for x in s if x.get('probability') is not None]
-            start_r = min(rounds) if rounds else None
-            end_r = max(rounds) if rounds else None
-            avg_p = round(sum(probs) / len(probs), 1) if probs else None
-            streak_list.append({
-                'start_round': start_r,
-                'end_round': end_r,
-                'length': len(s),
-                'avg_probability': avg_p,
-            })
-        streak_list.reverse()
-        return jsonify({
-            'prob_buckets': out_buckets,
-            'streaks': streak_list,
-            'total_streak_rounds': total_streak_rounds,
-            'total_streaks': len(streaks),
-        }), 200
+        return Response(_loss_analytics_body('losing', limit), mimetype='application/json')
     except Exception as e:
         print(f"[❌ 오류] losing-streaks 실패: {str(e)[:200]}")
         return jsonify({'prob_buckets': [], 'streaks': [], 'total_streak_rounds': 0, 'error': str(e)[:200]}), 200
@@ -13449,10 +16101,24 @@ def api_current_pick():
             conn = get_db_connection(statement_timeout_sec=5)
             if not conn:
                 return jsonify(empty_pick), 200
-            ensure_current_pick_table(conn)
-            conn.commit()
+            if not _pick_tables_ready:
+                ensure_current_pick_table(conn)
+                conn.commit()
             out = bet_int.get_current_pick(conn, calculator_id=calculator_id)
             conn.close()
+            # 아직 DB에 반영 안 된 write-behind 값이 있으면 그 값이 최신
+            with _pick_write_lock:
+                pending_w = dict(_pick_write_pending.get(calculator_id) or {})
+            if pending_w.get('current_pick') is not None or pending_w.get('running') is not None:
+                out = dict(out or empty_pick)
+                cp = pending_w.get('current_pick')
+                if cp is not None:
+                    out['pick_color'] = cp.get('pick_color')
+                    out['round'] = cp.get('round_num')
+                    out['probability'] = cp.get('probability')
+                    out['suggested_amount'] = cp.get('suggested_amount')
+                if pending_w.get('running') is not None:
+                    out['running'] = pending_w['running']
             # 목표 달성 등으로 계산기 중지(running=false)면 에뮬레이터에 픽을 보내지 않음 — 픽/회차 비움
             if out and out.get('running') is False:
                 out = dict(out)
@@ -13526,61 +16192,79 @@ def api_current_pick():
                 suggested_amount = 0  # 서버가 멈춤이면 무조건 0 — 에뮬레이터 배팅 스킵
         except Exception:
             pass
-        conn = get_db_connection(statement_timeout_sec=5)
-        if not conn:
+        # 메모리(relay 캐시) 즉시 반영, current_pick DB는 write-behind로 병합 저장
+        try:
+            round_num = int(round_num) if round_num is not None else None
+            probability = float(probability) if probability is not None else None
+            suggested_amount = int(suggested_amount) if suggested_amount is not None else None
+        except (TypeError, ValueError):
             return jsonify({'ok': False}), 200
-        ensure_current_pick_table(conn)
-        conn.commit()
-        ok = bet_int.set_current_pick(conn, pick_color=pick_color, round_num=round_num, probability=probability, suggested_amount=suggested_amount, calculator_id=calculator_id)
-        if ok:
-            conn.commit()
-            pick_pred = (data.get('predicted') or '').strip()
-            pick_pred = pick_pred if pick_pred in ('정', '꺽') else (srv_pred if (srv_pred and srv_pred in ('정', '꺽')) else None)
-            _update_current_pick_relay_cache(calculator_id, round_num, pick_color, suggested_amount, running if running is not None else True, probability, pick_pred)
-            _log_when_changed('current_pick', (calculator_id, pick_color, round_num), lambda v: f"[배팅연동] 계산기{v[0]} 픽 저장: {v[1]} round {v[2]}")
-        if running is not None:
-            if bet_int.set_calculator_running(conn, calculator_id, bool(running)):
-                conn.commit()
-                c = _current_pick_relay_cache.get(calculator_id)
-                if c and isinstance(c, dict):
-                    c['running'] = bool(running)
-        elif pick_color is not None:
-            # 픽 저장 시 자동으로 running=True — 실행 중인 계산기로 복원
-            if bet_int.set_calculator_running(conn, calculator_id, True):
-                conn.commit()
-        conn.close()
-        return jsonify({'ok': ok}), 200
+        pick_pred = (data.get('predicted') or '').strip()
+        pick_pred = pick_pred if pick_pred in ('정', '꺽') else (srv_pred if (srv_pred and srv_pred in ('정', '꺽')) else None)
+        _update_current_pick_relay_cache(calculator_id, round_num, pick_color, suggested_amount, running if running is not None else True, probability, pick_pred)
+        _log_when_changed('current_pick', (calculator_id, pick_color, round_num), lambda v: f"[배팅연동] 계산기{v[0]} 픽 저장: {v[1]} round {v[2]}")
+        # 픽 저장 시 running 미지정이면 자동으로 running=True — 실행 중인 계산기로 복원
+        running_w = bool(running) if running is not None else (True if pick_color is not None else None)
+        _queue_pick_write(calculator_id, current_pick={'pick_color': pick_color, 'round_num': round_num, 'probability': probability, 'suggested_amount': suggested_amount},
+                          running=running_w)
+        return jsonify({'ok': True}), 200
     except Exception as e:
         print(f"[❌ 오류] current-pick 실패: {str(e)[:200]}")
         return jsonify(empty_pick if request.method == 'GET' else {'ok': False}), 200
 
 
-def _relay_db_write_background(calculator_id, pick_color, round_num, suggested_amount, running):
-    """relay POST 시 DB 쓰기를 백그라운드로 수행. 응답 지연 없음."""
-    if not bet_int or not DB_AVAILABLE or not DATABASE_URL:
-        return
-    try:
-        conn = get_db_connection(statement_timeout_sec=3)
-        if conn:
-            try:
-                ensure_current_pick_table(conn)
-                bet_int.set_current_pick(conn, pick_color=pick_color, round_num=round_num,
-                                         suggested_amount=suggested_amount, calculator_id=calculator_id)
-                if running is not None:
-                    bet_int.set_calculator_running(conn, calculator_id, bool(running))
-                conn.commit()
-            finally:
-                try:
-                    conn.close()
-                except Exception:
-                    pass
-    except Exception as e:
-        print(f"[경고] relay DB 백그라운드 저장 실패: {str(e)[:80]}")
+def _relay_pick_for_get(calculator_id):
+    """current-pick-relay GET 본문: relay 캐시 → macro_pick_transmit(콜드스타트) → calc state 1행 순."""
+    empty_pick = {'pick_color': None, 'round': None, 'probability': None, 'suggested_amount': None, 'running': True, 'pick_pred': None}
+    # 캐시 우선 — DB 없이 즉시 반환 (스케줄러 50ms마다 갱신, 금액은 서버 계산값)
+    cached = _current_pick_relay_cache.get(calculator_id)
+    if cached and isinstance(cached, dict):
+        if cached.get('running') is False:
+            return {'round': None, 'pick_color': None, 'suggested_amount': None, 'running': False, 'probability': None, 'pick_pred': None}
+        out = dict(empty_pick)
+        out['round'] = cached.get('round')
+        out['pick_color'] = cached.get('pick_color')
+        amt = cached.get('suggested_amount')
+        out['suggested_amount'] = int(amt) if amt is not None and int(amt) > 0 else None
+        out['running'] = cached.get('running', True)
+        out['probability'] = cached.get('probability')
+        out['pick_pred'] = cached.get('pick_pred')
+        return out
+    # 캐시 없음(콜드스타트): macro_pick_transmit에서 읽어 캐시에 채움 — 이후로는 캐시가 기준
+    row = _read_macro_pick_transmit(calculator_id)
+    if row and _current_pick_relay_cache.get(calculator_id) is None:
+        # 헬퍼 경유 — relay 버전 올려 롱폴 대기자·macro-data 캐시 갱신. DB에서 읽은 값이므로 공유 상태로 되올리지 않음
+        _update_current_pick_relay_cache(calculator_id, row.get('round'), row.get('pick_color'), row.get('suggested_amount'),
+                                         row.get('running', True), None, row.get('pick_pred'), publish=False)
+    if row and row.get('running') is not False:
+        out = dict(empty_pick)
+        out['round'] = row.get('round')
+        out['pick_color'] = row.get('pick_color')
+        amt = row.get('suggested_amount')
+        out['suggested_amount'] = int(amt) if amt is not None and int(amt) > 0 else None
+        out['running'] = row.get('running', True)
+        out['pick_pred'] = row.get('pick_pred')  # DB에 없으면 None
+        return out
+    # 캐시·DB 없음: 서버 calc state에서 배팅중 픽 직접 계산 (예측픽 폴백 방지)
+    state = get_calc_state('default') or {}
+    c = state.get(str(calculator_id)) if isinstance(state.get(str(calculator_id)), dict) else None
+    if c and c.get('running'):
+        pr, srv_pick, server_amt, srv_pred = _get_calc_row1_bundle(c)
+        if pr is not None and srv_pick is not None:
+            out = dict(empty_pick)
+            out['round'] = pr
+            out['pick_color'] = srv_pick
+            out['suggested_amount'] = int(server_amt or 0) if server_amt and int(server_amt) > 0 else None
+            out['running'] = True
+            out['pick_pred'] = srv_pred
+            return out
+    return {'round': None, 'pick_color': None, 'suggested_amount': None, 'running': True, 'probability': None, 'pick_pred': None}
 
 
 @app.route('/api/current-pick-relay', methods=['GET', 'POST'])
 def api_current_pick_relay():
-    """매크로 전용: POST 시 relay 캐시 즉시 갱신. GET은 캐시만 반환. 1행(회차·픽·금액·정꺽) 번들만 사용."""
+    """매크로 전용: POST 시 relay 캐시 즉시 갱신. GET은 캐시만 반환. 1행(회차·픽·금액·정꺽) 번들만 사용.
+    GET ?wait=초&since_version=N: 버전이 N에서 바뀔 때까지 대기(롱폴). 응답 version을 다음 since_version으로."""
     empty_pick = {'pick_color': None, 'round': None, 'probability': None, 'suggested_amount': None, 'running': True, 'pick_pred': None}
     try:
         if request.method == 'POST':
@@ -13596,10 +16280,10 @@ def api_current_pick_relay():
             running = data.get('running')
             # 정지 시: macro_pick_transmit 비우기
             if running is False:
-                _write_macro_pick_transmit(calculator_id, None, None, 0, False)
                 _update_current_pick_relay_cache(calculator_id, None, None, None, False, None, None)
-                threading.Thread(target=_relay_db_write_background, daemon=True,
-                                 args=(calculator_id, None, None, None, False)).start()
+                _write_macro_pick_transmit(calculator_id, None, None, 0, False)
+                _queue_pick_write(calculator_id, current_pick={'pick_color': None, 'round_num': None, 'probability': None, 'suggested_amount': None},
+                                  running=False)
                 return jsonify({'ok': True}), 200
             # 클라이언트(디스플레이) 값 우선 — 단, 마틴 밀림 방지: 서버 금액이 더 크면 서버 값 사용
             try:
@@ -13625,11 +16309,11 @@ def api_current_pick_relay():
                 pc_stored = "RED" if pc in ("RED", "빨강") else ("BLACK" if pc in ("BLACK", "검정") else pick_color)
                 pick_pred = (data.get('predicted') or '').strip()
                 pick_pred = pick_pred if pick_pred in ('정', '꺽') else None
-                _write_macro_pick_transmit(calculator_id, round_num, pc_stored, amt_int, True, pick_pred)
                 _update_current_pick_relay_cache(calculator_id, round_num, pc_stored, amt_int, True, None, pick_pred)
+                _write_macro_pick_transmit(calculator_id, round_num, pc_stored, amt_int, True, pick_pred)
                 if pc_stored is not None:
-                    threading.Thread(target=_relay_db_write_background, daemon=True,
-                                     args=(calculator_id, pc_stored, round_num, amt_int, running if running is not None else True)).start()
+                    _queue_pick_write(calculator_id, current_pick={'pick_color': pc_stored, 'round_num': round_num, 'probability': None, 'suggested_amount': amt_int},
+                                      running=running if running is not None else True)
             else:
                 # round 없음: 서버 1행으로 보정
                 state = get_calc_state('default') or {}
@@ -13638,53 +16322,22 @@ def api_current_pick_relay():
                     pr, srv_pick, server_amt, srv_pred = _get_calc_row1_bundle(c)
                     if pr is not None and srv_pick is not None:
                         amt_int = int(server_amt or 0) if server_amt else 0
-                        _write_macro_pick_transmit(calculator_id, pr, srv_pick, amt_int, True, srv_pred)
                         _update_current_pick_relay_cache(calculator_id, pr, srv_pick, amt_int, True, None, srv_pred)
+                        _write_macro_pick_transmit(calculator_id, pr, srv_pick, amt_int, True, srv_pred)
             return jsonify({'ok': True}), 200
         calculator_id = request.args.get('calculator', '1').strip()
         try:
             calculator_id = int(calculator_id) if calculator_id in ('1', '2', '3') else 1
         except (TypeError, ValueError):
             calculator_id = 1
-        # 캐시 우선 — DB 없이 즉시 반환 (스케줄러 50ms마다 갱신, 금액은 서버 계산값)
-        cached = _current_pick_relay_cache.get(calculator_id)
-        if cached and isinstance(cached, dict):
-            if cached.get('running') is False:
-                return jsonify({'round': None, 'pick_color': None, 'suggested_amount': None, 'running': False, 'probability': None, 'pick_pred': None}), 200
-            out = dict(empty_pick)
-            out['round'] = cached.get('round')
-            out['pick_color'] = cached.get('pick_color')
-            amt = cached.get('suggested_amount')
-            out['suggested_amount'] = int(amt) if amt is not None and int(amt) > 0 else None
-            out['running'] = cached.get('running', True)
-            out['probability'] = cached.get('probability')
-            out['pick_pred'] = cached.get('pick_pred')
-            return jsonify(out), 200
-        # 캐시 없음: macro_pick_transmit에서 읽기
-        row = _read_macro_pick_transmit(calculator_id)
-        if row and row.get('running') is not False:
-            out = dict(empty_pick)
-            out['round'] = row.get('round')
-            out['pick_color'] = row.get('pick_color')
-            amt = row.get('suggested_amount')
-            out['suggested_amount'] = int(amt) if amt is not None and int(amt) > 0 else None
-            out['running'] = row.get('running', True)
-            out['pick_pred'] = row.get('pick_pred')  # DB에 없으면 None
-            return jsonify(out), 200
-        # 캐시·DB 없음: 서버 calc state에서 배팅중 픽 직접 계산 (예측픽 폴백 방지)
-        state = get_calc_state('default') or {}
-        c = state.get(str(calculator_id)) if isinstance(state.get(str(calculator_id)), dict) else None
-        if c and c.get('running'):
-            pr, srv_pick, server_amt, srv_pred = _get_calc_row1_bundle(c)
-            if pr is not None and srv_pick is not None:
-                out = dict(empty_pick)
-                out['round'] = pr
-                out['pick_color'] = srv_pick
-                out['suggested_amount'] = int(server_amt or 0) if server_amt and int(server_amt) > 0 else None
-                out['running'] = True
-                out['pick_pred'] = srv_pred
-                return jsonify(out), 200
-        return jsonify({'round': None, 'pick_color': None, 'suggested_amount': None, 'running': True, 'probability': None, 'pick_pred': None}), 200
+        _shared_pull(f'relay:{calculator_id}')
+        # 롱폴: since_version과 같으면 relay 버전이 바뀔 때까지 대기 후 응답 (매크로 촘촘한 폴링 대체)
+        wait_sec, since = _long_poll_params()
+        if wait_sec:
+            _wait_relay_version(calculator_id, since, wait_sec)
+        out = _relay_pick_for_get(calculator_id)
+        out['version'] = _relay_version[calculator_id]  # 콜드스타트 채움으로 올라간 버전 반영
+        return jsonify(out), 200
     except Exception as e:
         print(f"[경고] current-pick-relay 실패: {str(e)[:100]}")
         return jsonify(empty_pick), 200
@@ -13692,55 +16345,39 @@ def api_current_pick_relay():
 
 @app.route('/api/macro-data', methods=['GET'])
 def api_macro_data():
-    """매크로 전용: 픽 + 결과(round_actuals) + 그래프. ?calculator=1|2|3 이면 해당 계산기 픽 사용."""
+    """매크로 전용: 픽 + 결과(round_actuals) + 그래프. ?calculator=1|2|3 이면 해당 계산기 픽 사용.
+    ?wait=초&since_version=N: 픽 변경·새 회차 결과로 버전이 바뀔 때까지 대기(롱폴)."""
     try:
         calculator_id = request.args.get('calculator', '1')
         try:
             calculator_id = int(calculator_id) if calculator_id in ('1', '2', '3') else 1
         except (TypeError, ValueError):
             calculator_id = 1
-        results = get_recent_results(hours=24)
-        results = _sort_results_newest_first(results) if results else []
-        if len(results) > 50:
-            results = results[:50]
-        round_actuals = _build_round_actuals(results) if results else {}
-        gv = _build_graph_values(results) if results else []
-        # 카드덱용: gameID, joker, color(RED/BLACK)
-        cards = []
-        for r in (results or [])[:30]:
-            c = get_card_color_from_result(r)
-            color = 'RED' if c is True else ('BLACK' if c is False else None)
-            cards.append({
-                'gameID': r.get('gameID'),
-                'joker': _is_joker(r.get('joker')),
-                'color': color,
-            })
-        # 픽: 계산기 배팅중 픽과 동일 출처 — relay 캐시 우선(클라이언트 POST 즉시 반영), DB(macro_pick_transmit) 폴백
-        pick = {'round': None, 'pick_color': None, 'calculator': calculator_id}
-        cached = _current_pick_relay_cache.get(calculator_id)
-        if cached and isinstance(cached, dict) and cached.get('running') is not False and cached.get('round') is not None and cached.get('pick_color'):
-            pick['round'] = cached.get('round')
-            pick['pick_color'] = cached.get('pick_color')
-        else:
-            row = _read_macro_pick_transmit(calculator_id)
-            if row and row.get('running') is not False and row.get('round') is not None and row.get('pick_color'):
-                pick['round'] = row.get('round')
-                pick['pick_color'] = row.get('pick_color')
-        if pick.get('round') is None:
-            state = get_calc_state('default') or {}
-            c = state.get(str(calculator_id)) if isinstance(state.get(str(calculator_id)), dict) else None
-            if c and c.get('running'):
-                pr, srv_pick, _ = _get_calc_row1_bundle(c)
-                if pr is not None and srv_pick is not None:
-                    pick['round'] = pr
-                    pick['pick_color'] = srv_pick
-        # 예측픽(compute_prediction) 폴백 제거 — 매크로는 배팅중 픽만 사용. 예측픽 사용 시 반픽/스마트반픽과 결과 꼬임
-        return jsonify({
-            'pick': pick,
-            'round_actuals': round_actuals,
-            'graph_values': gv,
-            'cards': cards,
-        }), 200
+        _shared_pull(f'relay:{calculator_id}')
+        _shared_pull('results')
+        wait_sec, since = _long_poll_params()
+        version = _wait_relay_version(calculator_id, since, wait_sec) if wait_sec else _relay_version[calculator_id]
+        feed = _macro_feed
+        if feed is None or time.time() - feed.get('checked_at', 0) > MACRO_FEED_MAX_AGE_SEC:
+            # 콜드스타트·스케줄러 정지 시에만 직접 빌드 (동시 요청은 1회 빌드 공유)
+            feed = _single_flight('macro_feed', lambda: _refresh_macro_feed(get_recent_results(hours=24))) or feed
+        if feed is None:
+            raise RuntimeError('macro feed 없음')
+        # 응답 bytes는 (스냅샷, relay 버전)별 1회만 인코딩 — 픽 변경·새 회차 전까지 요청마다 그대로 전송
+        ent = _macro_feed_bodies.get(calculator_id)
+        if ent is None or ent[0] is not feed or ent[1] != version:
+            # 픽: 계산기 배팅중 픽과 동일 출처 — relay 캐시 우선, 콜드스타트 시 macro_pick_transmit·calc state 1행 (캐시 채움)
+            src = _relay_pick_for_get(calculator_id)
+            version = _relay_version[calculator_id]  # 콜드스타트 채움이 버전을 올렸으면 새 버전으로 키잉
+            pick = {'round': None, 'pick_color': None, 'calculator': calculator_id}
+            if src.get('running') is not False and src.get('round') is not None and src.get('pick_color'):
+                pick['round'] = src.get('round')
+                pick['pick_color'] = src.get('pick_color')
+            # 예측픽(compute_prediction) 폴백 제거 — 매크로는 배팅중 픽만 사용. 예측픽 사용 시 반픽/스마트반픽과 결과 꼬임
+            head = app.json.dumps({'pick': pick, 'version': version}, separators=(',', ':')).encode('utf-8')
+            ent = (feed, version, head[:-1] + b',' + feed['fragment'][1:] + b'\n')
+            _macro_feed_bodies[calculator_id] = ent
+        return Response(ent[2], mimetype='application/json')
     except Exception as e:
         print(f"[경고] macro-data 오류: {str(e)[:150]}")
         return jsonify({'pick': {'round': None, 'pick_color': None}, 'round_actuals': {}, 'graph_values': [], 'cards': []}), 200
@@ -13795,14 +16432,179 @@ def api_betting_helper_data():
         return jsonify({'current_pick': {}, 'recent_results': []}), 200
 
 
+# CSV 내보내기: 행을 만들면서 EXPORT_CHUNK_CHARS 단위로 흘려보냄(chunked, Content-Length 없음) — 전체 문자열을 메모리에 쌓지 않는다.
+# DB 행은 서버측(named) 커서로 EXPORT_FETCH_ROWS씩 FETCH. 배치 사이에 소켓 쓰기(eventlet 양보)가 끼어 다른 요청을 오래 막지 않음.
+# ?gzip=1 이고 클라이언트가 gzip을 받으면 압축 스트림(Content-Encoding: gzip). ?limit=all 이면 범위 제한 없음.
+EXPORT_FETCH_ROWS = int(os.getenv('EXPORT_FETCH_ROWS', '500'))
+EXPORT_CHUNK_CHARS = 64 * 1024
+EXPORT_MAX_CONCURRENT = int(os.getenv('EXPORT_MAX_CONCURRENT', '2'))  # 워커당 동시 스트리밍 내보내기 수 (DB 연결 점유 상한)
+_export_active = {'n': 0}
+_export_lock = threading.Lock()
+
+
+def _export_acquire():
+    with _export_lock:
+        if _export_active['n'] >= EXPORT_MAX_CONCURRENT:
+            return False
+        _export_active['n'] += 1
+        return True
+
+
+def _export_release():
+    with _export_lock:
+        _export_active['n'] = max(0, _export_active['n'] - 1)
+
+
+def _export_busy_response():
+    resp = Response('다른 내보내기가 진행 중입니다. 잠시 후 다시 시도하세요.', status=503, mimetype='text/plain')
+    resp.headers['Retry-After'] = '5'
+    return resp
+
+
+def _export_limit_arg(default, max_limit=None):
+    """?limit=N (기본 default). all·0이면 None(전체). 숫자가 아니면 기본값."""
+    raw = (request.args.get('limit') or '').strip().lower()
+    if raw in ('all', '0'):
+        return None
+    try:
+        n = max(1, int(raw)) if raw else default
+    except ValueError:
+        n = default
+    return min(n, max_limit) if max_limit else n
+
+
+def _export_round_args():
+    """?from_round·?to_round (없으면 None)."""
+    out = []
+    for k in ('from_round', 'to_round'):
+        try:
+            out.append(int(request.args[k]) if request.args.get(k) else None)
+        except ValueError:
+            out.append(None)
+    return out[0], out[1]
+
+
+def _export_round_floor(cur, limit, to_round=None):
+    """최신(to_round 이하) limit건의 첫 회차. 행이 limit건보다 적으면 None(하한 없음)."""
+    if not limit:
+        return None
+    cur.execute('''
+        SELECT round_num FROM prediction_history WHERE round_num <= %s
+        ORDER BY round_num DESC OFFSET %s LIMIT 1
+    ''', (to_round if to_round is not None else 2147483647, int(limit) - 1))
+    row = cur.fetchone()
+    return int(row[0]) if row else None
+
+
+def _open_export_cursor(name, query_fn, statement_timeout_sec=15):
+    """동시 내보내기 슬롯 확보 → 연결 → query_fn(일반 커서)이 정한 (sql, params)로 서버측(named) 커서 선언.
+    반환 (conn, cur, None) 또는 (None, None, 오류 응답). 쿼리 오류는 스트리밍 전에 나므로 500으로 응답 가능.
+    statement_timeout은 FETCH 1회마다 적용 — 전체 내보내기 시간에는 상한 없음. 성공 시 _close_export로 반납."""
+    if not _export_acquire():
+        return None, None, _export_busy_response()
+    conn = get_db_connection(statement_timeout_sec=statement_timeout_sec)
+    if not conn:
+        _export_release()
+        return None, None, Response('DB 연결 실패', status=500, mimetype='text/plain')
+    try:
+        plain = conn.cursor()
+        sql, params = query_fn(plain)
+        plain.close()
+        cur = conn.cursor(name=f'{name}_{uuid.uuid4().hex[:8]}', cursor_factory=RealDictCursor)
+        cur.itersize = EXPORT_FETCH_ROWS
+        cur.execute(sql, params)
+        return conn, cur, None
+    except Exception:
+        _close_export(conn)
+        raise
+
+
+def _close_export(conn):
+    """연결 반납 + 동시 수 해제 (응답 종료·끊김 시 1회)."""
+    try:
+        if not conn.closed:
+            conn.rollback()
+        conn.close()
+    except Exception:
+        pass
+    _export_release()
+
+
+def _iter_export_cursor(cur):
+    """EXPORT_FETCH_ROWS씩 FETCH해 행 단위로 yield (메모리에는 배치 1개만)."""
+    while True:
+        batch = cur.fetchmany(EXPORT_FETCH_ROWS)
+        if not batch:
+            return
+        for r in batch:
+            yield r
+
+
+def _csv_stream_response(rows, filename, bom=False, on_close=None):
+    """CSV 행 iterable → 스트리밍 응답. 요청 컨텍스트는 스트림 끝까지 유지(stream_with_context).
+    on_close는 스트림을 끝까지 읽지 않고 끊겨도 호출(연결 반납·동시 수 해제)."""
+    import csv
+    from io import StringIO
+    from flask import stream_with_context
+    use_gzip = (request.args.get('gzip') or '').lower() in ('1', 'true') and 'gzip' in (request.headers.get('Accept-Encoding') or '').lower()
+    label = request.endpoint
+
+    def generate():
+        buf = StringIO()
+        w = csv.writer(buf)
+        z = zlib.compressobj(6, zlib.DEFLATED, 31) if use_gzip else None  # wbits 31 = gzip 헤더
+        if bom:
+            buf.write('\ufeff')
+
+        def take():
+            data = buf.getvalue().encode('utf-8')
+            buf.seek(0)
+            buf.truncate()
+            return z.compress(data) if z else data
+
+        try:
+            for row in rows:
+                w.writerow(row)
+                if buf.tell() >= EXPORT_CHUNK_CHARS:
+                    chunk = take()
+                    if chunk:
+                        yield chunk
+        except Exception as e:
+            # 헤더는 이미 나갔으므로 상태 코드 대신 마지막 줄로 중단을 알림
+            print(f"[API] {label} 스트리밍 중단: {str(e)[:200]}")
+            w.writerow(['# 오류: 내보내기 중단 — ' + str(e)[:200]])
+        tail = take()
+        if z:
+            tail += z.flush()
+        if tail:
+            yield tail
+
+    resp = Response(stream_with_context(generate()), mimetype='text/csv; charset=utf-8-sig')
+    resp.headers['Content-Disposition'] = 'attachment; filename=' + filename
+    resp.headers['Cache-Control'] = 'no-store'
+    resp.headers['X-Accel-Buffering'] = 'no'  # 프록시가 전체를 모아 보내지 않도록
+    resp.headers['Vary'] = 'Accept-Encoding'
+    if use_gzip:
+        resp.headers['Content-Encoding'] = 'gzip'
+    if on_close is not None:
+        resp.call_on_close(on_close)
+    return resp
+
+
+def _export_outcome(pred, act, joker_label):
+    """내보내기용 승패 표기 (정/꺽 비교, 조커·미확정 처리)."""
+    if act in ('joker', '조커'):
+        return joker_label
+    if pred in ('정', '꺽') and act in ('정', '꺽'):
+        return '승' if pred == act else '패'
+    return ('승' if pred == act else '패') if act else '—'
+
+
 @app.route('/api/betting-history-export', methods=['GET'])
 def api_betting_history_export():
-    """배팅 이력 CSV 다운로드 (회차·예측·실제·승패·배팅금액). Excel에서 열어 금액 검증용."""
+    """배팅 이력 CSV 다운로드 (회차·예측·실제·승패·배팅금액). Excel에서 열어 금액 검증용.
+    ?limit=N (기본 500, all=전체), ?from_round·?to_round, ?gzip=1. 서버측 커서로 스트리밍."""
     try:
-        import csv
-        from io import StringIO
-        from flask import Response
-        ph = get_prediction_history(limit=500)
         calc_by_round = {}
         state = get_calc_state('default')
         if state and isinstance(state.get('1'), dict):
@@ -13815,35 +16617,33 @@ def api_betting_history_export():
                         calc_by_round[rn] = int(amt)
                     elif h.get('no_bet'):
                         calc_by_round[rn] = 0
-        rows = [['회차', '예측픽', '실제결과', '결과(승/패/조커)', '배팅금액']]
-        for h in (ph or []):
-            if not h or not isinstance(h, dict):
-                continue
-            rnd = h.get('round')
-            pred = h.get('predicted') or ''
-            act = str(h.get('actual') or '').strip()
-            if rnd is None:
-                continue
-            if act in ('joker', '조커'):
-                result = '조커'
-            elif pred in ('정', '꺽') and act in ('정', '꺽'):
-                result = '승' if pred == act else '패'
-            else:
-                result = '조커' if act in ('joker', '조커') else ('승' if pred == act else '패') if act else '—'
-            amt = calc_by_round.get(rnd, '')
-            if amt == '':
-                amt = ''
-            rows.append([rnd, pred, act, result, amt])
-        si = StringIO()
-        w = csv.writer(si)
-        for r in rows:
-            w.writerow(r)
-        resp = Response(si.getvalue(), mimetype='text/csv; charset=utf-8-sig')
-        resp.headers['Content-Disposition'] = 'attachment; filename=betting_history.csv'
-        return resp
+        header = ['회차', '예측픽', '실제결과', '결과(승/패/조커)', '배팅금액']
+        if not DB_AVAILABLE or not DATABASE_URL:
+            return _csv_stream_response([header], 'betting_history.csv')
+        limit = _export_limit_arg(500)
+        from_round, to_round = _export_round_args()
+
+        def query(plain):
+            floor = _export_round_floor(plain, limit, to_round)
+            lo = max(v for v in (from_round, floor, 0) if v is not None)
+            return ('SELECT round_num, predicted, actual FROM prediction_history '
+                    'WHERE round_num >= %s AND round_num <= %s ORDER BY round_num ASC',
+                    (lo, to_round if to_round is not None else 2147483647))
+        conn, cur, err = _open_export_cursor('export_betting', query)
+        if err is not None:
+            return err
+
+        def rows():
+            yield header
+            for r in _iter_export_cursor(cur):
+                rnd = r['round_num']
+                pred = r.get('predicted') or ''
+                act = str(r.get('actual') or '').strip()
+                yield [rnd, pred, act, _export_outcome(pred, act, '조커'), calc_by_round.get(rnd, '')]
+
+        return _csv_stream_response(rows(), 'betting_history.csv', on_close=lambda: _close_export(conn))
     except Exception as e:
         print(f"[API] betting-history-export 오류: {str(e)[:150]}")
-        from flask import Response
         return Response('오류 발생', status=500, mimetype='text/plain')
 
 
@@ -13862,74 +16662,70 @@ GRAPH_ANALYSIS_CSV_PROMPT = [
 ]
 
 
+GRAPH_ANALYSIS_CSV_HEADER = ['회차', '픽', '실제', '승패', '경고승률', '줄개수', '퐁당개수', '구간', '덩어리유형', '덩어리모양', '줄run', '퐁당run', '줄%', '퐁당%', '높이', '세그먼트']
+
+
+def _graph_analysis_cells(ga):
+    """prediction_details.graph_analysis → CSV 11칸 (없으면 '-')."""
+    if not isinstance(ga, dict) or not ga:
+        return ['-'] * 11
+    return [
+        ga.get('line_cnt', '-'), ga.get('pong_cnt', '-'),
+        ga.get('phase', '-'), ga.get('chunk_type', '-'), ga.get('chunk_shape', '-'),
+        ga.get('line_runs', '-'), ga.get('pong_runs', '-'),
+        str(ga.get('line_pct', '-')), str(ga.get('pong_pct', '-')),
+        ga.get('h', '-'), ga.get('seg', '-'),
+    ]
+
+
+def _graph_analysis_value(ga):
+    """DB에서 온 graph_analysis (jsonb는 dict로, 텍스트면 파싱)."""
+    if isinstance(ga, str):
+        try:
+            ga = json.loads(ga)
+        except Exception:
+            return None
+    return ga if isinstance(ga, dict) else None
+
+
 @app.route('/api/export-graph-analysis', methods=['GET'])
 def api_export_graph_analysis():
-    """AI분석용 그래프 패턴 CSV 다운로드. 회차·픽·결과·승패 + 줄개수·퐁당개수·구간·덩어리유형·높이·세그먼트. 상단에 분석지시 프롬프트 포함."""
+    """AI분석용 그래프 패턴 CSV 다운로드. 회차·픽·결과·승패 + 줄개수·퐁당개수·구간·덩어리유형·높이·세그먼트. 상단에 분석지시 프롬프트 포함.
+    ?limit=N (기본 2000, all=전체), ?from_round·?to_round, ?gzip=1. prediction_details는 graph_analysis만 DB에서 잘라 서버측 커서로 스트리밍."""
     try:
-        import csv
-        from io import StringIO
-        from flask import Response
         if not DB_AVAILABLE or not DATABASE_URL:
             return Response('DB 없음', status=500, mimetype='text/plain')
-        conn = get_db_connection(statement_timeout_sec=10)
-        if not conn:
-            return Response('DB 연결 실패', status=500, mimetype='text/plain')
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute('''
-            SELECT round_num, predicted, actual, probability, blended_win_rate, prediction_details
-            FROM prediction_history
-            ORDER BY round_num DESC
-            LIMIT 2000
-        ''')
-        rows = cur.fetchall()
-        cur.close()
-        conn.close()
-        header = ['회차', '픽', '실제', '승패', '경고승률', '줄개수', '퐁당개수', '구간', '덩어리유형', '덩어리모양', '줄run', '퐁당run', '줄%', '퐁당%', '높이', '세그먼트']
-        out_rows = [header]
-        for r in reversed(rows):
-            rnd = r.get('round_num')
-            pred = r.get('predicted') or ''
-            act = str(r.get('actual') or '').strip()
-            if act == 'joker':
-                outcome = '조'
-            elif pred in ('정', '꺽') and act in ('정', '꺽'):
-                outcome = '승' if pred == act else '패'
-            else:
-                outcome = '조' if act == 'joker' else ('승' if pred == act else '패') if act else '—'
-            blended = r.get('blended_win_rate')
-            blended_str = (str(round(blended, 1)) + '%') if blended is not None else '-'
-            ga = None
-            pd = r.get('prediction_details')
-            if pd:
-                if isinstance(pd, str):
-                    try:
-                        pd = json.loads(pd)
-                    except Exception:
-                        pd = {}
-                ga = (pd or {}).get('graph_analysis') if isinstance(pd, dict) else None
-            if ga:
-                out_rows.append([
-                    rnd, pred, act, outcome, blended_str,
-                    ga.get('line_cnt', '-'), ga.get('pong_cnt', '-'),
-                    ga.get('phase', '-'), ga.get('chunk_type', '-'), ga.get('chunk_shape', '-'),
-                    ga.get('line_runs', '-'), ga.get('pong_runs', '-'),
-                    str(ga.get('line_pct', '-')), str(ga.get('pong_pct', '-')),
-                    ga.get('h', '-'), ga.get('seg', '-')
-                ])
-            else:
-                out_rows.append([rnd, pred, act, outcome, blended_str, '-', '-', '-', '-', '-', '-', '-', '-', '-', '-', '-'])
-        si = StringIO()
-        w = csv.writer(si)
-        for line in GRAPH_ANALYSIS_CSV_PROMPT:
-            w.writerow([line])
-        for row in out_rows:
-            w.writerow(row)
-        resp = Response('\ufeff' + si.getvalue(), mimetype='text/csv; charset=utf-8-sig')
-        resp.headers['Content-Disposition'] = 'attachment; filename=graph_analysis_' + datetime.now().strftime('%Y-%m-%d') + '.csv'
-        return resp
+        limit = _export_limit_arg(2000)
+        from_round, to_round = _export_round_args()
+
+        def query(plain):
+            floor = _export_round_floor(plain, limit, to_round)
+            lo = max(v for v in (from_round, floor, 0) if v is not None)
+            return ('''
+                SELECT round_num, predicted, actual, blended_win_rate, prediction_details->'graph_analysis' AS ga
+                FROM prediction_history
+                WHERE round_num >= %s AND round_num <= %s
+                ORDER BY round_num ASC
+            ''', (lo, to_round if to_round is not None else 2147483647))
+        conn, cur, err = _open_export_cursor('export_graph', query)
+        if err is not None:
+            return err
+
+        def rows():
+            for line in GRAPH_ANALYSIS_CSV_PROMPT:
+                yield [line]
+            yield GRAPH_ANALYSIS_CSV_HEADER
+            for r in _iter_export_cursor(cur):
+                pred = r.get('predicted') or ''
+                act = str(r.get('actual') or '').strip()
+                blended = r.get('blended_win_rate')
+                blended_str = (str(round(blended, 1)) + '%') if blended is not None else '-'
+                yield [r.get('round_num'), pred, act, _export_outcome(pred, act, '조'), blended_str] + _graph_analysis_cells(_graph_analysis_value(r.get('ga')))
+
+        return _csv_stream_response(rows(), 'graph_analysis_' + datetime.now().strftime('%Y-%m-%d') + '.csv',
+                                    bom=True, on_close=lambda: _close_export(conn))
     except Exception as e:
         print(f"[API] export-graph-analysis 오류: {str(e)[:200]}")
-        from flask import Response
         return Response('오류: ' + str(e)[:200], status=500, mimetype='text/plain')
 
 
@@ -13974,11 +16770,9 @@ def _build_calc_options_header(calc_state):
 
 @app.route('/api/export-calc-history', methods=['GET'])
 def api_export_calc_history():
-    """계산기 히스토리 CSV 다운로드. 그래프 CSV와 동일 형식 + 배팅금액·수익. 상단에 사용 옵션 기록."""
+    """계산기 히스토리 CSV 다운로드. 그래프 CSV와 동일 형식 + 배팅금액·수익. 상단에 사용 옵션 기록.
+    전체 히스토리의 graph_analysis를 서버측 커서로 회차 순 병합하며 스트리밍 (?gzip=1 지원)."""
     try:
-        import csv
-        from io import StringIO
-        from flask import Response
         session_id = request.args.get('session_id') or 'default'
         calculator = request.args.get('calculator', '1')
         if calculator not in ('1', '2', '3'):
@@ -14003,83 +16797,51 @@ def api_export_calc_history():
             if rn_int not in by_round:
                 by_round[rn_int] = h
         sorted_rounds = sorted(by_round.keys())
-        ph_by_round = {}
+        conn = cur = None
         if DB_AVAILABLE and DATABASE_URL and sorted_rounds:
-            conn = get_db_connection(statement_timeout_sec=10)
-            if conn:
-                try:
-                    cur = conn.cursor(cursor_factory=RealDictCursor)
-                    placeholders = ','.join(['%s'] * min(len(sorted_rounds), 500))
-                    cur.execute(
-                        f'SELECT round_num, blended_win_rate, prediction_details FROM prediction_history WHERE round_num IN ({placeholders})',
-                        tuple(sorted_rounds[:500])
-                    )
-                    for row in cur.fetchall():
-                        ph_by_round[row['round_num']] = row
-                    cur.close()
-                finally:
-                    try:
-                        conn.close()
-                    except Exception:
-                        pass
-        header = ['회차', '픽', '실제', '승패', '경고승률', '줄개수', '퐁당개수', '구간', '덩어리유형', '덩어리모양', '줄run', '퐁당run', '줄%', '퐁당%', '높이', '세그먼트', '배팅금액', '수익']
-        out_rows = [header]
-        for rnd in sorted_rounds:
-            h = by_round[rnd]
-            pred = h.get('predicted') or ''
-            act = str(h.get('actual') or '').strip()
-            if act == 'joker':
-                outcome = '조'
-            elif pred in ('정', '꺽') and act in ('정', '꺽'):
-                outcome = '승' if pred == act else '패'
-            else:
-                outcome = '조' if act == 'joker' else ('승' if pred == act else '패') if act else '—'
-            wr = h.get('warningWinRate')
-            blended_str = (str(round(float(wr), 1)) + '%') if wr is not None and not isinstance(wr, str) else '-'
-            ph_row = ph_by_round.get(rnd)
-            if ph_row and blended_str == '-':
-                b = ph_row.get('blended_win_rate')
-                blended_str = (str(round(b, 1)) + '%') if b is not None else '-'
-            ga = None
-            if ph_row:
-                pd = ph_row.get('prediction_details')
-                if pd:
-                    if isinstance(pd, str):
-                        try:
-                            pd = json.loads(pd)
-                        except Exception:
-                            pd = {}
-                    ga = (pd or {}).get('graph_analysis') if isinstance(pd, dict) else None
-            bet_amt = h.get('betAmount')
-            bet_str = str(int(bet_amt)) if bet_amt is not None and not isinstance(bet_amt, str) and not (isinstance(bet_amt, bool)) else (str(bet_amt) if bet_amt is not None else '-')
-            prof = h.get('profit')
-            prof_str = str(int(prof)) if prof is not None and not isinstance(prof, str) and not (isinstance(prof, bool)) else (str(prof) if prof is not None else '-')
-            if ga:
-                out_rows.append([
-                    rnd, pred, act, outcome, blended_str,
-                    ga.get('line_cnt', '-'), ga.get('pong_cnt', '-'),
-                    ga.get('phase', '-'), ga.get('chunk_type', '-'), ga.get('chunk_shape', '-'),
-                    ga.get('line_runs', '-'), ga.get('pong_runs', '-'),
-                    str(ga.get('line_pct', '-')), str(ga.get('pong_pct', '-')),
-                    ga.get('h', '-'), ga.get('seg', '-'),
-                    bet_str, prof_str
-                ])
-            else:
-                out_rows.append([rnd, pred, act, outcome, blended_str, '-', '-', '-', '-', '-', '-', '-', '-', '-', '-', '-', bet_str, prof_str])
-        si = StringIO()
-        w = csv.writer(si)
-        for line in _build_calc_options_header(c):
-            w.writerow([line])
-        for line in GRAPH_ANALYSIS_CSV_PROMPT:
-            w.writerow([line])
-        for row in out_rows:
-            w.writerow(row)
-        resp = Response('\ufeff' + si.getvalue(), mimetype='text/csv; charset=utf-8-sig')
-        resp.headers['Content-Disposition'] = 'attachment; filename=calc_' + calculator + '_history_' + datetime.now().strftime('%Y-%m-%d') + '.csv'
-        return resp
+            conn, cur, err = _open_export_cursor('export_calc', lambda plain: ('''
+                SELECT round_num, blended_win_rate, prediction_details->'graph_analysis' AS ga
+                FROM prediction_history WHERE round_num = ANY(%s) ORDER BY round_num ASC
+            ''', (sorted_rounds,)))
+            if err is not None and err.status_code == 503:
+                return err  # DB 연결 실패면 graph_analysis 없이 내보냄
+        header = GRAPH_ANALYSIS_CSV_HEADER + ['배팅금액', '수익']
+
+        def ph_rows():
+            """회차 오름차순 prediction_history 행을 sorted_rounds에 맞춰 하나씩 (없는 회차는 None)."""
+            it = _iter_export_cursor(cur) if cur is not None else iter(())
+            nxt = next(it, None)
+            for rnd in sorted_rounds:
+                while nxt is not None and nxt['round_num'] < rnd:
+                    nxt = next(it, None)
+                yield nxt if nxt is not None and nxt['round_num'] == rnd else None
+
+        def rows():
+            for line in _build_calc_options_header(c):
+                yield [line]
+            for line in GRAPH_ANALYSIS_CSV_PROMPT:
+                yield [line]
+            yield header
+            for rnd, ph_row in zip(sorted_rounds, ph_rows()):
+                h = by_round[rnd]
+                pred = h.get('predicted') or ''
+                act = str(h.get('actual') or '').strip()
+                wr = h.get('warningWinRate')
+                blended_str = (str(round(float(wr), 1)) + '%') if wr is not None and not isinstance(wr, str) else '-'
+                if ph_row and blended_str == '-':
+                    b = ph_row.get('blended_win_rate')
+                    blended_str = (str(round(b, 1)) + '%') if b is not None else '-'
+                ga = _graph_analysis_value(ph_row.get('ga')) if ph_row else None
+                bet_amt = h.get('betAmount')
+                bet_str = str(int(bet_amt)) if bet_amt is not None and not isinstance(bet_amt, str) and not (isinstance(bet_amt, bool)) else (str(bet_amt) if bet_amt is not None else '-')
+                prof = h.get('profit')
+                prof_str = str(int(prof)) if prof is not None and not isinstance(prof, str) and not (isinstance(prof, bool)) else (str(prof) if prof is not None else '-')
+                yield [rnd, pred, act, _export_outcome(pred, act, '조'), blended_str] + _graph_analysis_cells(ga) + [bet_str, prof_str]
+
+        return _csv_stream_response(rows(), 'calc_' + calculator + '_history_' + datetime.now().strftime('%Y-%m-%d') + '.csv',
+                                    bom=True, on_close=(lambda: _close_export(conn)) if conn is not None else None)
     except Exception as e:
         print(f"[API] export-calc-history 오류: {str(e)[:200]}")
-        from flask import Response
         return Response('오류: ' + str(e)[:200], status=500, mimetype='text/plain')
 
 
@@ -14144,11 +16906,32 @@ def get_current_status():
             'server_time': int(time.time())
         }), 200
 
+# 연승 데이터(bet_result_log.csv)도 외부 fetch라 백그라운드에서만 갱신 — 핸들러는 streaks_cache를 읽고 오래됐으면 갱신 예약
+STREAKS_CACHE_TTL_SEC = float(os.getenv('STREAKS_CACHE_TTL_SEC', '10'))
+_streaks_cached_at = 0.0
+
+
+def _refresh_streaks_background():
+    global streaks_cache, _streaks_cached_at
+    data = load_streaks_data()
+    if data is not None:
+        streaks_cache = data
+        _streaks_cached_at = time.time()
+    return data
+
+
+def _get_streaks_cached():
+    """캐시된 연승 데이터(없으면 None). TTL 지났거나 비어 있으면 백그라운드 갱신 예약."""
+    if streaks_cache is None or (time.time() - _streaks_cached_at) >= STREAKS_CACHE_TTL_SEC:
+        _bg_submit('refresh_streaks', _refresh_streaks_background)
+    return streaks_cache
+
+
 @app.route('/api/streaks', methods=['GET'])
 def get_streaks():
     """연승 데이터"""
     try:
-        data = load_streaks_data()
+        data = _get_streaks_cached()
         if data:
             return jsonify(data), 200
         else:
@@ -14168,7 +16951,7 @@ def get_streaks():
 @app.route('/api/streaks/<user_id>', methods=['GET'])
 def get_user_streak(user_id):
     """특정 유저 연승"""
-    streaks_data = load_streaks_data()
+    streaks_data = _get_streaks_cached()
     if not streaks_data:
         return jsonify({'error': '연승 데이터 로드 실패'}), 500
     
@@ -14192,65 +16975,178 @@ def get_user_streak(user_id):
 
 @app.route('/api/refresh', methods=['POST'])
 def refresh_data():
-    """데이터 갱신 (스레드+타임아웃으로 먹통 방지)"""
-    global game_data_cache, streaks_cache, results_cache, last_update_time
-    
-    ref = [None, None, None]
-    def _do_refresh():
-        try:
-            ref[0] = load_game_data()
-            ref[1] = load_streaks_data()
-            ref[2] = load_results_data()
-        except Exception as e:
-            print(f"[api/refresh] 오류: {str(e)[:150]}")
-    t = threading.Thread(target=_do_refresh, daemon=True)
-    t.start()
-    t.join(timeout=15)
-    
-    game_data, streaks_data, results_data = ref[0], ref[1], ref[2]
+    """데이터 갱신. 게임 데이터는 로컬이라 즉시, 결과·연승은 외부 fetch라 백그라운드 갱신만 예약(요청 안에서 기다리지 않음)."""
+    global game_data_cache, last_update_time
+    game_data = None
+    try:
+        game_data = load_game_data()
+    except Exception as e:
+        print(f"[api/refresh] 오류: {str(e)[:150]}")
     if game_data is not None:
         game_data_cache = game_data
-    if streaks_data is not None:
-        streaks_cache = streaks_data
-    if results_data is not None:
-        # 전체 구조(blended_win_rate 등) 포함해 캐시 갱신
-        payload = _build_results_payload()
-        if payload is not None:
-            results_cache = payload
-        else:
-            # 폴백: 최소 구조 + blended_win_rate + round_actuals (100회 승률방향용 300건)
-            ph = get_prediction_history(300)
-            ph = _backfill_shape_predicted_in_ph(ph, results_data or [])
-            blended = _blended_win_rate(ph)
-            round_actuals = _build_round_actuals(results_data) if results_data else {}
-            results_cache = {
-                'results': results_data,
-                'count': len(results_data),
-                'timestamp': datetime.now().isoformat(),
-                'prediction_history': ph,
-                'server_prediction': {'value': None, 'round': 0, 'prob': 0, 'color': None, 'warning_u35': False, 'pong_chunk_phase': None, 'pong_chunk_debug': {}},
-                'blended_win_rate': round(blended, 1) if blended is not None else None,
-                'round_actuals': round_actuals
-            }
-    if game_data is not None or streaks_data is not None or results_data is not None:
         last_update_time = time.time() * 1000
+    results_queued = _bg_submit('refresh_results', _refresh_results_background)
+    _bg_submit('refresh_streaks', _refresh_streaks_background)
 
     return jsonify({
         'success': True,
         'gameData': game_data is not None,
-        'streaksData': streaks_data is not None,
-        'resultsData': results_data is not None,
+        'streaksData': streaks_cache is not None,
+        'resultsData': bool(results_cache and results_cache.get('results')),
+        'resultsRefreshQueued': bool(results_queued),
         'timestamp': datetime.now().isoformat()
     })
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """헬스 체크 - Railway 헬스체크용 (외부 API 호출 없음)"""
-    # Railway 헬스체크를 위해 즉시 응답 (외부 API 호출 없음)
-    return jsonify({
+# 기동 워밍업: 고정 대기(예전 DB 초기화 5초·스케줄러 5초) 없이 DB 초기화 직후 최근 결과·예측 이력 꼬리·계산기 세션·relay 행·
+# 모양/덩어리 통계를 병렬로 한 번에 읽고, 그 결과로 apply 1회(예측픽·계산기·relay·results_cache)를 돌린 뒤 스케줄러 시작.
+# 외부 result.json fetch도 같은 단계에서 병렬로 — 요청 핸들러는 외부 fetch를 하지 않음.
+# 준비 여부는 /health(ready 필드, 항상 200 — 라이브니스)와 /health/ready(준비 전 503 — 레디니스)로 노출.
+STARTUP_WARMUP_TIMEOUT_SEC = float(os.getenv('STARTUP_WARMUP_TIMEOUT_SEC', '8'))
+APP_BACKGROUND_START = os.getenv('APP_BACKGROUND_START', '1') != '0'  # 0이면 워밍업·스케줄러 시작 안 함 (벤치마크 등 import 전용)
+_warmup_state = {'phase': 'pending', 'started_at': None, 'finished_at': None, 'duration_ms': None, 'steps': {}}
+_ready_at = None
+
+
+def _warmup_step(name, fn, *args):
+    """워밍업 단계 1개 실행·소요 시간 기록. 실패해도 예외를 올리지 않고 None."""
+    t0 = time.time()
+    try:
+        out = fn(*args)
+        size = len(out) if isinstance(out, (list, dict)) else (out if isinstance(out, (int, bool)) else None)
+        _warmup_state['steps'][name] = {'ok': True, 'ms': round((time.time() - t0) * 1000, 1), 'size': size}
+        return out
+    except Exception as e:
+        _warmup_state['steps'][name] = {'ok': False, 'ms': round((time.time() - t0) * 1000, 1), 'error': str(e)[:120]}
+        return None
+
+
+def _warm_relay_rows():
+    """macro_pick_transmit 3행을 한 쿼리로 읽어 비어 있는 relay 캐시를 채움 (계산기별 콜드스타트 조회 생략)."""
+    if not DB_AVAILABLE or not DATABASE_URL:
+        return 0
+    conn = get_db_connection(statement_timeout_sec=3)
+    if not conn:
+        return 0
+    try:
+        cur = conn.cursor()
+        cur.execute('SELECT calculator_id, round_num, pick_color, suggested_amount, running, pick_pred FROM macro_pick_transmit')
+        rows = cur.fetchall()
+        cur.close()
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+    n = 0
+    for cid, rn, color, amt, running, pred in rows or []:
+        if cid in (1, 2, 3) and _current_pick_relay_cache.get(cid) is None:
+            # 헬퍼 경유 — relay 버전 올려 롱폴 대기자 깨움. DB에서 읽은 값이므로 공유 상태로 되올리지 않음
+            _update_current_pick_relay_cache(cid, rn, color, amt, running, None, pred, publish=False)
+            n += 1
+    return n
+
+
+def _caches_warm():
+    """화면·매크로가 바로 올바른 픽을 받을 수 있는 상태: results_cache 채워짐 + (DB 모드) 예측픽 캐시 채워짐."""
+    if not (results_cache and results_cache.get('results')):
+        return False
+    if DB_AVAILABLE and DATABASE_URL and prediction_cache is None:
+        return False
+    return True
+
+
+def _is_ready():
+    global _ready_at
+    if _ready_at is not None:
+        return True
+    if _warmup_state['phase'] != 'done' or not _caches_warm():
+        return False
+    _ready_at = time.time()
+    return True
+
+
+def _startup_warmup():
+    t0 = time.time()
+    _warmup_state['phase'] = 'running'
+    _warmup_state['started_at'] = datetime.now().isoformat()
+    try:
+        db_ok = bool(DB_AVAILABLE and DATABASE_URL) and bool(_warmup_step('db_init', _run_db_init))
+        # 다중 워커: 리더만 피드 수집·apply, 팔로워는 리더가 올린 공유 스냅샷으로 캐시를 채움
+        leader = _warmup_step('leader', _leader_check) if (db_ok and _leader_election_enabled) else _leader_state['leader']
+        with ThreadPoolExecutor(max_workers=6, thread_name_prefix='warmup') as ex:
+            # 외부 fetch(→DB 저장·results_cache·apply)는 DB 읽기와 겹쳐서 진행
+            f_feed = ex.submit(_warmup_step, 'feed_refresh', _refresh_results_background)
+            ex.submit(_warmup_step, 'streaks', _refresh_streaks_background)
+            results = None
+            if db_ok:
+                if leader and GAME_RESULTS_PARTITIONED:
+                    _warmup_step('game_partitions', _maintain_game_partitions)  # 하한 프루닝용 현황을 먼저 채움
+                f_results = ex.submit(_warmup_step, 'recent_results', get_recent_results, 24)
+                ex.submit(_warmup_step, 'prediction_history', get_prediction_history, 300)
+                ex.submit(_warmup_step, 'calc_sessions', _get_all_calc_states)
+                ex.submit(_warmup_step, 'relay_rows', _warm_relay_rows)
+                results = f_results.result()
+                if not leader:
+                    _warmup_step('snapshot_sync', _state_sync_tick)
+                elif results and len(results) >= 16:
+                    # 모양/덩어리 통계 조회 경로(인덱스·버퍼) 예열 — 첫 예측 계산이 찬 캐시에서 시작하지 않게
+                    ex.submit(_warmup_step, 'shape_stats', _get_shape_stats_for_results, results)
+                    ex.submit(_warmup_step, 'chunk_stats', _get_chunk_stats_for_results, results)
+                    # 읽어 둔 결과로 apply 1회 — 피드 갱신 쪽 apply가 락을 잡고 있으면 그쪽이 같은 일을 함
+                    _warmup_step('apply', _scheduler_apply_results, results)
+            if not leader and _shared_cache is not None:
+                _warmup_step('shared_sync', _shared_sync_tick)  # 같은 호스트 리더가 이미 쓴 공유 메모리 캐시
+            if not _caches_warm():
+                try:
+                    f_feed.result(timeout=STARTUP_WARMUP_TIMEOUT_SEC)
+                except Exception:
+                    pass
+                if db_ok and not _caches_warm():
+                    _warmup_step('apply_retry', _scheduler_apply_results if leader else _state_sync_tick)
+    except Exception as e:
+        print(f"[❌ 오류] 기동 워밍업 실패: {str(e)[:150]}")
+    finally:
+        _warmup_state['phase'] = 'done'
+        _warmup_state['finished_at'] = datetime.now().isoformat()
+        _warmup_state['duration_ms'] = round((time.time() - t0) * 1000, 1)
+        if SCHEDULER_AVAILABLE:
+            try:
+                _scheduler.start()
+                _set_leader_jobs(_leader_state['leader'])
+                print("[✅] 결과 수집 스케줄러 시작 (fetch 0.1초, apply 0.1초 — 10초 게임 8초 내 배팅)"
+                      + ('' if not _leader_election_enabled else f" — {'리더' if _leader_state['leader'] else '팔로워'} (워커 {WEB_CONCURRENCY})"))
+            except Exception as e:
+                print(f"[❌ 오류] 스케줄러 시작 실패: {str(e)[:100]}")
+        print(f"[✅] 기동 워밍업 {_warmup_state['duration_ms']:.0f}ms — 캐시 {'준비됨' if _is_ready() else '미완료(스케줄러가 채우면 준비)'}")
+
+
+def _health_payload():
+    ready = _is_ready()
+    return {
         'status': 'ok',
+        'ready': ready,
+        'ready_at': datetime.fromtimestamp(_ready_at).isoformat() if _ready_at else None,
+        'warmup': {'phase': _warmup_state['phase'], 'duration_ms': _warmup_state['duration_ms'], 'steps': _warmup_state['steps']},
+        'scheduler': _leader_snapshot(),
         'timestamp': datetime.now().isoformat()
-    }), 200
+    }
+
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """헬스 체크 - Railway 헬스체크용 (외부 API 호출 없음). 라이브니스라 항상 200, 캐시 준비 여부는 ready 필드"""
+    return jsonify(_health_payload()), 200
+
+
+@app.route('/health/ready', methods=['GET'])
+def health_ready():
+    """레디니스: 워밍업이 끝나고 결과·예측픽 캐시가 찬 뒤에만 200, 그 전에는 503"""
+    body = _health_payload()
+    resp = jsonify(body)
+    if not body['ready']:
+        resp.status_code = 503
+        resp.headers['Retry-After'] = '1'
+    return resp
 
 @app.route('/', methods=['GET'])
 def index():
@@ -14352,7 +17248,9 @@ def debug_db_status():
                     'total_count': color_matches_row[0],
                     'unique_count': color_matches_row[1],
                     'recent_samples': recent_matches
-                }
+                },
+                'partitions': dict(_game_partition_state, enabled=GAME_RESULTS_PARTITIONED,
+                                   rounds_per_partition=GAME_RESULTS_PARTITION_ROUNDS, retention_hours=GAME_RESULTS_RETENTION_HOURS)
             })
             
             cur.close()
@@ -14391,12 +17289,68 @@ def debug_init_db():
             'traceback': traceback.format_exc()[:500]
         }), 500
 
+@app.route('/api/debug/bg-tasks', methods=['GET'])
+def debug_bg_tasks():
+    """백그라운드 실행기 상태 (대기열 깊이·작업 종류별 병합/거절 수·대기/실행 지연)"""
+    return jsonify(_bg_task_snapshot()), 200
+
+@app.route('/api/debug/perf', methods=['GET'])
+def debug_perf():
+    """구간별 지연 히스토그램 (count·mean·p50/p95/p99·max·최근 초당 건수). ?prefix=http_ 필터, ?reset=1 초기화"""
+    labels = _perf_snapshot(prefix=request.args.get('prefix') or None)
+    if request.args.get('reset') in ('1', 'true'):
+        _perf_reset()
+    return jsonify({'enabled': PERF_HIST_ENABLED, 'bucket_growth': _PERF_BUCKET_GROWTH, 'labels': labels}), 200
+
+@app.route('/api/debug/sql', methods=['GET'])
+def debug_sql():
+    """SQL 템플릿별 횟수·지연(p50/p95/p99)·행 수, 틱/요청 범위별 쿼리·연결 수와 예산 위반. ?top=50, ?reset=1"""
+    try:
+        top = max(1, min(int(request.args.get('top') or 50), 500))
+    except (TypeError, ValueError):
+        top = 50
+    snap = _sql_snapshot(top)
+    if request.args.get('reset') in ('1', 'true'):
+        _sql_reset()
+    return jsonify(snap), 200
+
+
+@app.route('/api/debug/round-latency', methods=['GET'])
+def debug_round_latency():
+    """결과 첫 수신(feed_seen) → 매크로 픽 수신까지 단계별 지연 분포 (최근 ?n=회차, 기본 100)"""
+    try:
+        n = max(1, min(int(request.args.get('n') or 100), ROUND_TRACE_KEEP))
+    except (TypeError, ValueError):
+        n = 100
+    return jsonify(_round_latency_snapshot(n)), 200
+
+
+@app.route('/api/round-trace', methods=['POST'])
+def api_round_trace():
+    """매크로 보고: {round: 픽 회차, stage: macro_recv|macro_tap}. 결과 회차(round-1) 추적에 서버 수신 시각으로 기록."""
+    data = request.get_json(silent=True) or {}
+    stage = data.get('stage')
+    if stage not in ('macro_recv', 'macro_tap'):
+        return jsonify({'ok': False, 'error': 'stage'}), 400
+    try:
+        pick_round = int(data.get('round'))
+    except (TypeError, ValueError):
+        return jsonify({'ok': False, 'error': 'round'}), 400
+    _trace_round(pick_round - 1, stage)
+    return jsonify({'ok': True}), 200
+
+
+@app.route('/api/debug/pick-delivery', methods=['GET'])
+def debug_pick_delivery():
+    """픽 WebSocket 전달 상태 (계산기별 seq·미확인 ack·재전송 수, emit→ack 지연 p50/p95/p99)"""
+    return jsonify(_pick_delivery_snapshot()), 200
+
 @app.route('/api/debug/results-check', methods=['GET'])
 def debug_results_check():
     """결과 데이터 점검 (디버깅용)"""
     try:
-        # 최신 데이터 로드
-        latest_results = load_results_data()
+        # 최신 데이터: 스케줄러가 채운 results_cache (요청 안에서 외부 fetch하지 않음)
+        latest_results = list((results_cache or {}).get('results') or [])
         
         # DB 데이터 조회
         db_results = []
@@ -14450,7 +17404,19 @@ def favicon():
     """favicon 404 에러 방지"""
     return '', 204  # No Content
 
+# 모든 함수·라우트 정의가 끝난 뒤 워밍업 시작 (정의 전 호출 경합이 없으므로 고정 대기 불필요)
+if _shared_cache is not None:
+    threading.Thread(target=_shared_sync_loop, name='shared-cache-sync', daemon=True).start()
+if APP_BACKGROUND_START:
+    threading.Thread(target=_startup_warmup, name='startup-warmup', daemon=True).start()
+else:
+    print("[⚠] APP_BACKGROUND_START=0 — 기동 워밍업·스케줄러 시작 안 함")
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     print(f"[✅ 정보] Flask 서버 시작: http://0.0.0.0:{port}")
+    # 기본 SIGTERM은 atexit 없이 종료 — SystemExit으로 바꿔 픽 write-behind flush가 돌게 함 (gunicorn은 자체 핸들러 사용)
+    def _sigterm_exit(signum, frame):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, _sigterm_exit)
     app.run(host='0.0.0.0', port=port, debug=False)
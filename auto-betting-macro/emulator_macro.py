@@ -245,6 +245,20 @@ def fetch_current_pick(analyzer_url, calculator_id=1, timeout=5):
         return {"pick_color": None, "round": None, "probability": None, "error": str(e)}
 
 
+def report_round_trace(analyzer_url, round_num, stage, timeout=3):
+    """POST /api/round-trace — 픽 수신(macro_recv)·ADB 탭 완료(macro_tap) 시각 보고. 배팅 흐름을 막지 않게 백그라운드 전송."""
+    base = normalize_analyzer_url(analyzer_url)
+    if not base or round_num is None:
+        return
+
+    def _send():
+        try:
+            requests.post(base + "/api/round-trace", json={"round": round_num, "stage": stage}, timeout=timeout)
+        except Exception:
+            pass
+    threading.Thread(target=_send, daemon=True).start()
+
+
 def _ws_url_from_analyzer(base_url, calculator_id=1):
     """분석기 base URL → WebSocket URL (wss/https, ?calculator=N)."""
     if not base_url or not base_url.strip():
@@ -1302,11 +1316,22 @@ class EmulatorMacroWindow(QMainWindow if HAS_PYQT else object):
                 import socketio
                 sio = socketio.Client(reconnection=True, reconnection_attempts=10, reconnection_delay=2)
                 self._ws_client = sio
+                last_seq = [0]  # 서버 seq 기준 중복(재전송) 제거. 재접속 시 초기화 — 서버 재시작하면 seq 다시 1부터
 
                 @sio.on('pick_update')
                 def on_pick(data):
                     if not isinstance(data, dict):
                         return
+                    seq = data.get('seq')
+                    if isinstance(seq, int):
+                        # 수신 즉시 ack — 서버는 ack 없을 때만 재전송
+                        try:
+                            sio.emit('pick_ack', {'calculator': data.get('calculator') or self._calculator_id, 'seq': seq})
+                        except Exception:
+                            pass
+                        if seq <= last_seq[0] and not data.get('resync'):
+                            return  # 이미 받은 픽 (재전송분)
+                        last_seq[0] = seq
                     if data.get('running') is False:
                         return
                     pick = {
@@ -1328,6 +1353,7 @@ class EmulatorMacroWindow(QMainWindow if HAS_PYQT else object):
 
                 @sio.on('connect')
                 def on_connect():
+                    last_seq[0] = 0
                     self._ws_connected = True
 
                 @sio.on('disconnect')
@@ -1411,6 +1437,7 @@ class EmulatorMacroWindow(QMainWindow if HAS_PYQT else object):
         # 픽 수신 즉시 배팅 (1회 확인 — 속도 우선)
         self._round_next = round_num
         self._log("[푸시] %s회 %s %s원 수신 — 즉시 ADB" % (round_num, pick_color, use_amt))
+        report_round_trace(self._analyzer_url, round_num, "macro_recv")
         self._coords = load_coords()
         self._run_bet(round_num, pick_color, use_amt, predicted=predicted, from_push=True)
 
@@ -1545,6 +1572,7 @@ class EmulatorMacroWindow(QMainWindow if HAS_PYQT else object):
                         pick_pred = (getattr(self, '_pick_data', {}) or {}).get('pick_pred')
                     pred_text = pick_pred if pick_pred in ('정', '꺽') else "색상"
                     self._log(f"{round_num}회차 {pred_text} {pick_color} {bet_amount}원 (ADB 완료 — 사이트 반영은 화면에서 확인)")
+                    report_round_trace(self._analyzer_url, round_num, "macro_tap")
                     return True
                 except Exception as e:
                     last_error = e
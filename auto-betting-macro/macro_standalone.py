@@ -1625,6 +1625,7 @@ class MacroStandaloneWindow(QMainWindow if HAS_PYQT else object):
                 import socketio
                 sio = socketio.Client(reconnection=True, reconnection_attempts=10, reconnection_delay=2)
                 self._ws_client = sio
+                last_seq = [0]  # 서버 seq 기준 중복(재전송) 제거. 재접속 시 초기화 — 서버 재시작하면 seq 다시 1부터
 
                 @sio.on("round_actuals_update")
                 def on_round_actuals(data):
@@ -1636,6 +1637,16 @@ class MacroStandaloneWindow(QMainWindow if HAS_PYQT else object):
                 def on_pick(data):
                     if not isinstance(data, dict):
                         return
+                    seq = data.get("seq")
+                    if isinstance(seq, int):
+                        # 수신 즉시 ack — 서버는 ack 없을 때만 재전송
+                        try:
+                            sio.emit("pick_ack", {"calculator": data.get("calculator") or calc_id, "seq": seq})
+                        except Exception:
+                            pass
+                        if seq <= last_seq[0] and not data.get("resync"):
+                            return  # 이미 받은 픽 (재전송분)
+                        last_seq[0] = seq
                     if data.get("running") is False:
                         return
                     rnd = data.get("round")
@@ -1654,6 +1665,7 @@ class MacroStandaloneWindow(QMainWindow if HAS_PYQT else object):
 
                 @sio.on("connect")
                 def on_connect():
+                    last_seq[0] = 0
                     self._ws_connected = True
 
                 @sio.on("disconnect")
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+예측·계산기 핫패스 마이크로 벤치마크 (DB·네트워크 없이 합성 데이터로 실행).
+
+대상: _build_graph_values, compute_prediction, get_shape_prediction_hint(모양/덩어리 통계 스텁),
+      _get_prediction_picks_best, 승률 헬퍼들, _calculate_calc_profit_server, _apply_results_to_calcs
+결과(JSON)를 --save 로 기준선으로 저장하고, 다음 실행에서 --baseline 으로 비교 — p50이 threshold 이상 느려지면 종료 코드 1.
+
+  python scripts/bench_prediction.py --save scripts/bench_baselines/local.json
+  python scripts/bench_prediction.py --baseline scripts/bench_baselines/local.json --threshold 0.25
+"""
+import argparse
+import copy
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# DB 없이 순수 계산 경로만 측정 (import 전에 비워야 app이 DB 초기화를 건너뜀)
+os.environ.pop('DATABASE_URL', None)
+os.environ.setdefault('PERF_HIST', '0')
+os.environ.setdefault('SQL_PROFILE', '0')
+os.environ['APP_BACKGROUND_START'] = '0'  # 기동 워밍업·스케줄러가 측정 중에 돌지 않도록
+
+from synthetic_results import generate_results, generate_prediction_history  # noqa: E402
+import app as appmod  # noqa: E402
+
+
+def _make_calc_states(results, sessions, history_len, seed):
+    """실행 중인 계산기 3개짜리 세션 N개. pending_round=최신 회차라 apply 시 결과 반영 경로를 탄다."""
+    latest = int(results[0]['gameID'])
+    ph = generate_prediction_history(results, seed=seed)
+    hist_src = [h for h in ph if h['round'] < latest][-history_len:]
+    states = {}
+    for s in range(sessions):
+        st = {}
+        for i, cid in enumerate(('1', '2', '3')):
+            hist = [{
+                'round': h['round'], 'predicted': h['predicted'], 'actual': h['actual'],
+                'pickColor': h['pick_color'], 'betAmount': 10000,
+            } for h in hist_src]
+            st[cid] = {
+                'running': True,
+                'capital': 1000000, 'base': 10000, 'odds': 1.97,
+                'martingale': i != 0, 'martingale_type': 'pyo',
+                'reverse': i == 2,
+                'smart_reverse': i == 1,
+                'history': hist,
+                'pending_round': latest,
+                'pending_predicted': '정',
+                'pending_color': '빨강',
+                'pending_prob': 55.0,
+            }
+        states[f'bench{s}'] = st
+    return states
+
+
+def _bench(fn, iterations, repeat=3, warmup=3, setup=None):
+    """iterations회씩 repeat 블록 측정. p50은 블록별 중앙값 중 최소(timeit 방식) — 공용 머신 잡음 완화."""
+    for _ in range(warmup):
+        fn(setup() if setup else None)
+    times = []
+    block_p50 = []
+    gc_was = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(max(1, repeat)):
+            block = []
+            for _ in range(iterations):
+                arg = setup() if setup else None
+                t0 = time.perf_counter()
+                fn(arg)
+                block.append((time.perf_counter() - t0) * 1000)
+            block_p50.append(statistics.median(block))
+            times.extend(block)
+            gc.collect()
+    finally:
+        if gc_was:
+            gc.enable()
+    times.sort()
+    return {
+        'iterations': len(times),
+        'mean_ms': round(statistics.fmean(times), 4),
+        'p50_ms': round(min(block_p50), 4),
+        'p95_ms': round(times[min(len(times) - 1, int(len(times) * 0.95))], 4),
+        'min_ms': round(times[0], 4),
+        'max_ms': round(times[-1], 4),
+    }
+
+
+def run_suite(n, seed, iterations, sessions, repeat=3, only=None):
+    results = generate_results(n, seed=seed)
+    ph = generate_prediction_history(results, seed=seed)
+    ph100, ph150 = ph[-100:], ph[-150:]
+    predicted_round = int(results[0]['gameID']) + 1
+    shape_stats = {'jung_count': 34, 'kkeok_count': 21}
+    chunk_stats = {'jung_count': 12.5, 'kkeok_count': 17.25}
+
+    # DB 의존 헬퍼 스텁 — 계산 비용만 남긴다
+    appmod._get_shape_stats_for_results = lambda r: shape_stats
+    appmod._get_chunk_stats_for_results = lambda r: chunk_stats
+    appmod.get_stored_round_prediction = lambda rn: {'predicted': '정', 'pick_color': '빨강', 'probability': 56.0}
+    appmod.get_prediction_history = lambda limit=30, **kw: ph[-int(limit):]
+    appmod.save_calc_state = lambda *a, **k: True
+    states_tpl = _make_calc_states(results, sessions, 120, seed)
+    holder = {}
+    appmod._get_all_calc_states = lambda: holder['states']
+
+    def _fresh_states():
+        holder['states'] = copy.deepcopy(states_tpl)
+
+    calc_state = states_tpl[next(iter(states_tpl))]['1']
+    entry = {'round': calc_state['pending_round'], 'predicted': '정', 'actual': '꺽', 'betAmount': 10000}
+
+    cases = [
+        ('build_graph_values', lambda _: appmod._build_graph_values(results), None),
+        ('compute_prediction', lambda _: appmod.compute_prediction(results, ph100), None),
+        ('compute_prediction_shape', lambda _: appmod.compute_prediction(
+            results, ph100, shape_win_stats=shape_stats, chunk_profile_stats=chunk_stats,
+            use_shape_adjustments=True, shape_debug_out={}), None),
+        ('get_shape_prediction_hint', lambda _: appmod.get_shape_prediction_hint(results, ph100), None),
+        ('prediction_picks_best', lambda _: appmod._get_prediction_picks_best(results, predicted_round, ph100), None),
+        ('blended_win_rate', lambda _: appmod._blended_win_rate(ph100), None),
+        ('win_rate_weighted_4', lambda _: (
+            appmod._get_main_recent15_win_rate_weighted(ph100),
+            appmod._get_main_reverse_15_win_rate_weighted(ph100),
+            appmod._get_shape_15_win_rate_weighted(ph100),
+            appmod._get_pong_15_win_rate_weighted(ph100)), None),
+        ('win_rate_direction_zone', lambda _: appmod._server_win_rate_direction_zone(ph150), None),
+        ('calc_profit_server', lambda _: appmod._calculate_calc_profit_server(calc_state, dict(entry)), None),
+        ('apply_results_to_calcs', lambda _: appmod._apply_results_to_calcs(results), _fresh_states),
+    ]
+    out = {}
+    for name, fn, setup in cases:
+        if only and name not in only:
+            continue
+        its = max(5, iterations // 10) if name == 'apply_results_to_calcs' else iterations
+        out[name] = _bench(fn, its, repeat=repeat, setup=setup)
+    return out
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(current, baseline, threshold):
+    """p50 기준 비교. 반환: 회귀 목록 [(name, base_ms, cur_ms, ratio)]."""
+    regressions = []
+    base_b = (baseline or {}).get('benchmarks') or {}
+    for name, cur in current['benchmarks'].items():
+        b = base_b.get(name)
+        if not b or not b.get('p50_ms'):
+            continue
+        ratio = cur['p50_ms'] / b['p50_ms']
+        if ratio > 1 + threshold:
+            regressions.append((name, b['p50_ms'], cur['p50_ms'], ratio))
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description='예측·계산기 핫패스 벤치마크')
+    ap.add_argument('-n', type=int, default=300, help='합성 결과 개수(최신순)')
+    ap.add_argument('--seed', type=int, default=7)
+    ap.add_argument('--iterations', type=int, default=100, help='블록당 반복 횟수')
+    ap.add_argument('--repeat', type=int, default=3, help='측정 블록 수 (p50은 블록 중앙값 중 최소)')
+    ap.add_argument('--sessions', type=int, default=3, help='apply 벤치용 계산기 세션 수')
+    ap.add_argument('--only', action='append', default=[], help='특정 벤치만 (여러 번 지정 가능)')
+    ap.add_argument('--save', help='결과 JSON 저장 경로 (기준선)')
+    ap.add_argument('--baseline', help='비교할 기준선 JSON')
+    ap.add_argument('--threshold', type=float, default=0.25, help='p50 허용 증가율 (0.25=25%%)')
+    args = ap.parse_args()
+
+    benchmarks = run_suite(args.n, args.seed, args.iterations, args.sessions, repeat=args.repeat, only=set(args.only) or None)
+    report = {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_rev': _git_rev(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'n': args.n, 'seed': args.seed, 'sessions': args.sessions, 'repeat': args.repeat,
+        },
+        'benchmarks': benchmarks,
+    }
+    print(f"\n{'benchmark':28s} {'iters':>6s} {'mean':>9s} {'p50':>9s} {'p95':>9s}  (ms)")
+    for name, st in benchmarks.items():
+        print(f"{name:28s} {st['iterations']:6d} {st['mean_ms']:9.3f} {st['p50_ms']:9.3f} {st['p95_ms']:9.3f}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n[저장] {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if (baseline.get('meta') or {}).get('n') != args.n or (baseline.get('meta') or {}).get('seed') != args.seed:
+            print("[주의] 기준선과 -n/--seed가 달라 비교가 부정확할 수 있음")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n[회귀] p50 {args.threshold * 100:.0f}% 초과 증가:")
+            for name, b, c, ratio in regressions:
+                print(f"  {name}: {b:.3f}ms → {c:.3f}ms (×{ratio:.2f})")
+            return 1
+        print(f"\n[통과] 기준선({(baseline.get('meta') or {}).get('git_rev')}) 대비 회귀 없음")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+틱/요청당 SQL 쿼리 예산 점검 스크립트.
+서버(기본 http://127.0.0.1:5000)가 SQL_PROFILE 켜진 상태(기본값)로 떠 있어야 함.
+
+1) /api/debug/sql 집계 초기화
+2) 주요 엔드포인트를 N회 호출하고 스케줄러 틱이 돌 시간을 기다림
+3) 범위(scope)별 최대 쿼리 수를 예산과 비교 — 하나라도 초과하면 종료 코드 1 (벤치마크·CI 실패 처리용)
+
+예산은 서버의 SQL_QUERY_BUDGETS가 기본, --budget scope=N 으로 덮어씀.
+  python scripts/check_query_budget.py --budget scheduler_apply=40 --budget http_get_results=5
+"""
+import argparse
+import sys
+import time
+import requests
+
+BASE = 'http://127.0.0.1:5000'
+ENDPOINTS = [
+    '/api/results',
+    '/api/current-prediction',
+    '/api/shape-pick',
+    '/api/calc-state?session_id=default',
+    '/api/current-pick-relay?calculator=1',
+    '/api/macro-data?calculator=1',
+]
+
+
+def main():
+    ap = argparse.ArgumentParser(description='틱/요청당 SQL 쿼리 예산 점검')
+    ap.add_argument('--base', default=BASE)
+    ap.add_argument('--requests', type=int, default=20, help='엔드포인트별 호출 횟수')
+    ap.add_argument('--settle', type=float, default=5.0, help='스케줄러 틱 대기(초)')
+    ap.add_argument('--budget', action='append', default=[], help='scope=N (여러 번 지정 가능)')
+    ap.add_argument('--no-reset', action='store_true', help='시작 전 집계 초기화 안 함')
+    args = ap.parse_args()
+    base = args.base.rstrip('/')
+
+    overrides = {}
+    for item in args.budget:
+        if '=' not in item:
+            ap.error(f'--budget 형식 오류: {item}')
+        k, v = item.split('=', 1)
+        overrides[k.strip()] = int(v)
+
+    if not args.no_reset:
+        requests.get(f'{base}/api/debug/sql', params={'reset': '1'}, timeout=10)
+    print(f"[점검] 엔드포인트 {len(ENDPOINTS)}개 × {args.requests}회 호출 후 {args.settle:.0f}초 대기...")
+    for _ in range(args.requests):
+        for path in ENDPOINTS:
+            try:
+                requests.get(base + path, timeout=10)
+            except Exception as e:
+                print(f"  {path} 실패: {e}")
+        time.sleep(0.05)
+    time.sleep(args.settle)
+
+    snap = requests.get(f'{base}/api/debug/sql', params={'top': '20'}, timeout=10).json()
+    if not snap.get('enabled'):
+        print("  서버 SQL 프로파일러 꺼짐 (SQL_PROFILE=0 또는 psycopg2 없음)")
+        return 2
+    scopes = snap.get('scopes') or {}
+    failed = []
+    print(f"\n{'scope':40s} {'runs':>6s} {'mean':>7s} {'max':>5s} {'budget':>7s} {'conn':>5s}")
+    for name in sorted(scopes):
+        st = scopes[name]
+        budget = overrides.get(name, st.get('budget'))
+        over = budget is not None and st['queries_max'] > budget
+        if over:
+            failed.append((name, st, budget))
+        print(f"{name:40s} {st['runs']:6d} {st['queries_mean']:7.1f} {st['queries_max']:5d} {str(budget if budget is not None else '-'):>7s} {st['connects_max']:5d}{'  ⚠ 초과' if over else ''}")
+
+    print("\n[상위 템플릿 (총 지연 순)]")
+    for t in (snap.get('templates') or [])[:10]:
+        print(f"  {t['count']:6d}회 {t['total_ms']:9.1f}ms p95 {t['p95_ms']:.1f}ms 행 {t['rows_mean']}  {t['sql'][:90]}")
+
+    if failed:
+        print("\n[실패] 예산 초과:")
+        for name, st, budget in failed:
+            print(f"  {name}: 최대 {st['queries_max']}건 > 예산 {budget}건")
+            lv = st.get('last_violation') or {}
+            for t in lv.get('top_templates') or []:
+                print(f"      {t['count']:4d}× {t['sql'][:100]}")
+        return 1
+    print("\n[통과] 모든 범위가 예산 이내")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
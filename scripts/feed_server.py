@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로컬 대체 게임 피드 서버 — 실제 BASE_URL(tgame365) 대신 result.json을 같은 형식(json 문자열 내장, hash/salt)으로 제공.
+회차는 설정한 주기로 진행되고, 시퀀스는 seed 고정 합성(synthetic_results) 또는 녹화한 result.json으로 재생한다.
+지연·타임아웃·5xx·행 순서 뒤섞기·직전 스냅샷 재전송을 확률로 주입해 fetch/ingest/apply 지연을 오프라인에서 재현.
+
+  python scripts/feed_server.py --port 8765 --interval 10 --seed 7
+  BASE_URL=http://127.0.0.1:8765 python app.py
+
+  # 장애 주입: 평균 120ms(±80) 지연, 5% 타임아웃(3초 무응답), 10% 행 순서 뒤섞기
+  python scripts/feed_server.py --latency-ms 120 --jitter-ms 80 --timeout-rate 0.05 --shuffle-rate 0.1
+
+  # 녹화본 재생 (result.json 응답을 그대로 저장한 파일 — 최신순 배열)
+  python scripts/feed_server.py --replay recorded_result.json --interval 2
+
+제어 API:
+  GET  /control/state    현재 회차·공개 시각(회차별)·요청/장애 주입 횟수 — /api/debug/round-latency 와 대조용
+  POST /control/advance  즉시 1회차 진행 (--interval 0 이면 이것으로만 진행)
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_results import generate_results, to_feed_rows  # noqa: E402
+
+FEED_PATHS = ('/frame/hilo/result.json',)
+# load_results_data가 병렬로 시도하는 나머지 경로 (--all-paths 시 같은 응답)
+ALT_PATHS = ('/result.json', '/hilo/result.json', '/frame/result.json', '/api/result.json', '/game/result.json')
+
+
+class Feed:
+    """회차 진행 상태. rows는 과거→최신 순 전체 시퀀스, visible은 현재 공개된 개수."""
+
+    def __init__(self, rows, initial, window, interval, loop):
+        self.lock = threading.Lock()
+        self.rows = rows
+        self._base_len = len(rows)  # --loop 시 한 바퀴 길이 (rows는 최근 한 바퀴 + 창만 유지)
+        self._dropped = 0           # 앞에서 잘라낸 행 수 — visible/total 보고용
+        self.visible = max(1, min(initial, len(rows)))
+        self.window = window
+        self.interval = interval
+        self.loop = loop
+        self.published_at = {}   # gameID -> 공개 시각(epoch 초)
+        self.prev_snapshot = None
+        self.stats = {'requests': 0, 'delayed': 0, 'timeouts': 0, 'errors': 0, 'shuffled': 0, 'stale': 0}
+        now = time.time()
+        for r in rows[:self.visible]:
+            self.published_at[r['gameID']] = now
+
+    def advance(self):
+        with self.lock:
+            self.prev_snapshot = self._snapshot_locked()
+            if self.visible >= len(self.rows):
+                if not self.loop:
+                    return None
+                # 시퀀스 끝: 회차 번호를 이어 붙여 처음부터 다시 (gameID는 계속 증가해야 앱이 새 회차로 인식)
+                # 직전 한 바퀴(_base_len개)만 이동해 붙이고, 창 밖으로 밀려난 앞부분은 잘라 메모리를 한 바퀴 + 창으로 고정
+                cycle = self.rows[-self._base_len:]
+                shift = int(cycle[-1]['gameID']) - int(cycle[0]['gameID']) + 1
+                self.rows.extend(dict(r, gameID=str(int(r['gameID']) + shift)) for r in cycle)
+                drop = max(0, self.visible - self.window)
+                if drop:
+                    del self.rows[:drop]
+                    self.visible -= drop
+                    self._dropped += drop
+            row = self.rows[self.visible]
+            self.visible += 1
+            self.published_at[row['gameID']] = time.time()
+            if len(self.published_at) > 2000:
+                for k in sorted(self.published_at, key=int)[:len(self.published_at) - 2000]:
+                    del self.published_at[k]
+            return row['gameID']
+
+    def _snapshot_locked(self):
+        lo = max(0, self.visible - self.window)
+        return list(reversed(self.rows[lo:self.visible]))  # result.json은 최신순
+
+    def snapshot(self):
+        with self.lock:
+            return self._snapshot_locked()
+
+    def state(self, recent=20):
+        with self.lock:
+            latest = self.rows[self.visible - 1]['gameID']
+            recent_ids = sorted(self.published_at, key=int)[-recent:]
+            return {
+                'latest_round': int(latest),
+                'visible': self._dropped + self.visible,
+                'total': self._dropped + len(self.rows),
+                'interval_sec': self.interval,
+                'published_at': {k: round(self.published_at[k], 3) for k in recent_ids},
+                'stats': dict(self.stats),
+            }
+
+
+def _clock(feed, stop):
+    while not stop.wait(feed.interval):
+        rid = feed.advance()
+        if rid is None:
+            print("[피드] 시퀀스 끝 (--loop 없음) — 회차 진행 중지")
+            return
+
+
+def _make_handler(feed, args, paths):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, fmt, *a):
+            if args.verbose:
+                super().log_message(fmt, *a)
+
+        def _send(self, code, body, ctype='application/json'):
+            data = body if isinstance(body, bytes) else body.encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', ctype)
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _bump(self, key):
+            with feed.lock:
+                feed.stats[key] += 1
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == '/control/state':
+                return self._send(200, json.dumps(feed.state()))
+            if path not in paths:
+                return self._send(404, '{"error":"not found"}')
+            self._bump('requests')
+            rng = random.random
+            if args.timeout_rate and rng() < args.timeout_rate:
+                # 응답 없이 붙잡고 있다가 끊기 — 클라이언트 read timeout 유발
+                self._bump('timeouts')
+                time.sleep(args.timeout_sec)
+                self.close_connection = True
+                return
+            if args.latency_ms or args.jitter_ms:
+                delay = max(0.0, args.latency_ms + random.uniform(-args.jitter_ms, args.jitter_ms)) / 1000.0
+                if delay > 0:
+                    self._bump('delayed')
+                    time.sleep(delay)
+            if args.error_rate and rng() < args.error_rate:
+                self._bump('errors')
+                return self._send(502, '<html>Bad Gateway</html>', 'text/html')
+            rows = None
+            if args.stale_rate and rng() < args.stale_rate and feed.prev_snapshot:
+                self._bump('stale')
+                rows = feed.prev_snapshot  # 직전 회차 스냅샷 (CDN 캐시·지연 반영 흉내)
+            if rows is None:
+                rows = feed.snapshot()
+            if args.shuffle_rate and rng() < args.shuffle_rate and len(rows) > 2:
+                self._bump('shuffled')
+                rows = list(rows)
+                # 최신 몇 행의 순서를 뒤섞음 (out-of-order 행)
+                head = rows[:min(len(rows), args.shuffle_depth)]
+                random.shuffle(head)
+                rows[:len(head)] = head
+            return self._send(200, json.dumps(rows, ensure_ascii=False))
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                self.rfile.read(length)
+            if path == '/control/advance':
+                rid = feed.advance()
+                return self._send(200, json.dumps({'ok': rid is not None, 'round': int(rid) if rid else None}))
+            return self._send(404, '{"error":"not found"}')
+
+    return Handler
+
+
+def _load_replay(path):
+    """녹화 파일: result.json 응답 배열(최신순) 또는 그런 배열들의 목록(스냅샷 여러 개). 과거→최신 순 고유 행으로 합침."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    snapshots = data if data and isinstance(data[0], list) else [data]
+    by_id = {}
+    for snap in snapshots:
+        for row in snap:
+            gid = str(row.get('gameID') or '')
+            if gid.isdigit():
+                by_id[gid] = row
+    return [by_id[k] for k in sorted(by_id, key=int)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description='로컬 대체 result.json 피드 서버')
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--seed', type=int, default=0, help='합성 시퀀스 seed')
+    ap.add_argument('--rounds', type=int, default=5000, help='합성 시퀀스 길이')
+    ap.add_argument('--replay', help='녹화한 result.json 파일 (합성 대신 재생)')
+    ap.add_argument('--initial', type=int, default=200, help='시작 시 공개된 회차 수')
+    ap.add_argument('--window', type=int, default=100, help='응답에 담는 최근 행 수')
+    ap.add_argument('--interval', type=float, default=10.0, help='회차 진행 주기(초). 0이면 /control/advance 로만 진행')
+    ap.add_argument('--loop', action='store_true', help='시퀀스 끝나면 회차 번호 이어서 반복')
+    ap.add_argument('--all-paths', action='store_true', help='load_results_data가 시도하는 나머지 경로도 응답')
+    ap.add_argument('--latency-ms', type=float, default=0.0)
+    ap.add_argument('--jitter-ms', type=float, default=0.0)
+    ap.add_argument('--timeout-rate', type=float, default=0.0, help='응답 없이 --timeout-sec 붙잡을 확률')
+    ap.add_argument('--timeout-sec', type=float, default=3.0)
+    ap.add_argument('--error-rate', type=float, default=0.0, help='502 응답 확률')
+    ap.add_argument('--shuffle-rate', type=float, default=0.0, help='최신 행 순서를 뒤섞을 확률')
+    ap.add_argument('--shuffle-depth', type=int, default=5)
+    ap.add_argument('--stale-rate', type=float, default=0.0, help='직전 회차 스냅샷을 돌려줄 확률')
+    ap.add_argument('--fault-seed', type=int, help='장애 주입 난수 seed (재현용)')
+    ap.add_argument('-v', '--verbose', action='store_true')
+    args = ap.parse_args()
+
+    if args.fault_seed is not None:
+        random.seed(args.fault_seed)
+    if args.replay:
+        rows = _load_replay(args.replay)
+        if not rows:
+            print(f"[오류] 녹화 파일에 행 없음: {args.replay}")
+            return 2
+    else:
+        rows = to_feed_rows(list(reversed(generate_results(args.rounds, seed=args.seed))))
+    feed = Feed(rows, args.initial, args.window, args.interval, args.loop)
+    paths = set(FEED_PATHS) | (set(ALT_PATHS) if args.all_paths else set())
+
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(feed, args, paths))
+    server.daemon_threads = True
+    stop = threading.Event()
+    if args.interval > 0:
+        threading.Thread(target=_clock, args=(feed, stop), daemon=True).start()
+    st = feed.state()
+    print(f"[피드] http://{args.host}:{args.port}{FEED_PATHS[0]} — 최신 회차 {st['latest_round']}, "
+          f"{'녹화 재생' if args.replay else f'합성 seed={args.seed}'}, 주기 {args.interval}초")
+    print(f"[피드] 앱 실행: BASE_URL=http://{args.host}:{args.port} python app.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
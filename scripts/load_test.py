@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+다중 클라이언트 부하 테스트 — 실제 폴링 구성을 재현해 탭/매크로 수를 늘려가며 측정.
+
+탭 1개 = 브라우저 결과 페이지의 폴링 5종 (docs/PERFORMANCE_AUDIT_REPORT.md 기준)
+  loadResults    GET  /api/results(?since=버전)            150~300ms
+  prediction     GET  /api/current-prediction               300ms
+  shape          GET  /api/shape-pick                       400ms
+  calcStatus     POST /api/current-pick-relay               200ms
+  calcState      GET  /api/calc-state?session_id=...       1200ms
+매크로 1개 = --macro-mode 에 따라
+  poll      GET /api/current-pick-relay + /api/macro-data 300ms 폴링 (macro_standalone 기본)
+  longpoll  GET /api/macro-data?since_version=N&wait=초 연속 대기
+  ws        Socket.IO 연결 유지 + pick_update ack (수신 지연 = 서버 sent_at 기준)
+
+단계(--tabs 1,5,10)마다 서버 /api/debug/perf·/api/debug/sql 을 초기화하고 --duration 초 동안 부하를 건 뒤
+엔드포인트별 p50/p95/p99·오류율·초당 요청, apply 틱(scheduler_apply), 범위별 DB 연결 수를 모은다.
+--dsn 을 주면 pg_stat_activity 를 1초마다 샘플링해 실제 Postgres 연결 수(최대/평균)도 기록.
+
+로컬 구성 예 (대체 피드 서버 scripts/feed_server.py + 로컬 Postgres):
+  python scripts/feed_server.py --port 8765 --interval 10 --seed 7 &
+  BASE_URL=http://127.0.0.1:8765 DATABASE_URL=postgresql://localhost/tokenhilo python app.py
+  python scripts/load_test.py --tabs 1,5,10,20 --macros 3 --macro-mode ws --duration 30 \\
+      --dsn postgresql://localhost/tokenhilo --json load_report.json
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+BASE = 'http://127.0.0.1:5000'
+# (이름, 메서드, 경로, 최소 주기 ms, 최대 주기 ms)
+TAB_LOOPS = [
+    ('results', 'GET', '/api/results', 150, 300),
+    ('prediction', 'GET', '/api/current-prediction', 300, 300),
+    ('shape', 'GET', '/api/shape-pick', 400, 400),
+    ('calc_status', 'POST', '/api/current-pick-relay', 200, 200),
+    ('calc_state', 'GET', '/api/calc-state', 1200, 1200),
+]
+MACRO_POLL_MS = 300
+
+
+class Recorder:
+    """엔드포인트별 지연(ms) 목록·오류 수. 단계마다 새로 만든다."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.lat = defaultdict(list)
+        self.err = defaultdict(int)
+        self.err_samples = defaultdict(list)
+
+    def ok(self, name, ms):
+        with self.lock:
+            self.lat[name].append(ms)
+
+    def fail(self, name, why):
+        with self.lock:
+            self.err[name] += 1
+            if len(self.err_samples[name]) < 3:
+                self.err_samples[name].append(str(why)[:120])
+
+    def summary(self, duration):
+        out = {}
+        with self.lock:
+            names = set(self.lat) | set(self.err)
+            for name in sorted(names):
+                xs = sorted(self.lat.get(name) or [])
+                errs = self.err.get(name, 0)
+                total = len(xs) + errs
+
+                def pct(q):
+                    return round(xs[min(len(xs) - 1, int(len(xs) * q))], 2) if xs else None
+                out[name] = {
+                    'requests': total,
+                    'rps': round(total / duration, 2) if duration else None,
+                    'errors': errs,
+                    'error_rate': round(errs / total, 4) if total else 0.0,
+                    'p50_ms': pct(0.50), 'p95_ms': pct(0.95), 'p99_ms': pct(0.99),
+                    'max_ms': round(xs[-1], 2) if xs else None,
+                    'error_samples': list(self.err_samples.get(name) or []),
+                }
+        return out
+
+
+def _timed(rec, name, fn):
+    t0 = time.perf_counter()
+    try:
+        r = fn()
+        ms = (time.perf_counter() - t0) * 1000
+        if r.status_code >= 500:
+            rec.fail(name, f'HTTP {r.status_code}')
+            return None
+        rec.ok(name, ms)
+        return r
+    except Exception as e:
+        rec.fail(name, e)
+        return None
+
+
+def _tab_loop(base, tab_idx, loop, rec, stop, timeout, tab):
+    """tab: 같은 탭의 루프끼리 공유하는 상태 — prediction 응답의 회차·픽을 calc_status POST가 그대로 보냄(실제 화면과 동일)."""
+    name, method, path, lo, hi = loop
+    sess = requests.Session()
+    session_id = f'loadtest-{tab_idx}'
+    calc_id = tab_idx % 3 + 1
+    results_version = [None]
+    # 탭이 같은 순간에 몰리지 않게 시작을 흩뜨림
+    stop.wait(random.uniform(0, hi / 1000.0))
+    while not stop.is_set():
+        started = time.time()
+        if name == 'results':
+            url = base + path + (f'?since={results_version[0]}' if results_version[0] is not None else '')
+            r = _timed(rec, name, lambda: sess.get(url, timeout=timeout))
+            if r is not None and r.status_code == 200:
+                try:
+                    results_version[0] = r.json().get('version')
+                except ValueError:
+                    pass
+        elif name == 'calc_status':
+            sp = tab.get('prediction') or {}
+            color = sp.get('color')
+            body = {'calculator': calc_id, 'pickColor': 'RED' if color == '빨강' else ('BLACK' if color == '검정' else None),
+                    'predicted': sp.get('value'), 'round': sp.get('round') or None, 'suggested_amount': 10000, 'running': True}
+            _timed(rec, name, lambda: sess.post(base + path, json=body, timeout=timeout))
+        elif name == 'calc_state':
+            _timed(rec, name, lambda: sess.get(base + path, params={'session_id': session_id}, timeout=timeout))
+        else:
+            r = _timed(rec, name, lambda: sess.get(base + path, params={'t': int(time.time() * 1000)}, timeout=timeout))
+            if name == 'prediction' and r is not None and r.status_code == 200:
+                try:
+                    tab['prediction'] = r.json().get('server_prediction') or {}
+                except ValueError:
+                    pass
+        interval = random.uniform(lo, hi) / 1000.0
+        stop.wait(max(0.0, interval - (time.time() - started)))
+
+
+def _macro_poll(base, calc_id, rec, stop, timeout):
+    sess = requests.Session()
+    while not stop.is_set():
+        started = time.time()
+        _timed(rec, 'macro_relay', lambda: sess.get(base + '/api/current-pick-relay', params={'calculator': calc_id}, timeout=timeout))
+        _timed(rec, 'macro_data', lambda: sess.get(base + '/api/macro-data', params={'calculator': calc_id}, timeout=timeout))
+        stop.wait(max(0.0, MACRO_POLL_MS / 1000.0 - (time.time() - started)))
+
+
+def _macro_longpoll(base, calc_id, rec, stop, timeout, wait_sec):
+    sess = requests.Session()
+    version = None
+    while not stop.is_set():
+        params = {'calculator': calc_id}
+        if version is not None:
+            params.update({'since_version': version, 'wait': wait_sec})
+        r = _timed(rec, 'macro_longpoll', lambda: sess.get(base + '/api/macro-data', params=params, timeout=timeout + wait_sec))
+        if r is None or r.status_code != 200:
+            stop.wait(0.5)
+            continue
+        try:
+            version = r.json().get('version', version)
+        except ValueError:
+            stop.wait(0.5)
+
+
+def _macro_ws(base, calc_id, rec, stop, timeout):
+    try:
+        import socketio
+    except ImportError:
+        rec.fail('macro_ws_connect', 'python-socketio 미설치')
+        return
+    sio = socketio.Client(reconnection=True, reconnection_delay=1)
+
+    @sio.on('pick_update')
+    def on_pick(data):
+        if not isinstance(data, dict):
+            return
+        seq = data.get('seq')
+        if isinstance(seq, int):
+            try:
+                sio.emit('pick_ack', {'calculator': data.get('calculator') or calc_id, 'seq': seq})
+            except Exception:
+                pass
+        sent_at = data.get('sent_at')
+        if isinstance(sent_at, (int, float)):
+            # 같은 머신에서 돌릴 때만 의미 있음 (서버 시각 기준)
+            rec.ok('ws_pick_delivery', max(0.0, time.time() * 1000 - sent_at))
+
+    @sio.on('round_actuals_update')
+    def on_actuals(data):
+        rec.ok('ws_round_actuals', 0.0)
+
+    t0 = time.perf_counter()
+    try:
+        sio.connect(base, auth={'calculator': calc_id}, wait_timeout=timeout)  # websocket-client 없으면 polling으로
+        rec.ok('macro_ws_connect', (time.perf_counter() - t0) * 1000)
+    except Exception as e:
+        rec.fail('macro_ws_connect', e)
+        return
+    stop.wait()
+    try:
+        sio.disconnect()
+    except Exception:
+        pass
+
+
+def _pg_sampler(dsn, stop, samples):
+    """pg_stat_activity 1초 샘플: 현재 DB의 전체·active·idle 연결 수."""
+    try:
+        conn = psycopg2.connect(dsn, connect_timeout=5)
+        conn.autocommit = True
+    except Exception as e:
+        print(f"  [경고] pg_stat_activity 샘플러 연결 실패: {str(e)[:100]}")
+        return
+    try:
+        while not stop.is_set():
+            try:
+                cur = conn.cursor()
+                cur.execute(
+                    "SELECT count(*), count(*) FILTER (WHERE state = 'active'), count(*) FILTER (WHERE state LIKE 'idle%%') "
+                    "FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()"
+                )
+                total, active, idle = cur.fetchone()
+                cur.close()
+                samples.append((total, active, idle))
+            except Exception:
+                pass
+            stop.wait(1.0)
+    finally:
+        conn.close()
+
+
+def _server_get(base, path, params=None):
+    try:
+        return requests.get(base + path, params=params or {}, timeout=10).json()
+    except Exception:
+        return None
+
+
+def run_stage(base, tabs, macros, macro_mode, duration, timeout, wait_sec, dsn):
+    rec = Recorder()
+    stop = threading.Event()
+    _server_get(base, '/api/debug/perf', {'reset': '1'})
+    _server_get(base, '/api/debug/sql', {'reset': '1'})
+    threads = []
+    for t in range(tabs):
+        tab = {}
+        for loop in TAB_LOOPS:
+            threads.append(threading.Thread(target=_tab_loop, args=(base, t, loop, rec, stop, timeout, tab), daemon=True))
+    for m in range(macros):
+        calc_id = m % 3 + 1
+        if macro_mode == 'ws':
+            threads.append(threading.Thread(target=_macro_ws, args=(base, calc_id, rec, stop, timeout), daemon=True))
+        elif macro_mode == 'longpoll':
+            threads.append(threading.Thread(target=_macro_longpoll, args=(base, calc_id, rec, stop, timeout, wait_sec), daemon=True))
+        else:
+            threads.append(threading.Thread(target=_macro_poll, args=(base, calc_id, rec, stop, timeout), daemon=True))
+    pg_samples = []
+    if dsn and psycopg2 is not None:
+        threads.append(threading.Thread(target=_pg_sampler, args=(dsn, stop, pg_samples), daemon=True))
+    started = time.time()
+    for th in threads:
+        th.start()
+    stop.wait(duration)
+    stop.set()
+    for th in threads:
+        th.join(timeout=timeout + wait_sec + 2)
+    elapsed = time.time() - started
+
+    perf = (_server_get(base, '/api/debug/perf', {'prefix': 'scheduler_apply'}) or {}).get('labels') or {}
+    sql = _server_get(base, '/api/debug/sql', {'top': '0'}) or {}
+    db = {
+        'scopes': {name: {'connects_mean': st.get('connects_mean'), 'connects_max': st.get('connects_max'),
+                          'queries_mean': st.get('queries_mean'), 'runs': st.get('runs')}
+                   for name, st in (sql.get('scopes') or {}).items()
+                   if not name.startswith('http_debug_') and (st.get('queries_max') or st.get('connects_max'))},
+    }
+    if pg_samples:
+        db['pg_connections_max'] = max(s[0] for s in pg_samples)
+        db['pg_connections_mean'] = round(sum(s[0] for s in pg_samples) / len(pg_samples), 2)
+        db['pg_active_max'] = max(s[1] for s in pg_samples)
+    return {
+        'tabs': tabs, 'macros': macros, 'macro_mode': macro_mode, 'duration_sec': round(elapsed, 1),
+        'endpoints': rec.summary(elapsed),
+        'apply_tick': perf.get('scheduler_apply'),
+        'db': db,
+    }
+
+
+def _print_stage(st):
+    print(f"\n=== 탭 {st['tabs']} / 매크로 {st['macros']} ({st['macro_mode']}) — {st['duration_sec']}초 ===")
+    print(f"{'endpoint':22s} {'req':>7s} {'rps':>7s} {'err%':>6s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}")
+    for name, e in st['endpoints'].items():
+        def f(v):
+            return f"{v:8.1f}" if v is not None else f"{'-':>8s}"
+        print(f"{name:22s} {e['requests']:7d} {e['rps']:7.1f} {e['error_rate'] * 100:6.2f} {f(e['p50_ms'])} {f(e['p95_ms'])} {f(e['p99_ms'])} {f(e['max_ms'])}")
+        for s in e['error_samples']:
+            print(f"{'':22s}   ! {s}")
+    tick = st.get('apply_tick')
+    if tick:
+        print(f"apply 틱: {tick['count']}회 p50 {tick['p50']}ms p95 {tick['p95']}ms max {tick['max']}ms")
+    else:
+        print("apply 틱: 기록 없음 (스케줄러 미동작 또는 PERF_HIST=0)")
+    db = st['db']
+    if 'pg_connections_max' in db:
+        print(f"Postgres 연결: 최대 {db['pg_connections_max']} 평균 {db['pg_connections_mean']} (active 최대 {db['pg_active_max']})")
+    for name, s in sorted(db['scopes'].items()):
+        print(f"  {name:40s} 연결 평균 {s['connects_mean']} 최대 {s['connects_max']} / 쿼리 평균 {s['queries_mean']}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description='다중 탭·매크로 부하 테스트')
+    ap.add_argument('--base', default=BASE)
+    ap.add_argument('--tabs', default='1,5,10', help='단계별 탭 수 (쉼표 구분)')
+    ap.add_argument('--macros', type=int, default=3, help='매크로 수 (계산기 1~3 순환)')
+    ap.add_argument('--macro-mode', choices=('poll', 'longpoll', 'ws'), default='poll')
+    ap.add_argument('--duration', type=float, default=20.0, help='단계별 부하 시간(초)')
+    ap.add_argument('--timeout', type=float, default=10.0, help='요청 타임아웃(초)')
+    ap.add_argument('--wait', type=float, default=20.0, help='longpoll 대기(초)')
+    ap.add_argument('--dsn', help='pg_stat_activity 샘플링용 Postgres DSN')
+    ap.add_argument('--json', help='결과 JSON 저장 경로')
+    args = ap.parse_args()
+    base = args.base.rstrip('/')
+    if args.dsn and psycopg2 is None:
+        print("[경고] psycopg2 없음 — pg_stat_activity 샘플링 생략")
+
+    try:
+        stages = [int(x) for x in args.tabs.split(',') if x.strip()]
+    except ValueError:
+        ap.error('--tabs 형식 오류 (예: 1,5,10)')
+    try:
+        requests.get(base + '/health', timeout=5)
+    except Exception as e:
+        print(f"[오류] 서버 응답 없음 ({base}): {e}")
+        return 2
+    # 기동 직후면 워밍업(캐시 준비)까지 기다림 — 콜드스타트 지연이 첫 단계 지표에 섞이지 않게
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(base + '/health/ready', timeout=5).status_code == 200:
+                break
+        except Exception:
+            pass
+        time.sleep(0.5)
+    else:
+        print("[주의] /health/ready 가 30초 안에 준비되지 않음 — 피드·DB 상태 확인 (계속 진행)")
+
+    report = {'base': base, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'stages': []}
+    for tabs in stages:
+        st = run_stage(base, tabs, args.macros, args.macro_mode, args.duration, args.timeout, args.wait, args.dsn)
+        report['stages'].append(st)
+        _print_stage(st)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n[저장] {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+win_rate_bucket_stats 재구성 (오프라인). /api/win-rate-buckets 집계를 prediction_history 전체로 다시 만든다.
+
+평소에는 save_prediction_record가 저장할 때마다 증감으로 유지하므로 필요 없다.
+수동으로 prediction_history를 고쳤거나, 집계 갱신이 실패했다는 경고가 보였을 때 실행.
+
+  DATABASE_URL=postgres://... python scripts/rebuild_win_rate_buckets.py
+  python scripts/rebuild_win_rate_buckets.py --check   # 재구성 없이 집계와 원본 합계만 비교
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ['APP_BACKGROUND_START'] = '0'  # 워밍업·스케줄러 없이 함수만 사용
+
+import app as appmod  # noqa: E402
+
+
+def _totals(cur):
+    """(집계 all 행 합, 원본 합) — 구간 무관 승/패 총합 비교용."""
+    cur.execute("SELECT COALESCE(SUM(wins), 0), COALESCE(SUM(losses), 0) FROM win_rate_bucket_stats WHERE scope = 'all'")
+    agg = tuple(int(v) for v in cur.fetchone())
+    cur.execute('''
+        SELECT COALESCE(SUM((predicted = actual)::int), 0), COALESCE(SUM((predicted <> actual)::int), 0)
+        FROM prediction_history WHERE blended_win_rate IS NOT NULL AND actual != 'joker'
+    ''')
+    src = tuple(int(v) for v in cur.fetchone())
+    return agg, src
+
+
+def main():
+    ap = argparse.ArgumentParser(description='win_rate_bucket_stats 재구성')
+    ap.add_argument('--check', action='store_true', help='재구성 없이 집계·원본 합계 비교 (다르면 종료 코드 1)')
+    args = ap.parse_args()
+    if not appmod.DB_AVAILABLE or not appmod.DATABASE_URL:
+        print("[오류] DATABASE_URL 없음 또는 psycopg2 미설치")
+        return 2
+    if not appmod.init_database():
+        return 2
+    conn = appmod.get_db_connection(statement_timeout_sec=300)
+    if not conn:
+        return 2
+    try:
+        cur = conn.cursor()
+        if args.check:
+            agg, src = _totals(cur)
+            print(f"집계 승/패 {agg[0]}/{agg[1]}, 원본 {src[0]}/{src[1]}")
+            return 0 if agg == src else 1
+        n = appmod._rebuild_win_rate_bucket_stats(cur)
+        conn.commit()
+        agg, src = _totals(cur)
+        print(f"[완료] {n}행 재구성 — 승/패 {agg[0]}/{agg[1]} (원본 {src[0]}/{src[1]})")
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+결정적(seed 고정) 합성 결과 생성기 — 벤치마크·부하 테스트·대체 피드 서버 공용.
+
+그래프 값(정/꺽)은 카드 i와 i+15의 색 일치 여부이므로, 정/꺽 시퀀스를 먼저 국면(줄/퐁당/무작위) 전환 마르코프로 만들고
+그에 맞게 카드 색을 역산한다. 조커는 JOKER_RATE 확률로 섞는다.
+
+  from synthetic_results import generate_results, generate_prediction_history, to_feed_rows
+  results = generate_results(300, seed=7)          # app._parse_results_json 형식, 최신순(맨 앞=최신)
+  ph = generate_prediction_history(results, seed=7)  # get_prediction_history 형식, 회차 오름차순
+  rows = to_feed_rows(results)                       # result.json 원본 형식(json 문자열 내장)
+"""
+import hashlib
+import json
+import random
+
+JOKER_RATE = 0.02          # 조커 비율 (덱 54장 중 2장 근사)
+START_ROUND = 7000000
+# 국면별 '정' 확률·평균 지속 길이. 줄: 같은 값 연속, 퐁당: 교대, 무작위: 반반
+REGIMES = {
+    'line': {'repeat': 0.78, 'mean_len': 12},
+    'pong': {'repeat': 0.22, 'mean_len': 10},
+    'random': {'repeat': 0.50, 'mean_len': 16},
+}
+SUITS_RED = ('H', 'D')
+SUITS_BLACK = ('S', 'C')
+
+
+def _gv_sequence(n, rng):
+    """정(True)/꺽(False) 시퀀스(과거→최신). 국면은 기하분포 길이로 전환."""
+    out = []
+    names = list(REGIMES)
+    regime = rng.choice(names)
+    left = max(1, int(rng.expovariate(1.0 / REGIMES[regime]['mean_len'])))
+    prev = rng.random() < 0.5
+    for _ in range(n):
+        if left <= 0:
+            regime = rng.choice([r for r in names if r != regime])
+            left = max(1, int(rng.expovariate(1.0 / REGIMES[regime]['mean_len'])))
+        v = prev if rng.random() < REGIMES[regime]['repeat'] else (not prev)
+        out.append(v)
+        prev = v
+        left -= 1
+    return out
+
+
+def _card(is_red, rng):
+    suit = rng.choice(SUITS_RED if is_red else SUITS_BLACK)
+    return f"{suit}{rng.randint(1, 13)}"
+
+
+def generate_results(n, seed=0, joker_rate=JOKER_RATE, start_round=START_ROUND):
+    """n개 결과(최신순). 각 항목은 app._parse_results_json 출력과 같은 키."""
+    rng = random.Random(seed)
+    gv = _gv_sequence(max(0, n - 15), rng)
+    colors = []  # 과거→최신, True=RED / None=조커
+    jokers = []
+    for i in range(n):
+        joker = rng.random() < joker_rate
+        if i < 15:
+            c = rng.random() < 0.5
+        else:
+            base = colors[i - 15]
+            if base is None:
+                base = rng.random() < 0.5
+            c = base if gv[i - 15] else (not base)
+        jokers.append(joker)
+        colors.append(None if joker else c)
+    out = []
+    for i in range(n):
+        game_id = str(start_round + i)
+        joker = jokers[i]
+        is_red = colors[i]
+        card = 'JOKER' if joker else _card(is_red, rng)
+        salt = f"{rng.getrandbits(32):08x}"
+        out.append({
+            'gameID': game_id,
+            'result': card,
+            'hi': (not joker) and rng.random() < 0.5,
+            'lo': (not joker) and rng.random() < 0.5,
+            'red': bool(is_red) if not joker else False,
+            'black': (not is_red) if not joker else False,
+            'jqka': (not joker) and card[1:] in ('11', '12', '13'),
+            'joker': joker,
+            'hash': hashlib.sha256(f"{game_id}:{card}:{salt}".encode()).hexdigest(),
+            'salt': salt,
+        })
+    out.reverse()
+    return out
+
+
+def to_feed_rows(results):
+    """결과 → result.json 원본 행 (게임 플래그는 json 문자열에 내장)."""
+    rows = []
+    for r in results:
+        rows.append({
+            'gameID': r['gameID'],
+            'result': r['result'],
+            'json': json.dumps({k: r[k] for k in ('hi', 'lo', 'red', 'black', 'jqka', 'joker')}),
+            'hash': r['hash'],
+            'salt': r['salt'],
+        })
+    return rows
+
+
+def generate_prediction_history(results, seed=0, accuracy=0.52):
+    """결과(최신순)에 맞는 예측 이력(회차 오름차순). 실제값은 결과에서 계산, 예측은 accuracy 확률로 적중."""
+    rng = random.Random(seed + 1)
+    ordered = list(reversed(results))
+    out = []
+    for i in range(15, len(ordered)):
+        r, r15 = ordered[i], ordered[i - 15]
+        if r['joker'] or r15['joker']:
+            actual = 'joker'
+        else:
+            actual = '정' if r['red'] == r15['red'] else '꺽'
+        base = actual if actual != 'joker' else rng.choice(('정', '꺽'))
+        predicted = base if rng.random() < accuracy else ('꺽' if base == '정' else '정')
+        alt = lambda: base if rng.random() < 0.5 else ('꺽' if base == '정' else '정')
+        out.append({
+            'round': int(r['gameID']),
+            'predicted': predicted,
+            'actual': actual,
+            'probability': round(rng.uniform(50, 70), 1),
+            'pick_color': '빨강' if rng.random() < 0.5 else '검정',
+            'shape_pick': alt(),
+            'pong_pick': alt(),
+        })
+    return out
+
+
+if __name__ == '__main__':
+    import argparse
+    ap = argparse.ArgumentParser(description='합성 결과 생성 (JSON 출력)')
+    ap.add_argument('-n', type=int, default=200)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--feed', action='store_true', help='result.json 원본 형식으로 출력')
+    args = ap.parse_args()
+    res = generate_results(args.n, seed=args.seed)
+    print(json.dumps(to_feed_rows(res) if args.feed else res, ensure_ascii=False))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Socket.IO 브라우저 클라이언트 고정 사본 받기 — /results가 CDN 대신 같은 출처의 해시 이름 자산으로 제공하도록.
+
+app.SOCKETIO_CLIENT_CDN에서 받아 app.SOCKETIO_CLIENT_SRI(sha384)와 비교하고, 맞을 때만 static/vendor/에 쓴다.
+쓴 파일을 커밋하면 기동 시 자산으로 등록되고 CSP에서 cdn.socket.io가 빠진다.
+
+  python scripts/vendor_socketio_client.py
+  python scripts/vendor_socketio_client.py --check   # 받지 않고 기존 사본 해시만 검증
+"""
+import argparse
+import os
+import sys
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ['APP_BACKGROUND_START'] = '0'  # 워밍업·스케줄러 없이 상수·함수만 사용
+
+import app as appmod  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Socket.IO 클라이언트 고정 사본 받기')
+    ap.add_argument('--check', action='store_true', help='기존 사본 해시만 검증 (다르거나 없으면 종료 코드 1)')
+    args = ap.parse_args()
+    path = appmod.SOCKETIO_CLIENT_VENDOR
+    if args.check:
+        if not os.path.exists(path):
+            print(f"[없음] {path}")
+            return 1
+        with open(path, 'rb') as f:
+            sri = appmod._socketio_client_sri(f.read())
+        print(f"{path}: {sri}")
+        return 0 if sri == appmod.SOCKETIO_CLIENT_SRI else 1
+    resp = requests.get(appmod.SOCKETIO_CLIENT_CDN, timeout=30)
+    resp.raise_for_status()
+    sri = appmod._socketio_client_sri(resp.content)
+    if sri != appmod.SOCKETIO_CLIENT_SRI:
+        print(f"[오류] 해시 불일치: 받은 파일 {sri}, 기대값 {appmod.SOCKETIO_CLIENT_SRI} — 저장하지 않음")
+        return 1
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(resp.content)
+    print(f"[완료] {path} ({len(resp.content)}B, {sri}) — 커밋하면 /results가 같은 출처에서 제공")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
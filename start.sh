@@ -6,10 +6,16 @@
 
 PORT_VALUE="${PORT:-5000}"
 
-# WebSocket(Flask-SocketIO) 지원: eventlet worker, 단일 워커 필수 (-w 1)
+# 워커 수: WEB_CONCURRENCY (기본 1). 2 이상이면 Postgres advisory lock으로 리더 1개만 수집·apply 스케줄러를 돌리고
+# 나머지 워커는 app_state_snapshot 테이블로 결과·예측픽·relay 캐시를 동기화한다 (DATABASE_URL 필수).
+# 다중 워커에서는 sticky session이 없으므로 Socket.IO 클라이언트는 websocket transport만 써야 하고(롱폴링 불가),
+# 소켓 emit은 각 워커가 자기 연결에만 보낸다 — 워커 간 일관성은 스냅샷 동기화(STATE_SYNC_SEC)가 맡는다.
+WORKERS="${WEB_CONCURRENCY:-1}"
+export WEB_CONCURRENCY="${WORKERS}"
+
 exec gunicorn app:app \
   --bind "0.0.0.0:${PORT_VALUE}" \
   --worker-class eventlet \
-  --workers 1 \
+  --workers "${WORKERS}" \
   --timeout 30 \
   --keep-alive 5